@@ -0,0 +1,103 @@
+"""
+Compare the sync (gunicorn/WSGI) and async (uvicorn/ASGI) deployments under
+concurrent load on the job read endpoints.
+
+    python -m benchmarks.concurrency --token <token> [--concurrency 1 16 64] [--requests 400]
+
+Both servers are started against the configured DATABASE_URL and only issue
+reads, so point it at a database that already has jobs in it. The endpoints
+need a token; pass an existing one with --token (see /api/auth/login/).
+
+The gap between the two modes grows with database latency: against a local
+SQLite file the async path is slower (thread hand-offs dominate), while a
+remote database, or one under load, is where it pays off.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = {
+    "sync": (
+        ["gunicorn", "jobBoardProject.wsgi:application", "--workers", "{workers}", "--bind", "127.0.0.1:{port}"],
+        "/api/jobs/",
+    ),
+    "async": (
+        ["uvicorn", "jobBoardProject.asgi:application", "--workers", "{workers}", "--port", "{port}", "--no-access-log"],
+        "/api/async/jobs/",
+    ),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(request, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(request, timeout=1).read()
+            return
+        except urllib.error.HTTPError:
+            raise
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {request.full_url} did not come up")
+
+
+def fetch(request):
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=60) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def run_load(request, concurrency, requests):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        latencies = sorted(pool.map(fetch, [request] * requests))
+        elapsed = time.perf_counter() - start
+    return requests / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--token", required=True)
+    args = parser.parse_args()
+
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="jobBoardProject.settings")
+    print(f"{'mode':>6} {'conc':>5} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    for mode, (command, path) in MODES.items():
+        port = free_port()
+        # ASGI requests don't reuse persistent connections; see settings.py.
+        server_env = dict(env, DATABASE_CONN_MAX_AGE="0") if mode == "async" else env
+        server = subprocess.Popen(
+            [part.format(workers=args.workers, port=port) for part in command],
+            env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{port}{path}", headers={"Authorization": f"Token {args.token}"}
+            )
+            wait_for(request)
+            for concurrency in args.concurrency:
+                rate, p50, p95 = run_load(request, concurrency, args.requests)
+                print(f"{mode:>6} {concurrency:>5} {rate:>8.1f} {p50 * 1000:>9.1f} {p95 * 1000:>9.1f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
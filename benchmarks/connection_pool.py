@@ -0,0 +1,104 @@
+"""
+Load test for pooled connections: latency and server connection count as
+concurrency grows past the pool size.
+
+    python -m benchmarks.connection_pool --token <token> [--threads 32] [--pool-size 8] [--concurrency 4 8 16 32 64]
+
+Starts gunicorn with threaded workers twice against the configured
+DATABASE_URL (a PostgreSQL database that already has jobs): once with a
+connection per thread, once with DATABASE_POOL on and DATABASE_POOL_MAX_SIZE
+set to --pool-size. While each load level runs, pg_stat_activity is sampled
+for the number of connections to the database.
+
+Per-thread connections grow with the number of busy threads, up to
+workers x threads. Pooled connections stop at workers x pool size, and
+requests above that wait for a connection instead of opening one. p95
+latency then grows with the queue, but it stays predictable and the
+database's connection limit is never reached.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import urllib.request
+
+import psycopg
+
+from .concurrency import free_port, run_load, wait_for
+
+MODES = {
+    "thread": {"DATABASE_POOL": "False", "DATABASE_CONN_MAX_AGE": "600"},
+    "pooled": {"DATABASE_POOL": "True"},
+}
+
+
+class ConnectionSampler(threading.Thread):
+    """
+    Polls pg_stat_activity and keeps the highest connection count seen.
+    """
+    def __init__(self, database_url, interval=0.05):
+        super().__init__(daemon=True)
+        self.database_url = database_url
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        with psycopg.connect(self.database_url, autocommit=True) as connection:
+            while not self.stopped.wait(self.interval):
+                # Minus this sampler's own connection.
+                count = connection.execute(
+                    "SELECT count(*) - 1 FROM pg_stat_activity WHERE datname = current_database()"
+                ).fetchone()[0]
+                self.peak = max(self.peak, count)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--token", required=True)
+    args = parser.parse_args()
+
+    database_url = os.environ["DATABASE_URL"]
+    env = dict(
+        os.environ, DJANGO_SETTINGS_MODULE="jobBoardProject.settings",
+        DATABASE_POOL_MIN_SIZE=str(args.pool_size), DATABASE_POOL_MAX_SIZE=str(args.pool_size),
+    )
+    print(f"{'mode':>6} {'conc':>5} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'conns':>6}")
+    for mode, mode_env in MODES.items():
+        port = free_port()
+        server = subprocess.Popen(
+            [
+                "gunicorn", "jobBoardProject.wsgi:application", "--workers", str(args.workers),
+                "--threads", str(args.threads), "--bind", f"127.0.0.1:{port}",
+            ],
+            env=dict(env, **mode_env), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{port}/api/jobs/", headers={"Authorization": f"Token {args.token}"}
+            )
+            wait_for(request)
+            for concurrency in args.concurrency:
+                sampler = ConnectionSampler(database_url)
+                sampler.start()
+                rate, p50, p95 = run_load(request, concurrency, args.requests)
+                peak = sampler.stop()
+                print(f"{mode:>6} {concurrency:>5} {rate:>8.1f} {p50 * 1000:>9.1f} {p95 * 1000:>9.1f} {peak:>6}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
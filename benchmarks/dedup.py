@@ -0,0 +1,107 @@
+"""
+Precision, recall and lookup cost of the near-duplicate check (jobs.dedup)
+on a synthetic corpus.
+
+    python -m benchmarks.dedup [--sizes 1000 10000] [--queries 500] [--threshold 0.8]
+
+Each corpus job gets random words for title, company and a 40-120 word
+description. Queries are reposts of corpus jobs with 1-8 word edits
+(substitutions, insertions, deletions), plus as many unrelated new jobs. A
+repost is a true duplicate when the exact Jaccard similarity of its shingles
+with the original reaches the threshold; a prediction is correct when
+find_duplicates() names that original.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.utils import setup, test_database
+
+VOCABULARY_SIZE = 5000
+
+
+def words(rng, vocabulary, low, high):
+    return [rng.choice(vocabulary) for _ in range(rng.randint(low, high))]
+
+
+def random_job(rng, vocabulary):
+    return {
+        "title": " ".join(words(rng, vocabulary, 2, 4)),
+        "company": " ".join(words(rng, vocabulary, 1, 2)),
+        "description": " ".join(words(rng, vocabulary, 40, 120)),
+    }
+
+
+def repost(rng, vocabulary, job):
+    description = job["description"].split()
+    for _ in range(rng.randint(1, 8)):
+        position = rng.randrange(len(description))
+        edit = rng.choice(("substitute", "insert", "delete"))
+        if edit == "substitute":
+            description[position] = rng.choice(vocabulary)
+        elif edit == "insert":
+            description.insert(position, rng.choice(vocabulary))
+        elif len(description) > 1:
+            del description[position]
+    return {**job, "title": job["title"].title(), "description": " ".join(description) + "."}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setup()
+    from jobBoard.models import User
+    from jobs import dedup
+    from jobs.models import Job
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"w{i}" for i in range(VOCABULARY_SIZE)]
+
+    def jaccard(first, second):
+        first, second = dedup.shingles(**first), dedup.shingles(**second)
+        return len(first & second) / len(first | second)
+
+    print(f"{'jobs':>8} {'precision':>10} {'recall':>8} {'ms/lookup':>10} {'index (ms/job)':>15}")
+    with test_database():
+        poster = User.objects.create(email="bench@example.com")
+        corpus = {}
+        for size in sorted(args.sizes):
+            batch = [random_job(rng, vocabulary) for _ in range(size - len(corpus))]
+            jobs = Job.objects.bulk_create([
+                Job(posted_by=poster, application_link="https://example.com/apply", **job) for job in batch
+            ])
+            corpus.update((job.pk, values) for job, values in zip(jobs, batch))
+            start = time.perf_counter()
+            for offset in range(0, len(jobs), 1000):
+                dedup.index_jobs(job.pk for job in jobs[offset:offset + 1000])
+            index_ms = (time.perf_counter() - start) * 1000 / max(len(jobs), 1)
+
+            originals = rng.sample(sorted(corpus), args.queries)
+            queries = [(job_id, repost(rng, vocabulary, corpus[job_id])) for job_id in originals]
+            queries += [(None, random_job(rng, vocabulary)) for _ in range(args.queries)]
+
+            start = time.perf_counter()
+            matches = [dedup.find_duplicates([dedup.signature(**job)], args.threshold)[0] for _, job in queries]
+            lookup_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+            true_positives = false_positives = false_negatives = 0
+            for (original, job), match in zip(queries, matches):
+                duplicate = original is not None and jaccard(job, corpus[original]) >= args.threshold
+                if match is not None and duplicate and match.job_id == original:
+                    true_positives += 1
+                elif match is not None:
+                    false_positives += 1
+                if duplicate and (match is None or match.job_id != original):
+                    false_negatives += 1
+            precision = true_positives / max(true_positives + false_positives, 1)
+            recall = true_positives / max(true_positives + false_negatives, 1)
+            print(f"{size:>8} {precision:>10.3f} {recall:>8.3f} {lookup_ms:>10.2f} {index_ms:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare the SQL path of JobFilterView with the bitmap index on paginated
+filter requests.
+
+    python -m benchmarks.job_filters [--sizes 1000 10000 100000] [--repeat 20]
+"""
+import argparse
+
+from benchmarks.utils import seed_jobs, setup, test_database, timer
+
+FILTERS = {
+    "one tag": {"tags": ["tag-1"]},
+    "three tags": {"tags": ["tag-1", "tag-2", "tag-3"]},
+    "tags + location": {"tags": ["tag-1", "tag-2"], "location": ["City 7"]},
+    "company + type": {"company": ["Company 3", "Company 4"], "job_type": ["Full-time"]},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.test import RequestFactory
+    from jobs import bitmaps
+    from jobs.filters import filter_jobs
+    from jobs.models import Job
+    from jobs.pagination import KeysetPagination
+    from jobs.serializers import JobListFastSerializer
+    from jobs.views import indexed_job_page
+
+    request = RequestFactory().post(f"/?page_size={args.page_size}")
+
+    def sql_page(data):
+        queryset = filter_jobs(Job.objects.filter(is_active=True), data).order_by("-updated_at")
+        return [row["id"] for row in KeysetPagination().paginate_queryset(JobListFastSerializer.get_rows(queryset), request)]
+
+    def bitmap_page(data):
+        return [row["id"] for row in indexed_job_page(request, data, KeysetPagination())]
+
+    print(f"{'jobs':>8} {'filter':<16} {'sql (ms)':>9} {'bitmap (ms)':>12} {'speedup':>8}")
+    with test_database():
+        seeded = 0
+        for size in sorted(args.sizes):
+            seed_jobs(size - seeded)
+            seeded = size
+            results = {}
+            with timer(results, "build"):
+                bitmaps.index.rebuild()
+            print(f"{size:>8} {'(index build)':<16} {'':>9} {results['build'] * 1000:>12.1f}")
+
+            for name, data in FILTERS.items():
+                assert sql_page(data) == bitmap_page(data), "paths disagree"
+                with timer(results, "sql"):
+                    for _ in range(args.repeat):
+                        sql_page(data)
+                with timer(results, "bitmap"):
+                    for _ in range(args.repeat):
+                        bitmap_page(data)
+                sql, bitmap = results["sql"] / args.repeat, results["bitmap"] / args.repeat
+                print(f"{size:>8} {name:<16} {sql * 1000:>9.1f} {bitmap * 1000:>12.1f} {sql / bitmap:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
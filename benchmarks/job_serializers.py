@@ -0,0 +1,43 @@
+"""
+Compare JobListSerializer with JobListFastSerializer on the list payload.
+
+    python -m benchmarks.job_serializers [--sizes 1000 10000 100000]
+"""
+import argparse
+
+from benchmarks.utils import seed_jobs, setup, test_database, timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    setup()
+    from rest_framework.renderers import JSONRenderer
+    from jobs.models import Job
+    from jobs.serializers import JobListFastSerializer, JobListSerializer
+
+    renderer = JSONRenderer()
+    print(f"{'jobs':>8} {'model (s)':>10} {'fast (s)':>10} {'speedup':>8}")
+    with test_database():
+        seeded = 0
+        for size in sorted(args.sizes):
+            seed_jobs(size - seeded)
+            seeded = size
+            queryset = Job.objects.filter(is_active=True)
+            results = {}
+
+            with timer(results, "model"):
+                model_json = renderer.render(
+                    JobListSerializer(queryset.select_related("posted_by").prefetch_related("tags"), many=True).data
+                )
+            with timer(results, "fast"):
+                fast_json = renderer.render(JobListFastSerializer(JobListFastSerializer.get_rows(queryset)).data)
+
+            assert model_json == fast_json, "serializers disagree"
+            print(f"{size:>8} {results['model']:>10.3f} {results['fast']:>10.3f} {results['model'] / results['fast']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Shared setup for the scripts in this package.
+
+Run them from the repository root with the usual environment (.env or
+exported variables), e.g. ``python -m benchmarks.job_serializers``. They
+work against a throwaway test database created from DATABASE_URL, so no
+real data is touched.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jobBoardProject.settings")
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    from django.test.utils import setup_databases, teardown_databases
+
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+
+@contextmanager
+def timer(results, name):
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
+
+
+def seed_jobs(count, tags_per_job=3, tag_count=200, batch_size=5000):
+    """
+    Insert ``count`` active jobs with bulk_create. Signals are bypassed, so
+    rebuild derived indexes afterwards if a benchmark depends on them.
+    """
+    from jobBoard.models import User
+    from jobs.models import Job, Tag
+
+    poster, _ = User.objects.get_or_create(email="bench@example.com", defaults={"first_name": "Bench"})
+    Tag.objects.bulk_create(
+        [Tag(name=f"tag-{i}", slug=f"tag-{i}") for i in range(tag_count)], ignore_conflicts=True
+    )
+    tag_ids = list(Tag.objects.order_by("id").values_list("id", flat=True))
+
+    job_types = [choice[0] for choice in Job.JobType.choices]
+    for start in range(0, count, batch_size):
+        jobs = Job.objects.bulk_create([
+            Job(
+                posted_by=poster,
+                title=f"Engineer {i % 500}",
+                company=f"Company {i % 1000}",
+                location=f"City {i % 50}",
+                description=f"Job description {i}",
+                application_link="https://example.com/apply",
+                job_type=job_types[i % len(job_types)],
+            )
+            for i in range(start, min(start + batch_size, count))
+        ])
+        Job.tags.through.objects.bulk_create([
+            Job.tags.through(job_id=job.pk, tag_id=tag_ids[(job.pk * 7 + offset) % len(tag_ids)])
+            for job in jobs
+            for offset in range(tags_per_job)
+        ], ignore_conflicts=True)
+
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
+
+from jobBoardProject.paginator import EstimatedCountPaginator
 from .models import User
 
 @admin.register(User)
@@ -9,6 +11,8 @@ class UserAdmin(BaseUserAdmin):
     list_display = ("email", "first_name", "last_name", "is_staff", "is_superuser", "is_active")
     search_fields = ("email", "first_name", "last_name")
     readonly_fields = ("created_at", "updated_at")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         (None, {"fields": ("email", "password")}),
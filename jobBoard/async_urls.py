@@ -0,0 +1,6 @@
+from django.urls import path
+from .async_views import check
+
+urlpatterns = [
+    path('check/', check, name='async-check'),
+]
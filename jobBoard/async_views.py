@@ -0,0 +1,80 @@
+import functools
+
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+
+from .authentication import cached_user, token_cache
+
+
+def render_json(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), content_type="application/json", status=status)
+
+
+async def aauthenticate(request):
+    """
+    Async counterpart of CachedTokenAuthentication for plain async views.
+    Returns None when no token was sent.
+    """
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b"token":
+        return None
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed("Invalid token header.")
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed("Invalid token header.")
+
+    token = token_cache.get(key)
+    if token is None:
+        try:
+            token = await Token.objects.select_related("user").aget(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        token_cache.set(key, token)
+    return cached_user(token)
+
+
+def async_api_view(*methods):
+    """
+    Decorator for async read views: enforces the allowed methods, token
+    authentication and DRF-style JSON errors, since DRF's APIView can't
+    run natively under ASGI.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise exceptions.MethodNotAllowed(request.method)
+                user = await aauthenticate(request)
+                if user is None:
+                    raise exceptions.NotAuthenticated()
+                request.user = user
+                return await view(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                response = render_json({"detail": exc.detail}, status=exc.status_code)
+                if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                    response["WWW-Authenticate"] = "Token"
+                return response
+        # These views only read, so every allowed method may use a replica.
+        wrapper.replica_reads = {method.lower() for method in methods}
+        return wrapper
+    return decorator
+
+
+@async_api_view("GET")
+async def check(request):
+    user = request.user
+    return render_json({
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "email": user.email,
+        "is_staff": user.is_staff,
+        "message": "User authentication verified successfully."
+    })
@@ -0,0 +1,85 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """
+    Per-process LRU of token key -> Token (with its user), each entry
+    expiring after ``ttl`` seconds.
+
+    Invalidation through invalidate()/invalidate_user() only reaches this
+    process, so the TTL is the upper bound on how long another worker keeps
+    accepting a revoked token or a deactivated user.
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.maxsize = settings.TOKEN_CACHE_MAX_SIZE if maxsize is None else maxsize
+        self.ttl = settings.TOKEN_CACHE_TTL if ttl is None else ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            token, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return token
+
+    def set(self, key, token):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (token, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            stale = [key for key, (token, _) in self._entries.items() if token.user_id == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache()
+
+
+def cached_user(token):
+    # Hand each request its own copy so per-request caches on the instance
+    # (e.g. user.auth_token) don't leak between requests.
+    return copy.copy(token.user)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that skips the Token/User lookup while the token is
+    in ``token_cache``.
+    """
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, token)
+        return cached_user(token), token
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .models import User
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(sender, instance, raw=False, **kwargs):
+    # Covers deactivation and password changes made through save(); bulk
+    # updates skip this and fall back to TOKEN_CACHE_TTL.
+    if not raw:
+        token_cache.invalidate_user(instance.pk)
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from tasks import mail
+from tasks.queue import task
+from .models import User
+
+
+@task("send_password_reset_email")
+def send_password_reset_email(user_id):
+    try:
+        user = User.objects.get(pk=user_id)
+    except User.DoesNotExist:
+        return
+
+    token = PasswordResetTokenGenerator().make_token(user)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    reset_link = f"{settings.RESET_URL}/{uid}/{token}"
+
+    first_name = user.first_name if user.first_name else "User"
+    subject = "Password Reset Request"
+    content = f"Hello {first_name},\n\nClick the link below to reset your password:\n\n{reset_link}\n\nIf you didn’t request this, ignore this email."
+    mail.send(to=user.email, subject=subject, contents=content)
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from .authentication import TokenCache, token_cache
+from .models import User
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(email="user@example.com", password="pass")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_cached_token_skips_lookup(self):
+        self.assertEqual(self.client.get(reverse("check")).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("check"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], self.user.email)
+        self.assertEqual(len(queries), 0)
+
+    def test_logout_revokes_token(self):
+        self.client.get(reverse("check"))
+        self.assertEqual(self.client.get(reverse("logout")).status_code, 200)
+        self.assertEqual(self.client.get(reverse("check")).status_code, 401)
+
+    def test_deactivation_and_token_delete_invalidate(self):
+        self.client.get(reverse("check"))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("check")).status_code, 401)
+
+        self.user.is_active = True
+        self.user.save()
+        self.client.get(reverse("check"))
+        Token.objects.filter(pk=self.token.pk).delete()
+        self.assertEqual(self.client.get(reverse("check")).status_code, 401)
+
+    def test_password_reset_invalidates(self):
+        self.client.get(reverse("check"))
+        self.assertEqual(len(token_cache), 1)
+        url = reverse("reset-password", args=[
+            urlsafe_base64_encode(force_bytes(self.user.pk)),
+            PasswordResetTokenGenerator().make_token(self.user),
+        ])
+        with mock.patch.object(token_cache, "invalidate_user", wraps=token_cache.invalidate_user) as invalidate:
+            response = self.client.post(url, {"new_password": "new-pass"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        invalidate.assert_called_with(self.user.pk)
+        self.assertEqual(len(token_cache), 0)
+
+    def test_bulk_deactivation_is_bounded_by_ttl(self):
+        self.client.get(reverse("check"))
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(reverse("check")).status_code, 200)
+
+        with mock.patch("jobBoard.authentication.time.monotonic", return_value=10 ** 9):
+            self.assertEqual(self.client.get(reverse("check")).status_code, 401)
+
+
+class TokenCacheTests(APITestCase):
+    def test_lru_and_ttl(self):
+        user = User.objects.create_user(email="user@example.com")
+        tokens = [Token(key=f"key-{i}", user=user) for i in range(3)]
+        cache = TokenCache(maxsize=2, ttl=30)
+
+        with mock.patch("jobBoard.authentication.time.monotonic", return_value=100):
+            cache.set("key-0", tokens[0])
+            cache.set("key-1", tokens[1])
+            self.assertIs(cache.get("key-0"), tokens[0])
+            cache.set("key-2", tokens[2])
+            self.assertIsNone(cache.get("key-1"))
+            self.assertEqual(len(cache), 2)
+
+        with mock.patch("jobBoard.authentication.time.monotonic", return_value=130):
+            self.assertIsNone(cache.get("key-0"))
+            self.assertIsNone(cache.get("key-2"))
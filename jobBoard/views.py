@@ -5,14 +5,14 @@ from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authtoken.views import ObtainAuthToken
 
-import yagmail
+from tasks import queue
+from .authentication import token_cache
 from .models import User
 from .serializers import UserSerializer, EmailAuthTokenSerializer
 
-from django.conf import settings
 from django.utils.encoding import force_bytes
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.utils.http import urlsafe_base64_decode
 
 class SignupView(APIView):
     permission_classes = [AllowAny]
@@ -72,6 +72,7 @@ class LogOutView(APIView):
             return Response({"detail": "Authentication credentials were not provided."},status=status.HTTP_401_UNAUTHORIZED)
         
         user.auth_token.delete()
+        token_cache.invalidate_user(user.pk)
         return Response({
             "email": user.email,
             "message": "Logged out successfully"
@@ -80,6 +81,7 @@ class LogOutView(APIView):
 
 class CheckView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = {"get"}
 
     def get(self, request):
         user = request.user
@@ -105,19 +107,8 @@ class ForgotPasswordView(APIView):
         except User.DoesNotExist:
             return Response({"error": "User with this email does not exist"}, status=status.HTTP_400_BAD_REQUEST)
 
-        token_generator = PasswordResetTokenGenerator()
-        token = token_generator.make_token(user)
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        reset_link = f"{settings.RESET_URL}/{uid}/{token}"
-
-        try:
-            first_name = user.first_name if user.first_name else "User"
-            mail = yagmail.SMTP(user=settings.YAGMAIL_USER, password=settings.YAGMAIL_PASSWORD)
-            subject = "Password Reset Request"
-            content = f"Hello {first_name},\n\nClick the link below to reset your password:\n\n{reset_link}\n\nIf you didn’t request this, ignore this email."
-            mail.send(to=email, subject=subject, contents=content)
-        except Exception as e:
-            return Response({"message": "If the email is registered, a reset link will be sent."}, status=status.HTTP_200_OK)
+        # Sent by `manage.py run_tasks` once this request has committed.
+        queue.enqueue("send_password_reset_email", {"user_id": user.pk})
 
         return Response({"message": "Password reset email sent"}, status=status.HTTP_200_OK)
     
@@ -140,6 +131,7 @@ class ResetPasswordView(APIView):
         if user is not None and token_generator.check_token(user, token):
             user.set_password(new_password)
             user.save()
+            token_cache.invalidate_user(user.pk)
             return Response({"message": "Password has been reset successfully."}, status=status.HTTP_200_OK)
         else:
             return Response({"error": "Invalid token or user ID."}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobBoardProject.settings')
 
 application = get_asgi_application()
+
+from jobs import bitmaps  # noqa: E402
+
+bitmaps.warm()
@@ -0,0 +1,151 @@
+"""
+Read replica routing.
+
+Replicas are configured with DATABASE_REPLICA_URLS and show up as the
+``replica_<n>`` aliases in DATABASE_REPLICAS. Reads only go to a replica
+inside a request whose view opts in for that method, e.g.
+``replica_reads = {"get"}``. Everything else uses the primary: writes,
+reads inside a transaction, management commands and task workers.
+
+A request that writes is pinned to the primary for the rest of the request,
+so it reads its own writes. Its response also sets a cookie that keeps the
+client's reads on the primary for REPLICA_PIN_SECONDS, until the replicas
+have caught up with the write. A replica that can't be reached is skipped
+for REPLICA_RETRY_SECONDS and its reads go to another replica or the
+primary.
+"""
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_RETRY_SECONDS = 30
+PIN_COOKIE = "db_primary_until"
+# Tokens are read right after login, before a replica may have caught up.
+PRIMARY_MODELS = {"authtoken.token"}
+
+_routing = ContextVar("db_routing", default=None)
+_down_until = {}
+
+
+class RequestRouting:
+    def __init__(self, pinned=False):
+        self.replica_reads = False
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+
+def pinned_by_cookie(request):
+    """
+    Whether the client wrote within the last REPLICA_PIN_SECONDS. The
+    cookie holds the expiry; one further out than a pin can last is ignored.
+    """
+    try:
+        until = float(request.COOKIES[PIN_COOKIE])
+    except (KeyError, ValueError):
+        return False
+    return time.time() < until <= time.time() + settings.REPLICA_PIN_SECONDS
+
+
+def pin_client(response):
+    until = time.time() + settings.REPLICA_PIN_SECONDS
+    response.set_cookie(
+        PIN_COOKIE, f"{until:.3f}", max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite="Lax",
+    )
+
+
+def replica_available(alias):
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        logger.warning("Replica %s is unavailable; reading from the primary", alias, exc_info=True)
+        _down_until[alias] = time.monotonic() + REPLICA_RETRY_SECONDS
+        return False
+    return True
+
+
+def choose_replica():
+    replicas = list(settings.DATABASE_REPLICAS)
+    random.shuffle(replicas)
+    return next((alias for alias in replicas if replica_available(alias)), DEFAULT_DB_ALIAS)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if (
+            routing is None or not routing.replica_reads or routing.pinned
+            or model._meta.label_lower in PRIMARY_MODELS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        if routing.replica is None:
+            # One replica per request, so its reads see a single snapshot.
+            routing.replica = choose_replica()
+        return routing.replica
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.pinned = routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Tracks the routing state of each request. Views opt in to replica reads
+    per method with ``replica_reads``, on the view class or function.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing = RequestRouting(pinned=pinned_by_cookie(request))
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote and settings.DATABASE_REPLICAS:
+            pin_client(response)
+        return response
+
+    async def __acall__(self, request):
+        routing = RequestRouting(pinned=pinned_by_cookie(request))
+        token = _routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote and settings.DATABASE_REPLICAS:
+            pin_client(response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, "view_class", view_func)
+        routing = _routing.get()
+        if routing is not None and settings.DATABASE_REPLICAS:
+            method = "get" if request.method == "HEAD" else request.method.lower()
+            routing.replica_reads = method in getattr(view, "replica_reads", ())
@@ -0,0 +1,140 @@
+"""
+Per-request query and timing instrumentation.
+
+RequestTimingMiddleware records, for each resolved URL name, the number of
+SQL queries, the time spent in the database, the time spent in timed()
+sections such as serialization, and the total time. Each figure goes to the
+metrics registry. With REQUEST_TIMING_HEADERS on, the response also carries
+a Server-Timing header.
+
+The stats live in a context variable. asgiref copies the context into
+sync_to_async threads, so queries made by the async views are counted too.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.spans = {}
+        self.total_time = None
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.start
+
+    def server_timing(self):
+        entries = [f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"']
+        entries += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items()]
+        entries.append(f"total;dur={self.total_time * 1000:.1f}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def timed(name):
+    """
+    Attribute the enclosed time to ``name`` in the current request's stats.
+    """
+    stats = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.spans[name] = stats.spans.get(name, 0.0) + time.perf_counter() - start
+
+
+def count_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def install(connection, **kwargs):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+connection_created.connect(install)
+
+
+def query_budget(match, method):
+    """
+    A view declares budgets per handler, counting authentication with a cold
+    token cache, e.g. ``query_budget = {"get": 5}``.
+    """
+    budgets = getattr(getattr(match.func, "view_class", None), "query_budget", {})
+    return budgets.get(method.lower())
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Connections opened before the middleware was loaded.
+        for connection in connections.all():
+            install(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.process_stats(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.process_stats(request, response, stats)
+
+    def process_stats(self, request, response, stats):
+        stats.finish()
+        match = request.resolver_match
+        name = match.view_name if match else "unresolved"
+        metrics.observe(f"request.{name}.queries", stats.queries)
+        metrics.observe(f"request.{name}.db_ms", stats.db_time * 1000)
+        for span, seconds in stats.spans.items():
+            metrics.observe(f"request.{name}.{span}_ms", seconds * 1000)
+        metrics.observe(f"request.{name}.total_ms", stats.total_time * 1000)
+
+        budget = query_budget(match, request.method) if match else None
+        if budget is not None and stats.queries > budget:
+            logger.warning("%s ran %d queries (budget %d)", name, stats.queries, budget)
+
+        response.request_stats = stats
+        if settings.REQUEST_TIMING_HEADERS:
+            response["Server-Timing"] = stats.server_timing()
+        return response
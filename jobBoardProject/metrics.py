@@ -0,0 +1,32 @@
+"""
+Minimal in-process metrics registry.
+
+Values are per process; anything that needs a cross-process view (e.g.
+the activity buffer backlog) is computed from the database instead.
+"""
+import threading
+
+_lock = threading.Lock()
+_metrics = {}
+
+
+def observe(name, value):
+    """
+    Record one observation, keeping count, sum, max and the last value.
+    """
+    with _lock:
+        metric = _metrics.setdefault(name, {"count": 0, "sum": 0.0, "max": value, "last": value})
+        metric["count"] += 1
+        metric["sum"] += value
+        metric["max"] = max(metric["max"], value)
+        metric["last"] = value
+
+
+def snapshot():
+    with _lock:
+        return {name: dict(metric) for name, metric in _metrics.items()}
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
@@ -0,0 +1,46 @@
+"""
+Paginator for admin changelists over large tables, where COUNT(*) on every
+page load costs more than the page itself.
+"""
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    An unfiltered changelist uses PostgreSQL's planner estimate
+    (pg_class.reltuples) once the table is past ESTIMATE_THRESHOLD rows.
+    Anything else counts at most COUNT_LIMIT rows, so a broad filter offers
+    the first COUNT_LIMIT results and should be narrowed to see more.
+
+    Use with ``show_full_result_count = False`` so the changelist does not
+    run its own unfiltered count as well.
+    """
+    ESTIMATE_THRESHOLD = 100_000
+    COUNT_LIMIT = 10_000
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate()
+        if estimate is not None:
+            return estimate
+        return self.object_list[:self.COUNT_LIMIT].count()
+
+    def estimate(self):
+        query = self.object_list.query
+        if query.where or query.distinct or query.combinator:
+            return None
+        connection = connections[self.object_list.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(query.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been analyzed.
+        if row is None or row[0] < self.ESTIMATE_THRESHOLD:
+            return None
+        return int(row[0])
@@ -0,0 +1,112 @@
+"""
+PostgreSQL backend that checks connections out of a psycopg_pool pool
+instead of opening one per thread.
+
+Enabled with DATABASE_POOL (see settings.py). OPTIONS["pool"] holds the
+ConnectionPool arguments: min_size, max_size and timeout. Django closes
+connections at the end of every request (CONN_MAX_AGE must be 0), which here
+hands them back to the pool, so a process holds at most max_size
+connections however many threads or async requests it serves. A request
+that finds the pool exhausted waits up to `timeout` seconds and then fails
+with OperationalError.
+
+With CONN_HEALTH_CHECKS on, the pool tests each connection on checkout and
+replaces it if the server has dropped it.
+
+Every checkout records, per alias, db.pool.<alias>.wait_ms and
+db.pool.<alias>.saturation (connections in use / max_size) in
+jobBoardProject.metrics; requests that time out are counted in
+db.pool.<alias>.timeouts.
+"""
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgreSQLDatabaseWrapper
+from django.utils.asyncio import async_unsafe
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+from jobBoardProject import metrics
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_stats():
+    """
+    Current size and usage of every pool opened by this process.
+    """
+    with _pools_lock:
+        return {alias: pool.get_stats() for alias, pool in _pools.items()}
+
+
+class DatabaseWrapper(PostgreSQLDatabaseWrapper):
+    @property
+    def pooled(self):
+        # The connection Django opens to create or drop the test database
+        # is never pooled.
+        return self.alias != NO_DB_ALIAS
+
+    @property
+    def pool(self):
+        with _pools_lock:
+            if self.alias not in _pools:
+                if self.settings_dict["CONN_MAX_AGE"]:
+                    raise ImproperlyConfigured(
+                        "Pooled connections are returned at the end of each request; set CONN_MAX_AGE to 0."
+                    )
+                check = ConnectionPool.check_connection if self.settings_dict["CONN_HEALTH_CHECKS"] else None
+                # Opened on first use, so the pool's worker threads start
+                # after gunicorn or uvicorn has forked.
+                _pools[self.alias] = ConnectionPool(
+                    kwargs=self.get_connection_params(), open=False, check=check, name=self.alias,
+                    **self.settings_dict["OPTIONS"]["pool"],
+                )
+            return _pools[self.alias]
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        if not self.pooled:
+            return super().get_new_connection(conn_params)
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        try:
+            self.isolation_level = IsolationLevel.READ_COMMITTED if isolation_level is None else IsolationLevel(isolation_level)
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"Invalid transaction isolation level {isolation_level} specified. "
+                "Use one of the psycopg.IsolationLevel values."
+            )
+        connection = self.checkout()
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def checkout(self):
+        pool = self.pool
+        pool.open()
+        start = time.perf_counter()
+        try:
+            connection = pool.getconn()
+        except PoolTimeout:
+            metrics.observe(f"db.pool.{self.alias}.timeouts", 1)
+            raise
+        finally:
+            metrics.observe(f"db.pool.{self.alias}.wait_ms", (time.perf_counter() - start) * 1000)
+        stats = pool.get_stats()
+        metrics.observe(f"db.pool.{self.alias}.saturation", (stats["pool_size"] - stats["pool_available"]) / pool.max_size)
+        return connection
+
+    def _close(self):
+        if self.connection is None or not self.pooled:
+            return super()._close()
+        with self.wrap_database_errors:
+            # The pool rolls back an open transaction, and discards a broken
+            # connection, before anyone else can check it out.
+            self.pool.putconn(self.connection)
@@ -30,7 +30,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-#^f+aj7yeuc3sjn4oitxwwzp!_k86@knyc-)ot#47vu!kd@%=)'
+# Render generates one for the web service and shares it with the workers.
+SECRET_KEY = env("SECRET_KEY", default='django-insecure-#^f+aj7yeuc3sjn4oitxwwzp!_k86@knyc-)ot#47vu!kd@%=)')
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = env('DEBUG')
@@ -52,9 +53,12 @@ INSTALLED_APPS = [
     'django_extensions',
     'jobBoard',
     'jobs',
+    'tasks',
 ]
 
 MIDDLEWARE = [
+    'jobBoardProject.instrumentation.RequestTimingMiddleware',
+    'jobBoardProject.db_router.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -65,6 +69,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Adds a Server-Timing header (queries, DB, serializer and total time) to
+# every response; the same figures always go to jobBoardProject.metrics.
+REQUEST_TIMING_HEADERS = env.bool("REQUEST_TIMING_HEADERS", default=False)
+
 CORS_ALLOWED_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000"]
 CORS_ALLOW_CREDENTIALS = True
 
@@ -95,11 +103,53 @@ WSGI_APPLICATION = 'jobBoardProject.wsgi.application'
 DATABASES = {
     "default": dj_database_url.config(
         default=env("DATABASE_URL"),
-        conn_max_age=600,
+        # Set DATABASE_CONN_MAX_AGE=0 when serving through ASGI: async
+        # requests run their queries on per-request threads, so persistent
+        # connections are never reused and only pile up.
+        conn_max_age=env.int("DATABASE_CONN_MAX_AGE", default=600),
         ssl_require=not DEBUG
     )
 }
 
+# Optional read replicas, comma separated. Views that opt in with
+# `replica_reads` read from one of them; see jobBoardProject/db_router.py.
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[])):
+    alias = f"replica_{index}"
+    DATABASES[alias] = dj_database_url.parse(
+        url,
+        conn_max_age=env.int("DATABASE_CONN_MAX_AGE", default=600),
+        ssl_require=not DEBUG,
+    )
+    # Tests run against the primary's test database.
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+# After a request writes, that client's reads stay on the primary for this
+# long (through a cookie), so it reads its own writes on the next request.
+REPLICA_PIN_SECONDS=env.int("REPLICA_PIN_SECONDS", default=5)
+
+# Check PostgreSQL connections out of a per-process psycopg_pool pool
+# (jobBoardProject/pooled_postgresql) instead of keeping one per thread.
+# Each alias, replicas included, gets its own pool of up to
+# DATABASE_POOL_MAX_SIZE connections. A request waits up to
+# DATABASE_POOL_TIMEOUT seconds for one, and connections are tested on
+# checkout unless DATABASE_POOL_CHECK is off. Connections go back to the
+# pool after every request, so DATABASE_CONN_MAX_AGE is ignored.
+DATABASE_POOL = env.bool("DATABASE_POOL", default=False)
+if DATABASE_POOL:
+    for database in DATABASES.values():
+        if database["ENGINE"] == "django.db.backends.postgresql":
+            database["ENGINE"] = "jobBoardProject.pooled_postgresql"
+            database["CONN_MAX_AGE"] = 0
+            database["CONN_HEALTH_CHECKS"] = env.bool("DATABASE_POOL_CHECK", default=True)
+            database.setdefault("OPTIONS", {})["pool"] = {
+                "min_size": env.int("DATABASE_POOL_MIN_SIZE", default=2),
+                "max_size": env.int("DATABASE_POOL_MAX_SIZE", default=10),
+                "timeout": env.float("DATABASE_POOL_TIMEOUT", default=10.0),
+            }
+
+DATABASE_ROUTERS = ["jobBoardProject.db_router.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -164,7 +214,7 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.JSONParser',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'jobBoard.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -173,5 +223,56 @@ REST_FRAMEWORK = {
 
 YAGMAIL_USER=env("YAGMAIL_USER")
 YAGMAIL_PASSWORD=env("YAGMAIL_PASSWORD")
-
-RESET_URL=env("RESET_URL", default="http://localhost:3000/reset-password")
\ No newline at end of file
+# Point these at a local debugging server to test mail, e.g.
+# `python -m aiosmtpd -n -l localhost:1025` with YAGMAIL_HOST=localhost,
+# YAGMAIL_PORT=1025, YAGMAIL_SMTP_SSL=False, YAGMAIL_SMTP_STARTTLS=False and
+# YAGMAIL_SKIP_LOGIN=True.
+YAGMAIL_HOST=env("YAGMAIL_HOST", default="smtp.gmail.com")
+YAGMAIL_PORT=env.int("YAGMAIL_PORT", default=None)
+YAGMAIL_SMTP_SSL=env.bool("YAGMAIL_SMTP_SSL", default=True)
+YAGMAIL_SMTP_STARTTLS=env.bool("YAGMAIL_SMTP_STARTTLS", default=None)
+YAGMAIL_SKIP_LOGIN=env.bool("YAGMAIL_SKIP_LOGIN", default=False)
+
+RESET_URL=env("RESET_URL", default="http://localhost:3000/reset-password")
+
+# Authenticated tokens are cached per process. Logout, password resets and
+# user saves invalidate the local cache; TOKEN_CACHE_TTL (seconds) bounds how
+# long other workers may still accept a revoked token or deactivated user.
+TOKEN_CACHE_TTL=env.int("TOKEN_CACHE_TTL", default=60)
+TOKEN_CACHE_MAX_SIZE=env.int("TOKEN_CACHE_MAX_SIZE", default=10000)
+
+# "buffered" appends job activity to a staging table drained by
+# `manage.py flush_activity --loop`; "sync" writes UserJobMapping in the request.
+JOB_ACTIVITY_MODE=env("JOB_ACTIVITY_MODE", default="buffered")
+JOB_ACTIVITY_BATCH_SIZE=env.int("JOB_ACTIVITY_BATCH_SIZE", default=1000)
+
+# Answer paginated job filter requests from an in-process bitmap index
+# (jobs/bitmaps.py) instead of a tags join + DISTINCT.
+JOB_BITMAP_INDEX=env.bool("JOB_BITMAP_INDEX", default=False)
+
+# The changes feed (/api/jobs/changes/) only serves changes older than
+# JOB_CHANGES_SETTLE_SECONDS, so a transaction that commits after a client
+# has read past its updated_at is not skipped. Deletion tombstones are kept
+# for JOB_TOMBSTONE_RETENTION_DAYS; clients with an older cursor must resync.
+JOB_CHANGES_SETTLE_SECONDS=env.int("JOB_CHANGES_SETTLE_SECONDS", default=10)
+JOB_TOMBSTONE_RETENTION_DAYS=env.int("JOB_TOMBSTONE_RETENTION_DAYS", default=30)
+
+# `manage.py archive_jobs` moves jobs out of the live table once they are
+# JOB_EXPIRE_AFTER_DAYS past posting, or inactive and untouched for
+# JOB_ARCHIVE_AFTER_DAYS; see jobs/archive.py.
+JOB_EXPIRE_AFTER_DAYS=env.int("JOB_EXPIRE_AFTER_DAYS", default=60)
+JOB_ARCHIVE_AFTER_DAYS=env.int("JOB_ARCHIVE_AFTER_DAYS", default=30)
+
+# New jobs whose estimated Jaccard similarity (over title, company and
+# description shingles) with an active job reaches this are held back as
+# near-duplicates; see jobs/dedup.py.
+JOB_DUPLICATE_THRESHOLD=env.float("JOB_DUPLICATE_THRESHOLD", default=0.8)
+
+# Index file behind /api/jobs/<id>/similar/, written by
+# `manage.py build_similar_jobs` and memory-mapped by every worker; see
+# jobs/similar.py. Put it on storage local to the application servers.
+JOB_SIMILAR_INDEX_PATH=env("JOB_SIMILAR_INDEX_PATH", default=os.path.join(BASE_DIR, "var", "similar_jobs.idx"))
+
+# Model file behind /api/jobs/for-you/, written by
+# `manage.py build_recommendations`; see jobs/recommend.py.
+JOB_RECOMMENDATIONS_PATH=env("JOB_RECOMMENDATIONS_PATH", default=os.path.join(BASE_DIR, "var", "recommendations.bin"))
@@ -0,0 +1,15 @@
+from .instrumentation import query_budget
+
+
+class QueryBudgetMixin:
+    """
+    For TestCases: checks a response against the ``query_budget`` declared
+    on its view, using the count recorded by RequestTimingMiddleware.
+    """
+
+    def assertWithinQueryBudget(self, response):
+        name = response.resolver_match.view_name
+        budget = query_budget(response.resolver_match, response.wsgi_request.method)
+        self.assertIsNotNone(budget, f"{name} declares no query_budget for {response.wsgi_request.method}")
+        queries = response.request_stats.queries
+        self.assertLessEqual(queries, budget, f"{name} ran {queries} queries, over its budget of {budget}")
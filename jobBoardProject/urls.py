@@ -22,6 +22,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/auth/", include("jobBoard.urls")),
     path("api/jobs/", include("jobs.urls")),
+    path("api/async/auth/", include("jobBoard.async_urls")),
+    path("api/async/jobs/", include("jobs.async_urls")),
 ]
 
 urlpatterns += staticfiles_urlpatterns()
\ No newline at end of file
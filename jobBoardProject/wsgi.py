@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobBoardProject.settings')
 
 application = get_wsgi_application()
+
+from jobs import bitmaps  # noqa: E402
+
+bitmaps.warm()
@@ -0,0 +1,159 @@
+"""
+Write-behind pipeline for job activity (Clicked/Applied/Bookmarked).
+
+In the default "buffered" mode a request only appends an ActivityEvent row.
+`manage.py flush_activity` folds pending events into UserJobMapping in
+batches. Set JOB_ACTIVITY_MODE = "sync" to apply events immediately, which
+is what the tests use.
+"""
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from jobBoardProject import metrics
+from . import engagement
+from .models import ActivityEvent, UserJobMapping
+
+logger = logging.getLogger(__name__)
+
+Status = UserJobMapping.Status
+
+# A mapping only ever moves up this list; e.g. Applied is never downgraded to Clicked.
+STATUS_PRECEDENCE = {Status.CLICKED: 0, Status.BOOKMARKED: 1, Status.APPLIED: 2}
+
+# RETURNING lists only the rows inserted, so pairs another writer inserted
+# first can be told apart (PostgreSQL, and SQLite 3.35+).
+INSERT_MAPPINGS_SQL = """
+    INSERT INTO jobs_userjobmapping (user_id, job_id, status, created_at, updated_at) VALUES {}
+    ON CONFLICT (user_id, job_id) DO NOTHING RETURNING user_id, job_id
+"""
+INSERT_BATCH_SIZE = 500
+
+
+def record(user, job_id, status):
+    if settings.JOB_ACTIVITY_MODE == "sync":
+        with transaction.atomic():
+            apply_events([(user.pk, job_id, status)])
+    else:
+        ActivityEvent.objects.create(user=user, job_id=job_id, status=status)
+
+
+def apply_events(events):
+    """
+    Upsert (user_id, job_id, status) events into UserJobMapping, keeping the
+    highest-precedence status per pair. Must run inside a transaction.
+
+    Returns the status transitions as (job_id, old_status, new_status), with
+    old_status None for new mappings. They are also counted in the job's
+    engagement counters.
+    """
+    wanted = {}
+    for user_id, job_id, status in events:
+        current = wanted.get((user_id, job_id))
+        if current is None or STATUS_PRECEDENCE[status] >= STATUS_PRECEDENCE[current]:
+            wanted[(user_id, job_id)] = status
+    if not wanted:
+        return []
+
+    now = timezone.now()
+    existing = _locked_mappings(wanted)
+    transitions = _upgrade(existing.values(), wanted, now)
+    missing = sorted(pair for pair in wanted if pair not in existing)
+    inserted = _insert_mappings(missing, wanted, now)
+    transitions.extend((job_id, None, wanted[user_id, job_id]) for user_id, job_id in missing if (user_id, job_id) in inserted)
+
+    # A concurrent writer inserted these pairs first and has committed by
+    # now; their rows get the same precedence check as the ones we found.
+    conflicts = {pair: wanted[pair] for pair in missing if pair not in inserted}
+    if conflicts:
+        transitions.extend(_upgrade(_locked_mappings(conflicts).values(), conflicts, now))
+    engagement.apply_transitions(transitions)
+    return transitions
+
+
+def _locked_mappings(wanted):
+    """
+    {(user_id, job_id): mapping} for the pairs in ``wanted`` that have one,
+    locked for update.
+    """
+    user_ids = {user_id for user_id, _ in wanted}
+    job_ids = {job_id for _, job_id in wanted}
+    candidates = UserJobMapping.objects.select_for_update().filter(user_id__in=user_ids, job_id__in=job_ids)
+    return {(mapping.user_id, mapping.job_id): mapping for mapping in candidates if (mapping.user_id, mapping.job_id) in wanted}
+
+
+def _upgrade(mappings, wanted, now):
+    """
+    Move these mappings up to their wanted status where that takes
+    precedence. Returns the transitions made.
+    """
+    transitions, upgraded = [], []
+    for mapping in mappings:
+        status = wanted[mapping.user_id, mapping.job_id]
+        if STATUS_PRECEDENCE[status] > STATUS_PRECEDENCE[mapping.status]:
+            transitions.append((mapping.job_id, mapping.status, status))
+            mapping.status = status
+            mapping.updated_at = now
+            upgraded.append(mapping)
+    UserJobMapping.objects.bulk_update(upgraded, ["status", "updated_at"])
+    return transitions
+
+
+def _insert_mappings(pairs, wanted, now):
+    """
+    Insert a mapping for each (user_id, job_id) pair, in the given order,
+    skipping pairs that a concurrent writer inserted first. Returns the
+    pairs actually inserted.
+    """
+    timestamp = connection.ops.adapt_datetimefield_value(now)
+    inserted = set()
+    for start in range(0, len(pairs), INSERT_BATCH_SIZE):
+        batch = pairs[start:start + INSERT_BATCH_SIZE]
+        params = [value for pair in batch for value in (*pair, wanted[pair], timestamp, timestamp)]
+        with connection.cursor() as cursor:
+            cursor.execute(INSERT_MAPPINGS_SQL.format(", ".join(["(%s, %s, %s, %s, %s)"] * len(batch))), params)
+            inserted.update(map(tuple, cursor.fetchall()))
+    return inserted
+
+
+def flush(batch_size=None):
+    """
+    Apply one batch of pending events and delete them. Returns the number
+    of events flushed.
+    """
+    batch_size = batch_size or settings.JOB_ACTIVITY_BATCH_SIZE
+    with transaction.atomic():
+        events = list(
+            ActivityEvent.objects.select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", "user_id", "job_id", "status", "created_at")[:batch_size]
+        )
+        if not events:
+            return 0
+        apply_events([(user_id, job_id, status) for _, user_id, job_id, status, _ in events])
+        ActivityEvent.objects.filter(pk__in=[event[0] for event in events]).delete()
+
+    lag = (timezone.now() - events[0][4]).total_seconds()
+    metrics.observe("activity.flush.batch_size", len(events))
+    metrics.observe("activity.flush.lag_seconds", lag)
+    logger.info("Flushed %d activity events (lag %.3fs)", len(events), lag)
+    return len(events)
+
+
+def buffer_stats():
+    """
+    Backlog of the buffer as seen from the database, valid from any process.
+    """
+    oldest = ActivityEvent.objects.aggregate(oldest=Min("created_at"))["oldest"]
+    return {
+        "pending": ActivityEvent.objects.count(),
+        "lag_seconds": (timezone.now() - oldest).total_seconds() if oldest else 0.0,
+        "flush": {
+            name.rsplit(".", 1)[-1]: metric
+            for name, metric in metrics.snapshot().items()
+            if name.startswith("activity.flush.")
+        },
+    }
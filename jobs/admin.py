@@ -1,5 +1,70 @@
 from django.contrib import admin
-from .models import Tag, Job, UserJobMapping
+from django.contrib.admin.views.main import PAGE_VAR
+from django.db import transaction
+from django.db.models import Count, Q
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
+
+from jobBoard.models import User
+from jobBoardProject.paginator import EstimatedCountPaginator
+from . import engagement
+from .models import ArchivedJob, ArchivedUserJobMapping, FacetValue, Tag, Job, UserJobMapping
+
+
+class FacetInputFilter(admin.SimpleListFilter):
+    """
+    A text box in place of the full list of values, which the admin would
+    otherwise read with a DISTINCT over the whole table. Suggestions are the
+    busiest values from the facet index.
+    """
+    template = "admin/input_filter.html"
+    facet = None
+    suggestion_count = 100
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        hidden_params = []
+        for name, values in changelist.params.items():
+            if name not in (self.parameter_name, PAGE_VAR):
+                hidden_params.extend((name, value) for value in (values if isinstance(values, list) else [values]))
+        suggestions = (
+            FacetValue.objects.filter(facet=self.facet)
+            .order_by("-job_count", "value")
+            .values_list("value", flat=True)[:self.suggestion_count]
+        )
+        yield {
+            "value": self.value(),
+            "hidden_params": hidden_params,
+            "suggestions": suggestions,
+            "clear_query_string": changelist.get_query_string(remove=[self.parameter_name, PAGE_VAR]),
+        }
+
+
+class LocationFilter(FacetInputFilter):
+    title = "location"
+    parameter_name = "location"
+    facet = FacetValue.Facet.LOCATION
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(location=self.value())
+
+
+class TagFilter(FacetInputFilter):
+    title = "tag"
+    parameter_name = "tag"
+    facet = FacetValue.Facet.TAGS
+
+    def queryset(self, request, queryset):
+        # Tag names are unique, so the join cannot repeat a job.
+        if self.value():
+            return queryset.filter(tags__name=self.value())
+
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -9,28 +74,117 @@ class TagAdmin(admin.ModelAdmin):
     ordering = ("name",)
 
 
-class UserJobMappingInline(admin.TabularInline):
-    model = UserJobMapping
-    extra = 0
-    readonly_fields = ("user", "status", "created_at", "updated_at")
-    can_delete = False
-
-
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ("title", "company", "job_type", "location", "is_active", "posted_by", "updated_at",)
-    list_filter = ("is_active", "job_type", "location", "tags")
-    search_fields = ("title", "company", "location", "tags__name")
+    list_filter = ("is_active", "job_type", ("duplicate_of", admin.EmptyFieldListFilter), LocationFilter, TagFilter)
+    list_select_related = ("posted_by",)
+    # Case-insensitive prefix searches, served on PostgreSQL by the UPPER()
+    # pattern indexes of migration 0012; tags have their own filter.
+    search_fields = ("^title", "^company", "^location")
     ordering = ("-updated_at",)
-    inlines = [UserJobMappingInline]
-    autocomplete_fields = ("posted_by", "tags")
+    readonly_fields = ("activity",)
+    autocomplete_fields = ("posted_by", "tags", "duplicate_of")
     list_editable = ("is_active",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description="Activity")
+    def activity(self, job):
+        # Popular jobs have tens of thousands of mappings, so the change page
+        # shows counts per status and links to the paginated list.
+        if job.pk is None:
+            return "-"
+        counts = job.job_users.values_list("status").annotate(total=Count("id")).order_by("status")
+        url = reverse("admin:jobs_userjobmapping_changelist") + f"?job__id__exact={job.pk}"
+        summary = format_html_join(", ", "{}: {}", counts) or "No activity"
+        return format_html('{} (<a href="{}">view all</a>)', summary, url)
+
+
+class MappingSearchMixin:
+    """
+    Searches for an exact user email or the start of a job title or company.
+    The user and job tables are searched on their own, where the UPPER()
+    pattern indexes of migration 0012 apply on PostgreSQL, and mappings are
+    filtered by the matching ids. ORing the conditions across the joins
+    would scan the mappings.
+    """
+    search_fields = ("=user__email", "^job__title", "^job__company")
+    search_help_text = "Exact user email, or the start of a job title or company."
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        users = User.objects.filter(email__iexact=search_term).values("pk")
+        job_model = queryset.model._meta.get_field("job").related_model
+        jobs = job_model.objects.filter(Q(title__istartswith=search_term) | Q(company__istartswith=search_term)).values("pk")
+        return queryset.filter(Q(user__in=users) | Q(job__in=jobs)), False
 
 
 @admin.register(UserJobMapping)
-class UserJobMappingAdmin(admin.ModelAdmin):
+class UserJobMappingAdmin(MappingSearchMixin, admin.ModelAdmin):
     list_display = ("user", "job", "status", "created_at", "updated_at")
     list_filter = ("status",)
-    search_fields = ("user__email", "job__title", "job__company")
+    list_select_related = ("user", "job")
     autocomplete_fields = ("user", "job")
     ordering = ("-updated_at",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Edits keep the jobs' engagement totals in step.
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        changes = [(obj.job_id, None, obj.status)]
+        if change:
+            changes.append((form.initial["job"], form.initial["status"], None))
+        engagement.apply_changes(changes)
+
+    def delete_model(self, request, obj):
+        engagement.apply_changes([(obj.job_id, obj.status, None)])
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        # The changelist's delete action doesn't run in a transaction.
+        with transaction.atomic():
+            engagement.remove_mappings(queryset)
+            super().delete_queryset(request, queryset)
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    # Archive rows are only written by `manage.py archive_jobs`.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedJob)
+class ArchivedJobAdmin(ReadOnlyAdmin):
+    list_display = ("title", "company", "job_type", "location", "expired", "posted_by", "archived_at",)
+    list_filter = ("expired", "job_type")
+    list_select_related = ("posted_by",)
+    search_fields = ("^title", "^company", "^location")
+    ordering = ("-archived_at",)
+    readonly_fields = ("activity",)
+
+    @admin.display(description="Activity")
+    def activity(self, job):
+        url = reverse("admin:jobs_archiveduserjobmapping_changelist") + f"?job__id__exact={job.pk}"
+        return format_html(
+            'Clicked {}, bookmarked {}, applied {} (<a href="{}">view all</a>)',
+            job.click_count, job.bookmark_count, job.apply_count, url,
+        )
+
+
+@admin.register(ArchivedUserJobMapping)
+class ArchivedUserJobMappingAdmin(MappingSearchMixin, ReadOnlyAdmin):
+    list_display = ("user", "job", "status", "created_at", "updated_at")
+    list_filter = ("status",)
+    list_select_related = ("user", "job")
+    raw_id_fields = ("user", "job")
+    ordering = ("-updated_at",)
@@ -0,0 +1,110 @@
+"""
+Moves stale jobs out of the hot jobs_job table.
+
+A job is stale once it is JOB_EXPIRE_AFTER_DAYS past its posting date, or
+has been inactive and untouched for JOB_ARCHIVE_AFTER_DAYS. archive_jobs()
+moves stale jobs into ArchivedJob, together with their tags, engagement
+totals and UserJobMapping rows (as ArchivedUserJobMapping). It works one
+batch of jobs per transaction, so locks are only ever held on one batch. On
+PostgreSQL, rows that a concurrent edit has locked are skipped, and so are
+jobs with activity still in the buffer, checked again once the batch is
+locked; the next run picks them up.
+
+The jobs are deleted without per-row signals. Each batch does in bulk what
+jobs.signals does for a deleted job: it updates the facet counts, writes
+tombstones for the changes feed, and refreshes the search and bitmap
+indexes and the catalogue generation. Daily engagement rollups of archived
+jobs are dropped.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from . import bitmaps, facets, generation, search
+from .models import (
+    ActivityEvent, ArchivedJob, Job, JobEngagement, JobEngagementDay, JobSignature, JobSignatureBand, JobTombstone,
+    UserJobMapping,
+)
+from .serializers import JobListFastSerializer, engagement_counts
+
+COPY_MAPPINGS_SQL = """
+    INSERT INTO jobs_archiveduserjobmapping (id, user_id, job_id, status, created_at, updated_at)
+    SELECT id, user_id, job_id, status, created_at, updated_at FROM jobs_userjobmapping WHERE job_id IN ({})
+"""
+DELETE_JOBS_SQL = "DELETE FROM jobs_job WHERE id IN ({})"
+
+
+def stale_jobs(now=None):
+    now = now or timezone.now()
+    return Job.objects.filter(
+        Q(is_active=True, created_at__lt=now - timedelta(days=settings.JOB_EXPIRE_AFTER_DAYS))
+        | Q(is_active=False, updated_at__lt=now - timedelta(days=settings.JOB_ARCHIVE_AFTER_DAYS))
+    ).exclude(Exists(ActivityEvent.objects.filter(job_id=OuterRef("pk"))))
+
+
+def archive_batch(job_ids):
+    """
+    Move these jobs and their mappings to the archive tables. Must run
+    inside a transaction that holds the jobs' row locks. Returns the ids
+    archived.
+    """
+    # Once the jobs are locked, new activity for them waits on its foreign
+    # key check, but events committed after the candidates were chosen are
+    # visible now. Deleting those jobs would fail the foreign key at commit.
+    buffered = set(ActivityEvent.objects.filter(job_id__in=job_ids).values_list("job_id", flat=True))
+    job_ids = [job_id for job_id in job_ids if job_id not in buffered]
+    if not job_ids:
+        return job_ids
+    jobs = list(Job.objects.filter(pk__in=job_ids).select_related("engagement"))
+    tags = JobListFastSerializer.group_tags(JobListFastSerializer.get_tag_links(job_ids))
+    ArchivedJob.objects.bulk_create([
+        ArchivedJob(
+            id=job.pk, posted_by_id=job.posted_by_id, job_type=job.job_type, title=job.title,
+            company=job.company, location=job.location, description=job.description,
+            application_link=job.application_link, tags=tags.get(job.pk, []), expired=job.is_active,
+            created_at=job.created_at, updated_at=job.updated_at,
+            **engagement_counts(getattr(job, "engagement", None)),
+        )
+        for job in jobs
+    ])
+
+    placeholders = ", ".join(["%s"] * len(job_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(COPY_MAPPINGS_SQL.format(placeholders), job_ids)
+    for model in (UserJobMapping, JobEngagement, JobEngagementDay, JobSignature, JobSignatureBand, Job.tags.through):
+        model.objects.filter(job_id__in=job_ids).delete()
+    Job.objects.filter(duplicate_of__in=job_ids).update(duplicate_of=None)
+    with connection.cursor() as cursor:
+        cursor.execute(DELETE_JOBS_SQL.format(placeholders), job_ids)
+
+    delta = Counter()
+    for job in jobs:
+        tag_names = [tag["name"] for tag in tags.get(job.pk, [])]
+        delta.subtract(facets.job_contribution(facets.job_values(job), tag_names))
+    facets.apply_delta(delta)
+    JobTombstone.objects.bulk_create([JobTombstone(job_id=job_id) for job_id in job_ids])
+    search.unindex_jobs(job_ids)
+    generation.schedule_bump()
+    bitmaps.schedule_sync()
+    return job_ids
+
+
+def archive_jobs(batch_size=500, now=None):
+    """
+    Archive every stale job, one batch per transaction. Returns the number
+    of jobs archived.
+    """
+    candidates = stale_jobs(now).order_by("pk").select_for_update(skip_locked=True)
+    archived = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            job_ids = list(candidates.filter(pk__gt=last_id).values_list("pk", flat=True)[:batch_size])
+            if not job_ids:
+                return archived
+            last_id = job_ids[-1]
+            archived += len(archive_batch(job_ids))
@@ -0,0 +1,9 @@
+from django.urls import path
+from .async_views import job_list, job_filter, job_export, job_detail
+
+urlpatterns = [
+    path('', job_list, name='async-job-list'),
+    path('filter/', job_filter, name='async-job-filter'),
+    path('export/', job_export, name='async-job-export'),
+    path('<int:pk>/', job_detail, name='async-job-detail'),
+]
@@ -0,0 +1,112 @@
+"""
+Async versions of the read endpoints, served under /api/async/jobs/.
+
+They produce the same payloads as the views in jobs.views but use the async
+ORM, so under an ASGI server a worker can keep many slow database requests
+in flight at once.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import exceptions
+
+from jobBoard.async_views import async_api_view, render_json
+from jobBoardProject.instrumentation import timed
+from . import bitmaps, generation
+from .export import RENDERERS, aiter_export, content_headers
+from .facets import acount_selection, aget_filters_data
+from .filters import filter_jobs
+from .models import Job
+from .pagination import KeysetPagination
+from .serializers import FilterSerializer, JobDetailSerializer, JobListFastSerializer
+from .views import format_detail_etag, format_list_etag, indexed_job_page, job_rows, status_requested, use_bitmap_index
+
+
+async def job_list_data(rows, paginator=None):
+    filter_serializer = FilterSerializer(await aget_filters_data())
+    with timed("serialize"):
+        data = {
+            'filters': filter_serializer.data,
+            'jobs': await JobListFastSerializer(rows).adata()
+        }
+    if paginator is not None:
+        data['next'] = paginator.next_cursor
+    return data
+
+
+async def paginated_job_list(request, queryset):
+    rows = job_rows(queryset, request)
+    paginator = KeysetPagination()
+    page = await paginator.apaginate_queryset(rows, request)
+    if page is None:
+        return await job_list_data(rows)
+    return await job_list_data(page, paginator)
+
+
+@async_api_view("GET")
+async def job_list(request):
+    if status_requested(request):
+        return render_json(await paginated_job_list(request, Job.objects.filter(is_active=True)))
+
+    etag = quote_etag(format_list_etag(await generation.acurrent(), request))
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = render_json(await paginated_job_list(request, Job.objects.filter(is_active=True)))
+    response["ETag"] = etag
+    return response
+
+
+@async_api_view("POST")
+async def job_filter(request):
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        raise exceptions.ParseError()
+    if not isinstance(data, dict):
+        raise exceptions.ParseError()
+
+    paginator = KeysetPagination()
+    if use_bitmap_index(request, paginator):
+        page = await sync_to_async(indexed_job_page)(request, data, paginator)
+        response_data = await job_list_data(page, paginator)
+        response_data['facets'] = bitmaps.index.count(data)
+        return render_json(response_data)
+
+    queryset = filter_jobs(Job.objects.filter(is_active=True), data).order_by('-updated_at')
+    response_data = await paginated_job_list(request, queryset)
+    response_data['facets'] = await acount_selection(data)
+    return render_json(response_data)
+
+
+@async_api_view("GET")
+async def job_export(request):
+    export_format = request.GET.get("format", "ndjson")
+    if export_format not in RENDERERS:
+        raise exceptions.NotFound()
+    return StreamingHttpResponse(aiter_export(export_format), headers=content_headers(export_format))
+
+
+@async_api_view("GET")
+async def job_detail(request, pk):
+    jobs = Job.objects.filter(pk=pk, is_active=True)
+    updated_at = await jobs.values_list('updated_at', flat=True).afirst()
+    if updated_at is None:
+        raise exceptions.NotFound()
+
+    etag = quote_etag(format_detail_etag(pk, updated_at))
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(updated_at.timestamp()))
+    if not_modified is not None:
+        return not_modified
+
+    job = await jobs.select_related('posted_by').prefetch_related('tags').afirst()
+    if job is None:
+        raise exceptions.NotFound()
+    response = render_json(JobDetailSerializer(job).data)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(updated_at.timestamp())
+    return response
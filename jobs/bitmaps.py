@@ -0,0 +1,442 @@
+"""
+Optional in-process bitmap index over active jobs, enabled with
+JOB_BITMAP_INDEX.
+
+Every facet value (tag, title, company, location, job_type) maps to a
+Bitmap of job ids. A filter is answered with a few OR/AND operations on
+those bitmaps, then sorted and paginated in memory. Only the requested page
+is read from the database.
+
+Bitmaps are chunked like roaring bitmaps: ids are grouped by id >> 16, and
+each chunk is a sorted array of the low 16 bits, or a bitset once it is
+dense enough for that to be smaller. A value held by a few jobs therefore
+costs a few bytes per job, however high their ids, and near-unique values
+such as titles stay cheap. Drill-down counts for a filtered selection walk
+the selected jobs' values rather than intersecting every bitmap.
+
+The index catches up incrementally, like a changes feed client
+(jobs/changes.py): it reads only the jobs updated and the tombstones
+written since its last sync, outside the lock, then applies them. Every
+write that affects a job moves its updated_at and bumps the change
+generation, so a sync runs when the generation differs from the one last
+applied; this process's own writes schedule one when their transaction
+commits. Each sync restarts JOB_CHANGES_SETTLE_SECONDS before its read,
+which covers clock skew and transactions that commit late.
+"""
+import heapq
+import logging
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from . import facets, generation
+from .changes import after
+from .filters import get_created_after, get_list
+from .models import Job, JobTombstone
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("title", "company", "location", "job_type")
+TAGS = "tags"
+ROW_FIELDS = ("id", *FIELDS, "created_at", "updated_at")
+
+JobTags = Job.tags.through
+
+
+def set_bits(bitmap):
+    """
+    Positions of the set bits in ``bitmap``, in ascending order.
+    """
+    text = bin(bitmap)[:1:-1]
+    positions = []
+    position = text.find("1")
+    while position != -1:
+        positions.append(position)
+        position = text.find("1", position + 1)
+    return positions
+
+
+def from_positions(positions, size):
+    buffer = bytearray(size // 8 + 1)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+# Above this many members a chunk's array ("H", two bytes each) is larger
+# than its 8 KB bitset.
+ARRAY_LIMIT = 4096
+
+
+def _container(low):
+    """
+    The smaller representation of a chunk's sorted low bits.
+    """
+    if len(low) > ARRAY_LIMIT:
+        return from_positions(low, low[-1] + 1)
+    return array("H", low)
+
+
+def _cardinality(container):
+    return container.bit_count() if isinstance(container, int) else len(container)
+
+
+def _members(container):
+    return set_bits(container) if isinstance(container, int) else container
+
+
+def _and(first, second):
+    if isinstance(first, int) and isinstance(second, int):
+        return first & second
+    if isinstance(first, int):
+        first, second = second, first
+    if isinstance(second, int):
+        return array("H", [low for low in first if second >> low & 1])
+    return array("H", sorted(set(first).intersection(second)))
+
+
+def _or(first, second):
+    if isinstance(first, int) or isinstance(second, int):
+        return _bitset(first) | _bitset(second)
+    return _container(sorted(set(first).union(second)))
+
+
+def _bitset(container):
+    return container if isinstance(container, int) else from_positions(container, CHUNK_MASK + 1)
+
+
+class Bitmap:
+    """
+    A set of job ids as {id >> 16: container}, where a container holds the
+    low 16 bits of its ids as a sorted array("H") or, past ARRAY_LIMIT
+    members, an int bitset. Chunks are never empty.
+
+    & and | return new bitmaps that may share containers with their
+    operands, so only the index's own bitmaps are changed in place.
+    """
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks=None):
+        self.chunks = {} if chunks is None else chunks
+
+    @classmethod
+    def from_ids(cls, job_ids):
+        grouped = {}
+        for job_id in sorted(job_ids):
+            grouped.setdefault(job_id >> CHUNK_BITS, []).append(job_id & CHUNK_MASK)
+        return cls({high: _container(low) for high, low in grouped.items()})
+
+    def __bool__(self):
+        return bool(self.chunks)
+
+    def __len__(self):
+        return sum(_cardinality(container) for container in self.chunks.values())
+
+    def __iter__(self):
+        for high in sorted(self.chunks):
+            base = high << CHUNK_BITS
+            for low in _members(self.chunks[high]):
+                yield base | low
+
+    def __and__(self, other):
+        chunks = {}
+        for high in self.chunks.keys() & other.chunks.keys():
+            container = _and(self.chunks[high], other.chunks[high])
+            if _cardinality(container):
+                chunks[high] = container
+        return Bitmap(chunks)
+
+    def __or__(self, other):
+        chunks = dict(self.chunks)
+        for high, container in other.chunks.items():
+            chunks[high] = _or(chunks[high], container) if high in chunks else container
+        return Bitmap(chunks)
+
+    def add(self, job_id):
+        high, low = job_id >> CHUNK_BITS, job_id & CHUNK_MASK
+        container = self.chunks.get(high)
+        if container is None:
+            self.chunks[high] = array("H", [low])
+        elif isinstance(container, int):
+            self.chunks[high] = container | 1 << low
+        else:
+            index = bisect_left(container, low)
+            if index == len(container) or container[index] != low:
+                container.insert(index, low)
+                if len(container) > ARRAY_LIMIT:
+                    self.chunks[high] = _container(container)
+
+    def discard(self, job_id):
+        high, low = job_id >> CHUNK_BITS, job_id & CHUNK_MASK
+        container = self.chunks.get(high)
+        if container is None:
+            return
+        if isinstance(container, int):
+            container &= ~(1 << low)
+            if container.bit_count() <= ARRAY_LIMIT:
+                container = array("H", set_bits(container))
+            self.chunks[high] = container
+        else:
+            index = bisect_left(container, low)
+            if index < len(container) and container[index] == low:
+                del container[index]
+        if not _cardinality(self.chunks[high]):
+            del self.chunks[high]
+
+    def nbytes(self):
+        """
+        Approximate memory held by the containers.
+        """
+        return sum(sys.getsizeof(container) for container in self.chunks.values())
+
+
+def load_tags(jobs):
+    tags = {}
+    for job_id, name in JobTags.objects.filter(job__in=jobs).values_list("job_id", "tag__name"):
+        tags.setdefault(job_id, []).append(name)
+    return tags
+
+
+class BitmapIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Held while reading changes from the database, so syncs apply in
+        # order without blocking lookups.
+        self._sync_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.bitmaps = {}
+        self.active = Bitmap()
+        self.keys = {}
+        # job id -> (updated_at, id), the listing order, and created_at for
+        # the time filter.
+        self.positions = {}
+        self.created = {}
+        self.generation = None
+        # (updated_at, id) and (deleted_at, id) the next sync reads after.
+        self.job_position = None
+        self.tombstone_position = None
+
+    @property
+    def ready(self):
+        return self.generation is not None
+
+    @staticmethod
+    def job_keys(row, tag_names):
+        keys = [(field, row[field]) for field in FIELDS if row[field] is not None]
+        keys.extend((TAGS, name) for name in tag_names)
+        return keys
+
+    def _track(self, row, keys):
+        job_id = row["id"]
+        self.keys[job_id] = keys
+        self.positions[job_id] = (row["updated_at"], job_id)
+        self.created[job_id] = row["created_at"]
+
+    def _add(self, row, tag_names):
+        keys = self.job_keys(row, tag_names)
+        for key in keys:
+            self.bitmaps.setdefault(key, Bitmap()).add(row["id"])
+        self.active.add(row["id"])
+        self._track(row, keys)
+
+    def _remove(self, job_id):
+        if job_id not in self.positions:
+            return
+        self.active.discard(job_id)
+        for key in self.keys.pop(job_id, ()):
+            bitmap = self.bitmaps[key]
+            bitmap.discard(job_id)
+            if not bitmap:
+                del self.bitmaps[key]
+        self.positions.pop(job_id, None)
+        self.created.pop(job_id, None)
+
+    @staticmethod
+    def _restart_position():
+        return timezone.now() - timedelta(seconds=settings.JOB_CHANGES_SETTLE_SECONDS), 0
+
+    def rebuild(self, current=None):
+        with self._sync_lock:
+            current = generation.current() if current is None else current
+            restart = self._restart_position()
+            jobs = Job.objects.filter(is_active=True)
+            rows = list(jobs.values(*ROW_FIELDS))
+            tags = load_tags(jobs)
+
+            # Collect each value's jobs first and build its bitmap in one go.
+            members = {}
+            keys = {row["id"]: self.job_keys(row, tags.get(row["id"], ())) for row in rows}
+            for job_id, job_keys in keys.items():
+                for key in job_keys:
+                    members.setdefault(key, []).append(job_id)
+            bitmaps = {key: Bitmap.from_ids(job_ids) for key, job_ids in members.items()}
+            active = Bitmap.from_ids(keys)
+            with self._lock:
+                self._reset()
+                for row in rows:
+                    self._track(row, keys[row["id"]])
+                self.bitmaps = bitmaps
+                self.active = active
+                self.job_position = self.tombstone_position = restart
+                self.generation = current
+            return len(rows)
+
+    def sync(self):
+        """
+        Apply the changes made since the last sync, if the change generation
+        has moved.
+        """
+        current = generation.current()
+        if self.ready and current == self.generation:
+            return
+        if not self.ready:
+            self.rebuild(current)
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            # Another thread is applying the same changes.
+            return
+        try:
+            restart = self._restart_position()
+            jobs = Job.objects.filter(after(self.job_position, "updated_at"))
+            rows = list(jobs.values(*ROW_FIELDS, "is_active"))
+            tags = load_tags(jobs.filter(is_active=True)) if rows else {}
+            deleted = list(
+                JobTombstone.objects.filter(after(self.tombstone_position, "deleted_at")).values_list("job_id", flat=True)
+            )
+            with self._lock:
+                for job_id in deleted:
+                    self._remove(job_id)
+                for row in rows:
+                    self._remove(row["id"])
+                    if row.pop("is_active"):
+                        self._add(row, tags.get(row["id"], ()))
+                self.job_position = self.tombstone_position = restart
+                self.generation = current
+        finally:
+            self._sync_lock.release()
+
+    def _selected(self, data):
+        """
+        Per filtered facet, the bitmap of jobs having any of the requested
+        values.
+        """
+        selected = {}
+        for facet in (TAGS, *FIELDS):
+            values = get_list(data, facet)
+            if values:
+                bitmap = Bitmap()
+                for value in values:
+                    if value is not None and (facet, str(value)) in self.bitmaps:
+                        bitmap = bitmap | self.bitmaps[facet, str(value)]
+                selected[facet] = bitmap
+        return selected
+
+    def match(self, data, now=None):
+        """
+        Ids of the indexed jobs that filter_jobs(queryset, data) would
+        return, in no particular order.
+        """
+        with self._lock:
+            result = self.active
+            for bitmap in self._selected(data).values():
+                result = result & bitmap
+            job_ids = list(result)
+
+            created_after = get_created_after(data.get("time"), now)
+            if created_after is not None:
+                job_ids = [job_id for job_id in job_ids if self.created[job_id] >= created_after]
+            return job_ids
+
+    def count(self, data, now=None):
+        """
+        In-memory equivalent of facets.count_selection(data).
+        """
+        with self._lock:
+            selected = self._selected(data)
+            created_after = get_created_after(data.get("time"), now)
+            base = None
+            if created_after is not None:
+                base = Bitmap.from_ids(job_id for job_id, created_at in self.created.items() if created_at >= created_after)
+
+            rows = []
+            unfiltered = set()
+            for facet in (TAGS, *FIELDS):
+                scope = base
+                for other, bitmap in selected.items():
+                    if other != facet:
+                        scope = bitmap if scope is None else scope & bitmap
+                if scope is None:
+                    unfiltered.add(facet)
+                    continue
+                # Walk the selected jobs' values: a filtered selection is
+                # usually far smaller than the number of values.
+                counts = Counter(key for job_id in scope for key in self.keys[job_id] if key[0] == facet)
+                rows.extend((facet, value, job_count) for (facet, value), job_count in counts.items())
+            if unfiltered:
+                rows.extend(
+                    (facet, value, len(bitmap)) for (facet, value), bitmap in self.bitmaps.items() if facet in unfiltered
+                )
+        return facets.group_counts(rows)
+
+    def page(self, job_ids, request, paginator):
+        """
+        In-memory equivalent of paginator.paginate_queryset over these jobs in
+        ("-updated_at", "-id") order. Sets paginator.next_cursor and returns
+        the page's job ids.
+        """
+        params = paginator.get_query_params(request)
+        paginator.current_page_size = paginator.get_page_size(request)
+        with self._lock:
+            positions = [self.positions[job_id] for job_id in job_ids]
+        cursor = params.get(paginator.cursor_query_param)
+        if cursor:
+            after = tuple(paginator.decode_cursor(cursor))
+            positions = [position for position in positions if position < after]
+
+        page = heapq.nlargest(paginator.current_page_size + 1, positions)
+        if len(page) > paginator.current_page_size:
+            page = page[:paginator.current_page_size]
+            updated_at, job_id = page[-1]
+            paginator.next_cursor = paginator.encode_cursor({"updated_at": updated_at, "id": job_id})
+        return [job_id for _, job_id in page]
+
+
+index = BitmapIndex()
+
+
+def enabled():
+    return settings.JOB_BITMAP_INDEX
+
+
+def schedule_sync():
+    """
+    Sync the index once the current transaction commits, if it is in use in
+    this process. Call after generation.schedule_bump(), so that the sync
+    runs after the bump and sees the new generation.
+    """
+    if enabled() and index.ready:
+        transaction.on_commit(index.sync)
+
+
+def warm():
+    """
+    Build the index at process start so the first filter request doesn't
+    pay for it.
+    """
+    if not enabled():
+        return
+    try:
+        logger.info("Bitmap index built with %d jobs", index.rebuild())
+    except DatabaseError:
+        logger.exception("Could not build the bitmap index; it will be built on first use")
@@ -0,0 +1,181 @@
+"""
+Set-based writes for the job management endpoints.
+
+Tags are upserted with one INSERT ... ON CONFLICT DO NOTHING plus one
+SELECT, and jobs and their tag links are written in batches. bulk_create
+and bulk_update skip model signals, so the facet index, search index, bitmap index and
+change generation are brought up to date here in one pass.
+
+New jobs are checked against the signatures in jobs.dedup first. A
+near-duplicate of an active job, or of an earlier item in the same request,
+is still created but held back: it is saved inactive with duplicate_of
+pointing at the original, unless its item sets allow_duplicate.
+"""
+from collections import Counter, namedtuple
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import bitmaps, dedup, facets, generation, search
+from .models import Job, Tag
+
+JobTags = Job.tags.through
+
+JobWrite = namedtuple("JobWrite", "index job data tag_names allow_duplicate", defaults=(False,))
+JobWrite.__doc__ = "One validated item: `job` is the existing Job for updates and None for creates."
+
+UPDATE_FIELDS = (
+    "title", "company", "location", "description", "application_link", "job_type", "is_active", "updated_at",
+)
+
+
+def normalize_tag_names(names):
+    normalized = []
+    for name in names:
+        name = name.strip().lower()
+        if name and name not in normalized:
+            normalized.append(name)
+    return normalized
+
+
+def tag_conflicts(names, tags):
+    """
+    Errors for the names that upsert_tags() returned no tag for.
+    """
+    return [f"Tag '{name}' conflicts with an existing tag." for name in names if name not in tags]
+
+
+def upsert_tags(names):
+    """
+    Return {name: Tag} for the given names, creating any that are missing.
+    Names whose slug collides with an existing tag can't be created and are
+    left out of the result.
+    """
+    names = normalize_tag_names(names)
+    if not names:
+        return {}
+    Tag.objects.bulk_create([Tag(name=name, slug=slugify(name)) for name in names], ignore_conflicts=True)
+    return {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+
+
+def _write_batch(user, batch, tags):
+    now = timezone.now()
+    created = Job.objects.bulk_create([Job(posted_by=user, **write.data) for write in batch if write.job is None])
+    created = iter(created)
+
+    saved, updated = [], []
+    for write in batch:
+        if write.job is None:
+            saved.append((write, next(created)))
+            continue
+        for field, value in write.data.items():
+            setattr(write.job, field, value)
+        write.job.updated_at = now
+        updated.append(write.job)
+        saved.append((write, write.job))
+    Job.objects.bulk_update(updated, UPDATE_FIELDS)
+
+    JobTags.objects.filter(job_id__in=[job.pk for job in updated]).delete()
+    JobTags.objects.bulk_create([
+        JobTags(job_id=job.pk, tag_id=tags[name].pk)
+        for write, job in saved
+        for name in write.tag_names
+    ])
+    return saved
+
+
+def flag_duplicates(writes):
+    """
+    Mark new jobs that duplicate an active job, or an earlier write, as
+    inactive duplicates. Returns ``(flagged, signatures)``: {write.index:
+    (Duplicate, requested is_active)}, with Duplicate.position translated
+    to a write index, and {write.index: signature} for the jobs checked so
+    they can be stored without hashing them again.
+    """
+    checked = [write for write in writes if write.job is None and not write.allow_duplicate]
+    signatures = [
+        dedup.signature(write.data["title"], write.data["company"], write.data.get("description")) for write in checked
+    ]
+    matches = dedup.find_duplicates(signatures) if checked else []
+    flagged = {}
+    for write, match in zip(checked, matches):
+        if match is not None:
+            position = None if match.position is None else checked[match.position].index
+            flagged[write.index] = (match._replace(position=position), write.data.get("is_active", True))
+            write.data["is_active"] = False
+    return flagged, {write.index: minhash for write, minhash in zip(checked, signatures)}
+
+
+def bulk_save_jobs(user, writes, batch_size=500):
+    """
+    Create or update jobs inside a single transaction. Each batch runs in a
+    savepoint; if a batch hits a database error its items are retried one
+    by one so only the offending rows fail.
+
+    Returns ``(saved, errors)``: a list of (JobWrite, Job) pairs and a dict
+    of item index -> error details. Jobs held back as duplicates have
+    ``duplicate_of_id`` set.
+    """
+    tags = upsert_tags(name for write in writes for name in write.tag_names)
+    errors = {}
+    pending = []
+    for write in writes:
+        conflicts = tag_conflicts(write.tag_names, tags)
+        if conflicts:
+            errors[write.index] = {"tags": conflicts}
+        else:
+            pending.append(write)
+
+    flagged, signatures = flag_duplicates(pending)
+    update_ids = [write.job.pk for write in pending if write.job is not None]
+    previous = {write.index: facets.job_values(write.job) for write in pending if write.job is not None}
+    previous_tags = {}
+    for job_id, name in JobTags.objects.filter(job_id__in=update_ids).values_list("job_id", "tag__name"):
+        previous_tags.setdefault(job_id, []).append(name)
+
+    saved = []
+    with transaction.atomic():
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                with transaction.atomic():
+                    saved.extend(_write_batch(user, batch, tags))
+                continue
+            except DatabaseError:
+                pass
+            for write in batch:
+                try:
+                    with transaction.atomic():
+                        saved.extend(_write_batch(user, [write], tags))
+                except DatabaseError as exc:
+                    errors[write.index] = {"non_field_errors": [str(exc)]}
+
+        duplicates = []
+        saved_ids = {write.index: job.pk for write, job in saved}
+        for write, job in saved:
+            if write.index not in flagged:
+                continue
+            match, is_active = flagged[write.index]
+            job.duplicate_of_id = match.job_id if match.position is None else saved_ids.get(match.position)
+            if job.duplicate_of_id is None:
+                # The original failed to save, so this one stands on its own.
+                job.is_active = is_active
+            duplicates.append(job)
+        Job.objects.bulk_update(duplicates, ["duplicate_of", "is_active"])
+
+        delta = Counter()
+        for write, job in saved:
+            delta.update(facets.job_contribution(facets.job_values(job), write.tag_names))
+            delta.subtract(facets.job_contribution(previous.get(write.index), previous_tags.get(job.pk, [])))
+        facets.apply_delta(delta)
+        search.index_jobs(job.pk for _, job in saved)
+        dedup.index_jobs(
+            (job.pk for _, job in saved),
+            {job.pk: signatures[write.index] for write, job in saved if write.index in signatures},
+        )
+        if saved:
+            generation.schedule_bump()
+        bitmaps.schedule_sync()
+
+    return saved, errors
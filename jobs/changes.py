@@ -0,0 +1,106 @@
+"""
+Incremental sync feed: the jobs created, updated, deactivated or deleted
+since a client's cursor.
+
+The cursor holds two keyset positions. One is (updated_at, id) over
+jobs_job, which covers creates, edits and deactivations; tag changes bump
+updated_at too. The other is (deleted_at, id) over the tombstones that
+job_deleted writes. Each page advances both, so a client that stores
+``next`` and calls again only ever reads what changed.
+
+Only changes older than JOB_CHANGES_SETTLE_SECONDS are served. updated_at
+is stamped before a transaction commits, and without the delay a slow
+transaction could commit behind a cursor that has already moved past it.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+from .models import Job, JobTombstone
+from .serializers import JobListFastSerializer
+
+INVALID_CURSOR = "Invalid cursor"
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class CursorExpired(Exception):
+    """
+    The cursor is older than the tombstone retention window, so deletions
+    may have been pruned; the client has to start over.
+    """
+
+
+def encode_cursor(job_position, tombstone_position):
+    position = [job_position[0].isoformat(), job_position[1], tombstone_position[0].isoformat(), tombstone_position[1]]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        updated_at, job_id, deleted_at, tombstone_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        updated_at, deleted_at = parse_datetime(updated_at), parse_datetime(deleted_at)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise NotFound(INVALID_CURSOR)
+    if None in (updated_at, deleted_at) or not isinstance(job_id, int) or not isinstance(tombstone_id, int):
+        raise NotFound(INVALID_CURSOR)
+    return (updated_at, job_id), (deleted_at, tombstone_id)
+
+
+def after(position, time_field):
+    moment, pk = position
+    return Q(**{f"{time_field}__gt": moment}) | Q(**{time_field: moment, "id__gt": pk})
+
+
+def changes_since(cursor=None, limit=100, now=None):
+    now = now or timezone.now()
+    settled = now - timedelta(seconds=settings.JOB_CHANGES_SETTLE_SECONDS)
+    if cursor:
+        job_position, tombstone_position = decode_cursor(cursor)
+        if tombstone_position[0] < now - timedelta(days=settings.JOB_TOMBSTONE_RETENTION_DAYS):
+            raise CursorExpired()
+    else:
+        # A new client reads every existing job, so only deletions from
+        # here on concern it.
+        job_position, tombstone_position = (EPOCH, 0), (settled, 0)
+
+    jobs = Job.objects.filter(after(job_position, "updated_at"), updated_at__lte=settled)
+    rows = list(JobListFastSerializer.get_rows(jobs.order_by("updated_at", "id"), "is_active")[:limit + 1])
+    tombstones = list(
+        JobTombstone.objects.filter(after(tombstone_position, "deleted_at"), deleted_at__lte=settled)
+        .order_by("deleted_at", "id")
+        .values_list("id", "job_id", "deleted_at")[:limit + 1]
+    )
+    has_more = len(rows) > limit or len(tombstones) > limit
+    rows, tombstones = rows[:limit], tombstones[:limit]
+
+    active_rows = [row for row in rows if row["is_active"]]
+    serialized = {job["id"]: job for job in JobListFastSerializer(active_rows).data}
+    changes = [
+        {"id": row["id"], "action": "upsert", "job": serialized[row["id"]]} if row["is_active"]
+        else {"id": row["id"], "action": "deactivate", "job": None}
+        for row in rows
+    ]
+    changes.extend({"id": job_id, "action": "delete", "job": None} for _, job_id, _ in tombstones)
+
+    if rows:
+        job_position = (rows[-1]["updated_at"], rows[-1]["id"])
+    if tombstones:
+        tombstone_position = (tombstones[-1][2], tombstones[-1][0])
+    if len(tombstones) < limit:
+        # Caught up on deletions: move up to the settled point so a client
+        # that saw none recently isn't taken for an expired one.
+        tombstone_position = max(tombstone_position, (settled, 0))
+    return {"changes": changes, "next": encode_cursor(job_position, tombstone_position), "has_more": has_more}
+
+
+def prune_tombstones(days=None):
+    days = settings.JOB_TOMBSTONE_RETENTION_DAYS if days is None else days
+    deleted, _ = JobTombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
@@ -0,0 +1,189 @@
+"""
+Near-duplicate detection for new jobs with MinHash and locality-sensitive
+hashing.
+
+A job's text (title, company and description, lowercased, punctuation
+dropped) is cut into overlapping word shingles. Its MinHash signature is
+NUM_PERM minimum hash values over those shingles; two signatures agree in a
+fraction of positions that estimates the Jaccard similarity of the shingle
+sets. Signatures are stored per job in JobSignature and kept current by
+jobs.signals and the bulk write path.
+
+For sub-linear lookups the signature is split into BANDS bands of ROWS
+values, and each band is hashed into a bucket stored in JobSignatureBand
+under a (band, bucket) index. Jobs that share any bucket with a new job are
+its candidates: with 16 bands of 4 rows, a pair at similarity 0.8 becomes a
+candidate with probability 1 - (1 - 0.8^4)^16 > 0.99, a pair at 0.3 with
+under 0.13. Candidates are then confirmed by comparing full signatures
+against JOB_DUPLICATE_THRESHOLD.
+"""
+import hashlib
+import random
+import re
+import struct
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Job, JobSignature, JobSignatureBand
+
+# The job fields a signature is computed from.
+TEXT_FIELDS = ("title", "company", "description")
+SHINGLE_SIZE = 3
+BANDS = 16
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+LOOKUP_BATCH_SIZE = 500
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+# Fixed seed: stored signatures must stay comparable across processes and
+# deploys.
+_random = random.Random(1)
+PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+SIGNATURE_FORMAT = f"<{NUM_PERM}I"
+
+Duplicate = namedtuple("Duplicate", "job_id position similarity")
+Duplicate.__doc__ = (
+    "A near-duplicate of a new job: an existing job (`job_id`), or an earlier item of the same batch (`position`)."
+)
+
+
+def shingles(title, company, description=""):
+    words = re.findall(r"\w+", f"{title} {company} {description or ''}".lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[start:start + SHINGLE_SIZE]) for start in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+
+
+def signature(title, company, description=""):
+    hashes = [_hash(shingle.encode()) for shingle in shingles(title, company, description)]
+    return [min(((a * value + b) % _PRIME) & _MASK for value in hashes) for a, b in PERMUTATIONS]
+
+
+def bands(minhash):
+    """
+    (band, bucket) pairs for a signature.
+    """
+    return [
+        (band, _hash(struct.pack(f"<{ROWS}I", *minhash[band * ROWS:(band + 1) * ROWS])) - (1 << 63))
+        for band in range(BANDS)
+    ]
+
+
+def similarity(first, second):
+    return sum(a == b for a, b in zip(first, second)) / NUM_PERM
+
+
+def pack(minhash):
+    return struct.pack(SIGNATURE_FORMAT, *minhash)
+
+
+def unpack(data):
+    return list(struct.unpack(SIGNATURE_FORMAT, bytes(data)))
+
+
+def index_jobs(job_ids, signatures=None):
+    """
+    Store the signatures of these jobs. ``signatures`` may hold ones
+    already computed, as {job_id: signature}; the rest are computed from
+    the stored jobs.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    signatures = {job_id: minhash for job_id, minhash in (signatures or {}).items() if job_id in job_ids}
+    missing = [job_id for job_id in job_ids if job_id not in signatures]
+    if missing:
+        signatures.update(
+            (job_id, signature(title, company, description))
+            for job_id, title, company, description in Job.objects.filter(pk__in=missing).values_list(
+                "id", "title", "company", "description"
+            )
+        )
+    with transaction.atomic():
+        JobSignatureBand.objects.filter(job_id__in=job_ids).delete()
+        JobSignature.objects.filter(job_id__in=job_ids).delete()
+        JobSignature.objects.bulk_create([JobSignature(job_id=job_id, minhash=pack(minhash)) for job_id, minhash in signatures.items()])
+        JobSignatureBand.objects.bulk_create([
+            JobSignatureBand(job_id=job_id, band=band, bucket=bucket)
+            for job_id, minhash in signatures.items()
+            for band, bucket in bands(minhash)
+        ], batch_size=1000)
+
+
+def _candidates(keys):
+    """
+    {(band, bucket): [job ids]} over active jobs for the given keys.
+    """
+    found = {}
+    buckets = sorted({bucket for _, bucket in keys})
+    for start in range(0, len(buckets), LOOKUP_BATCH_SIZE):
+        rows = JobSignatureBand.objects.filter(
+            bucket__in=buckets[start:start + LOOKUP_BATCH_SIZE], job__is_active=True
+        ).values_list("band", "bucket", "job_id")
+        for band, bucket, job_id in rows:
+            if (band, bucket) in keys:
+                found.setdefault((band, bucket), []).append(job_id)
+    return found
+
+
+def _signatures(job_ids):
+    job_ids = sorted(job_ids)
+    stored = {}
+    for start in range(0, len(job_ids), LOOKUP_BATCH_SIZE):
+        rows = JobSignature.objects.filter(job_id__in=job_ids[start:start + LOOKUP_BATCH_SIZE]).values_list("job_id", "minhash")
+        stored.update((job_id, unpack(minhash)) for job_id, minhash in rows)
+    return stored
+
+
+def find_duplicates(signatures, threshold=None):
+    """
+    The closest near-duplicate of each signature, or None, as a list in the
+    same order. Existing active jobs are checked first; failing that, an
+    earlier signature of the same list counts too, so a batch can't add the
+    same job twice.
+    """
+    threshold = settings.JOB_DUPLICATE_THRESHOLD if threshold is None else threshold
+    item_bands = [bands(minhash) for minhash in signatures]
+    candidates = _candidates({key for keys in item_bands for key in keys})
+    stored = _signatures({job_id for job_ids in candidates.values() for job_id in job_ids})
+
+    duplicates = []
+    earlier = {}
+    for position, (minhash, keys) in enumerate(zip(signatures, item_bands)):
+        best = None
+        for job_id in {job_id for key in keys for job_id in candidates.get(key, ())}:
+            score = similarity(minhash, stored[job_id])
+            if score >= threshold and (best is None or score > best.similarity):
+                best = Duplicate(job_id, None, score)
+        if best is None:
+            for other in {other for key in keys for other in earlier.get(key, ())}:
+                score = similarity(minhash, signatures[other])
+                if score >= threshold and (best is None or score > best.similarity):
+                    best = Duplicate(None, other, score)
+        duplicates.append(best)
+        for key in keys:
+            earlier.setdefault(key, []).append(position)
+    return duplicates
+
+
+def backfill(batch_size=1000):
+    """
+    Store signatures for every job, one batch at a time. Returns the number
+    of jobs indexed.
+    """
+    indexed = 0
+    last_id = 0
+    while True:
+        job_ids = list(Job.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not job_ids:
+            return indexed
+        last_id = job_ids[-1]
+        index_jobs(job_ids)
+        indexed += len(job_ids)
@@ -0,0 +1,149 @@
+"""
+Denormalized engagement counters per job, so analytics never aggregate
+UserJobMapping on read.
+
+jobs.activity.apply_events() hands every status transition to
+apply_transitions() in the same transaction. A transition adds one to each
+funnel level it passes, on the job's totals (JobEngagement) and on today's
+rollup row (JobEngagementDay), using F() updates so concurrent writers
+never lose increments.
+
+Mappings changed any other way (deleted with their user, or edited in the
+admin) go through apply_changes(), which adjusts the totals only: daily
+rows are history. `manage.py reconcile_engagement` recomputes the totals
+from UserJobMapping, to backfill activity recorded before the counters
+existed.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, When
+from django.utils import timezone
+
+from .models import Job, JobEngagement, JobEngagementDay, UserJobMapping
+
+Status = UserJobMapping.Status
+
+# Funnel levels from the widest to the narrowest, in STATUS_PRECEDENCE order.
+FUNNEL = (
+    ("click_count", Status.CLICKED),
+    ("bookmark_count", Status.BOOKMARKED),
+    ("apply_count", Status.APPLIED),
+)
+COUNTERS = tuple(counter for counter, _ in FUNNEL)
+LEVELS = {status: level for level, (_, status) in enumerate(FUNNEL)}
+
+
+def transition_delta(old_status, new_status):
+    """
+    Per-counter changes for a mapping moving from old_status to new_status,
+    either of which is None for a missing mapping.
+    """
+    old_level = -1 if old_status is None else LEVELS[old_status]
+    new_level = -1 if new_status is None else LEVELS[new_status]
+    return [(level <= new_level) - (level <= old_level) for level in range(len(FUNNEL))]
+
+
+def _deltas(transitions):
+    deltas = {}
+    for job_id, old_status, new_status in transitions:
+        delta = deltas.setdefault(job_id, [0] * len(COUNTERS))
+        for index, change in enumerate(transition_delta(old_status, new_status)):
+            delta[index] += change
+    return {job_id: delta for job_id, delta in deltas.items() if any(delta)}
+
+
+def add_counts(queryset, deltas):
+    """
+    Add {job_id: [increments]} to the counter rows in ``queryset`` with one
+    UPDATE.
+    """
+    updates = {}
+    for index, counter in enumerate(COUNTERS):
+        cases = [When(job_id=job_id, then=F(counter) + delta[index]) for job_id, delta in deltas.items() if delta[index]]
+        if cases:
+            updates[counter] = Case(*cases, default=F(counter), output_field=IntegerField())
+    if updates:
+        queryset.filter(job_id__in=deltas).update(**updates)
+
+
+def apply_transitions(transitions, day=None):
+    """
+    Count (job_id, old_status, new_status) transitions, as returned by
+    activity.apply_events(). Must run inside the same transaction.
+    """
+    deltas = _deltas(transitions)
+    if not deltas:
+        return
+
+    day = day or timezone.localdate()
+    JobEngagement.objects.bulk_create([JobEngagement(job_id=job_id) for job_id in deltas], ignore_conflicts=True)
+    add_counts(JobEngagement.objects.all(), deltas)
+    JobEngagementDay.objects.bulk_create([JobEngagementDay(job_id=job_id, day=day) for job_id in deltas], ignore_conflicts=True)
+    add_counts(JobEngagementDay.objects.filter(day=day), deltas)
+
+
+def apply_changes(changes):
+    """
+    Adjust the totals for (job_id, old_status, new_status) mapping changes
+    made outside apply_events(), with None for a missing mapping.
+    """
+    deltas = _deltas(changes)
+    if deltas:
+        JobEngagement.objects.bulk_create([JobEngagement(job_id=job_id) for job_id in deltas], ignore_conflicts=True)
+        add_counts(JobEngagement.objects.all(), deltas)
+
+
+def remove_mappings(mappings):
+    """
+    Take these UserJobMapping rows out of the totals before they are
+    deleted.
+    """
+    apply_changes((job_id, status, None) for job_id, status in mappings.values_list("job_id", "status"))
+
+
+def count_mappings(job_ids):
+    """
+    The counters' true values for these jobs, from UserJobMapping.
+    """
+    at_least = {
+        counter: Count("id", filter=Q(status__in=[status for status, level in LEVELS.items() if level >= LEVELS[minimum]]))
+        for counter, minimum in FUNNEL
+    }
+    rows = UserJobMapping.objects.filter(job_id__in=job_ids).values("job_id").annotate(**at_least).order_by()
+    return {row["job_id"]: [row[counter] for counter in COUNTERS] for row in rows}
+
+
+def reconcile(batch_size=1000):
+    """
+    Recompute the totals from UserJobMapping, one batch of jobs per
+    transaction. Returns the number of jobs whose counters were repaired.
+    """
+    repaired = 0
+    last_id = 0
+    while True:
+        job_ids = list(Job.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not job_ids:
+            return repaired
+        last_id = job_ids[-1]
+        with transaction.atomic():
+            # Locking the counter rows first makes concurrent increments wait
+            # until the recount has been written.
+            stored = {
+                row.job_id: row
+                for row in JobEngagement.objects.select_for_update().filter(job_id__in=job_ids)
+            }
+            actual = count_mappings(job_ids)
+            changed = []
+            for job_id in job_ids:
+                counts = actual.get(job_id, [0] * len(COUNTERS))
+                row = stored.get(job_id)
+                if row is None:
+                    if any(counts):
+                        changed.append(JobEngagement(job_id=job_id, **dict(zip(COUNTERS, counts))))
+                elif [getattr(row, counter) for counter in COUNTERS] != counts:
+                    for counter, value in zip(COUNTERS, counts):
+                        setattr(row, counter, value)
+                    changed.append(row)
+            JobEngagement.objects.bulk_create(
+                changed, update_conflicts=True, unique_fields=["job"], update_fields=[*COUNTERS, "updated_at"],
+            )
+            repaired += len(changed)
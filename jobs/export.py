@@ -0,0 +1,112 @@
+"""
+Streaming export of the active catalogue as NDJSON or CSV.
+
+Jobs are read in id order with QuerySet.iterator(), and the tags for each
+chunk are read in one query, so memory stays at one chunk whatever the
+catalogue size. Each chunk is written out as soon as it is serialized.
+
+Under ASGI a synchronous iterator is collected in full before the first
+byte goes out, so async deployments use aiter_export() instead. It pages by
+id with one query per chunk.
+"""
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+from .models import Job
+from .serializers import JobListFastSerializer
+
+CHUNK_SIZE = 1000
+CSV_COLUMNS = ("id", "title", "company", "location", "job_type", "posted_by", "tags", "created_at", "updated_at")
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only used for error payloads; exports are streamed.
+        return (json.dumps(data) + "\n").encode()
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only used for error payloads, as a one-row table.
+        return format_csv([list(data), [str(value) for value in data.values()]]).encode()
+
+
+RENDERERS = {renderer.format: renderer for renderer in (NDJSONRenderer, CSVRenderer)}
+
+
+def content_headers(export_format):
+    renderer = RENDERERS[export_format]
+    return {
+        "Content-Type": f"{renderer.media_type}; charset={renderer.charset}",
+        "Content-Disposition": f'attachment; filename="jobs.{export_format}"',
+    }
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def format_csv(rows):
+    writer = csv.writer(Echo())
+    return "".join(writer.writerow(row) for row in rows)
+
+
+def csv_row(job):
+    posted_by = f"{job['posted_by']['first_name']} {job['posted_by']['last_name']}".strip()
+    tags = "|".join(tag["name"] for tag in job["tags"])
+    return [job["id"], job["title"], job["company"], job["location"] or "", job["job_type"], posted_by, tags,
+            job["created_at"], job["updated_at"]]
+
+
+def format_chunk(jobs, export_format):
+    if export_format == "csv":
+        return format_csv(csv_row(job) for job in jobs).encode()
+    return "".join(json.dumps(job, ensure_ascii=False) + "\n" for job in jobs).encode()
+
+
+def serialize_chunk(rows, export_format):
+    serializer = JobListFastSerializer(rows)
+    tags = serializer.group_tags(serializer.get_tag_links([row["id"] for row in rows]))
+    return format_chunk(serializer.serialize(rows, tags), export_format)
+
+
+def export_rows():
+    return JobListFastSerializer.get_rows(Job.objects.filter(is_active=True).order_by("id"))
+
+
+def iter_export(export_format, chunk_size=CHUNK_SIZE):
+    if export_format == "csv":
+        yield format_csv([CSV_COLUMNS]).encode()
+    chunk = []
+    for row in export_rows().iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield serialize_chunk(chunk, export_format)
+            chunk = []
+    if chunk:
+        yield serialize_chunk(chunk, export_format)
+
+
+async def aiter_export(export_format, chunk_size=CHUNK_SIZE):
+    if export_format == "csv":
+        yield format_csv([CSV_COLUMNS]).encode()
+    last_id = 0
+    while True:
+        rows = [row async for row in export_rows().filter(id__gt=last_id)[:chunk_size]]
+        if not rows:
+            return
+        last_id = rows[-1]["id"]
+        serializer = JobListFastSerializer(rows)
+        tags = serializer.group_tags([link async for link in serializer.get_tag_links([row["id"] for row in rows])])
+        yield format_chunk(serializer.serialize(rows, tags), export_format)
@@ -0,0 +1,228 @@
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, When
+from django.db.models.functions import Greatest
+
+from .filters import get_created_after, get_list
+from .models import FacetValue, Job, Tag
+
+JOB_FIELDS = ("title", "company", "location", "is_active")
+SCALAR_FACETS = ("title", "company", "location")
+TIME_FILTERS = ["last_6", "last_24", "this_week", "this_month", "all"]
+
+# Facets that get drill-down counts, with the column each one groups by.
+COUNT_COLUMNS = {
+    "title": "j.title",
+    "company": "j.company",
+    "location": "j.location",
+    "job_type": "j.job_type",
+    "tags": "t.name",
+}
+TAG_FILTER_SQL = (
+    "EXISTS (SELECT 1 FROM jobs_job_tags ft INNER JOIN jobs_tag ftag ON ftag.id = ft.tag_id"
+    " WHERE ft.job_id = j.id AND ftag.name IN ({}))"
+)
+POSTGRES_COUNTS_SQL = """
+    SELECT GROUPING({columns}), {columns}, {counts}
+    FROM jobs_job j
+    LEFT JOIN jobs_job_tags jt ON jt.job_id = j.id
+    LEFT JOIN jobs_tag t ON t.id = jt.tag_id
+    WHERE {where}
+    GROUP BY GROUPING SETS ({sets})
+"""
+FALLBACK_FACET_SQL = "SELECT %s, {column}, COUNT(*) FROM jobs_job j WHERE {where} GROUP BY {column}"
+FALLBACK_TAGS_SQL = (
+    "SELECT %s, t.name, COUNT(DISTINCT j.id) FROM jobs_job j"
+    " INNER JOIN jobs_job_tags jt ON jt.job_id = j.id INNER JOIN jobs_tag t ON t.id = jt.tag_id"
+    " WHERE {where} GROUP BY t.name"
+)
+
+
+def job_values(job):
+    return {field: getattr(job, field) for field in JOB_FIELDS}
+
+
+def job_contribution(values, tag_names=()):
+    """
+    Facet values a job contributes to the index, as a Counter keyed by
+    (facet, value). Inactive jobs contribute nothing.
+    """
+    contribution = Counter()
+    if not values or not values.get("is_active"):
+        return contribution
+    for facet in SCALAR_FACETS:
+        if values.get(facet):
+            contribution[(facet, values[facet])] += 1
+    for name in tag_names:
+        contribution[(FacetValue.Facet.TAGS.value, name)] += 1
+    return contribution
+
+
+def apply_delta(delta, batch_size=500):
+    """
+    Apply a Counter of (facet, value) -> change to the index with a fixed
+    number of statements per batch of values. Values whose count drops to
+    zero are removed so reads never see them.
+    """
+    changes = [(key, change) for key, change in delta.items() if change]
+    with transaction.atomic():
+        for start in range(0, len(changes), batch_size):
+            batch = changes[start:start + batch_size]
+            keys = Q()
+            for (facet, value), _ in batch:
+                keys |= Q(facet=facet, value=value)
+
+            FacetValue.objects.bulk_create(
+                [FacetValue(facet=facet, value=value, job_count=0) for (facet, value), change in batch if change > 0],
+                ignore_conflicts=True,
+            )
+            new_count = Case(
+                *[When(facet=facet, value=value, then=F("job_count") + change) for (facet, value), change in batch],
+                default=F("job_count"),
+                output_field=IntegerField(),
+            )
+            FacetValue.objects.filter(keys).update(job_count=Greatest(new_count, 0, output_field=IntegerField()))
+            FacetValue.objects.filter(keys, job_count=0).delete()
+
+
+def build_filters_data(rows):
+    filters_data = {facet: [] for facet in FacetValue.Facet.values}
+    for facet, value in rows:
+        filters_data[facet].append(value)
+    filters_data["job_type"] = [choice[0] for choice in Job.JobType.choices]
+    filters_data["time"] = TIME_FILTERS
+    return filters_data
+
+
+def get_filters_data():
+    return build_filters_data(FacetValue.objects.values_list("facet", "value"))
+
+
+async def aget_filters_data():
+    return build_filters_data([row async for row in FacetValue.objects.values_list("facet", "value")])
+
+
+def count_active_values():
+    counts = Counter()
+    active_jobs = Job.objects.filter(is_active=True)
+    for facet in SCALAR_FACETS:
+        rows = (
+            active_jobs.exclude(**{f"{facet}__isnull": True})
+            .exclude(**{facet: ""})
+            .values_list(facet)
+            .annotate(job_count=Count("id"))
+            .order_by()
+        )
+        for value, job_count in rows:
+            counts[(facet, value)] = job_count
+
+    rows = Tag.objects.filter(jobs__is_active=True).values_list("name").annotate(job_count=Count("jobs")).order_by()
+    for name, job_count in rows:
+        counts[(FacetValue.Facet.TAGS.value, name)] = job_count
+    return counts
+
+
+def rebuild():
+    counts = count_active_values()
+    with transaction.atomic():
+        FacetValue.objects.all().delete()
+        FacetValue.objects.bulk_create(
+            [FacetValue(facet=facet, value=value, job_count=job_count) for (facet, value), job_count in counts.items()],
+            batch_size=1000,
+        )
+    return len(counts)
+
+
+def selection_conditions(data):
+    """
+    SQL conditions over jobs_job AS j for each facet filter in ``data``,
+    matching filter_jobs.
+    """
+    conditions = {}
+    for facet in COUNT_COLUMNS:
+        values = get_list(data, facet)
+        if not values:
+            continue
+        # Like Django's __in lookup: NULL never matches, so [None] matches nothing.
+        values = [str(value) for value in values if value is not None]
+        if not values:
+            conditions[facet] = ("1 = 0", [])
+            continue
+        placeholders = ", ".join(["%s"] * len(values))
+        sql = TAG_FILTER_SQL.format(placeholders) if facet == "tags" else f"{COUNT_COLUMNS[facet]} IN ({placeholders})"
+        conditions[facet] = (sql, values)
+    return conditions
+
+
+def _combine(conditions, exclude=None):
+    parts = [(sql, params) for facet, (sql, params) in conditions.items() if facet != exclude]
+    return " AND ".join(sql for sql, _ in parts) or "1 = 1", [param for _, params in parts for param in params]
+
+
+def group_counts(rows):
+    """
+    {facet: {value: count}} from (facet, value, count) rows, busiest values
+    first; blank values and zero counts are left out like in the facet index.
+    """
+    counts = {facet: {} for facet in COUNT_COLUMNS}
+    for facet, value, job_count in sorted(rows, key=lambda row: (-row[2], row[1] or "")):
+        if value and job_count:
+            counts[facet][value] = job_count
+    return counts
+
+
+def count_selection(data):
+    """
+    Drill-down counts for the current selection: for each facet, the number
+    of matching active jobs per value, with every filter applied except the
+    facet's own. One statement either way: GROUPING SETS on PostgreSQL, a
+    UNION ALL of per-facet GROUP BYs elsewhere.
+    """
+    conditions = selection_conditions(data)
+    base, base_params = "j.is_active = %s", [True]
+    created_after = get_created_after(data.get("time"))
+    if created_after is not None:
+        base += " AND j.created_at >= %s"
+        base_params.append(connection.ops.adapt_datetimefield_value(created_after))
+
+    if connection.vendor == "postgresql":
+        counts, count_params = [], []
+        for facet in COUNT_COLUMNS:
+            others, params = _combine(conditions, exclude=facet)
+            counts.append(f"COUNT(DISTINCT j.id) FILTER (WHERE {others})")
+            count_params.extend(params)
+        columns = list(COUNT_COLUMNS.values())
+        sql = POSTGRES_COUNTS_SQL.format(
+            columns=", ".join(columns),
+            counts=", ".join(counts),
+            where=base,
+            sets=", ".join(f"({column})" for column in columns),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, count_params + base_params)
+            result = cursor.fetchall()
+        # GROUPING() sets one bit per column that is *not* grouped, with the
+        # first column as the most significant bit.
+        all_bits = (1 << len(columns)) - 1
+        facet_by_grouping = {all_bits ^ (1 << (len(columns) - 1 - i)): i for i in range(len(columns))}
+        facets = list(COUNT_COLUMNS)
+        rows = []
+        for row in result:
+            i = facet_by_grouping[row[0]]
+            rows.append((facets[i], row[1 + i], row[1 + len(columns) + i]))
+        return group_counts(rows)
+
+    selects, params = [], []
+    for facet, column in COUNT_COLUMNS.items():
+        others, other_params = _combine(conditions, exclude=facet)
+        template = FALLBACK_TAGS_SQL if facet == "tags" else FALLBACK_FACET_SQL
+        selects.append(template.format(column=column, where=f"{base} AND {others}"))
+        params.extend([facet, *base_params, *other_params])
+    with connection.cursor() as cursor:
+        cursor.execute(" UNION ALL ".join(selects), params)
+        return group_counts(cursor.fetchall())
+
+
+acount_selection = sync_to_async(count_selection)
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+
+def get_list(data, key):
+    """
+    Read a multi-valued filter from either a JSON body (list or single value)
+    or a QueryDict (repeated query parameters).
+    """
+    if hasattr(data, "getlist"):
+        return data.getlist(key)
+    value = data.get(key, [])
+    return value if isinstance(value, list) else [value]
+
+
+TIME_WINDOWS = {
+    "last_6": timedelta(hours=6),
+    "last_24": timedelta(hours=24),
+    "this_week": timedelta(days=7),
+    "this_month": timedelta(days=30),
+}
+
+
+def get_created_after(time_filter, now=None):
+    window = TIME_WINDOWS.get(time_filter) if isinstance(time_filter, str) else None
+    if window is None:
+        return None
+    return (now or timezone.now()) - window
+
+
+def filter_jobs(queryset, data):
+    """
+    Apply the job filter parameters (tags, title, company, location,
+    job_type, time) shared by the filter and search endpoints.
+    """
+    filters = {}
+    tags = get_list(data, "tags")
+    titles = get_list(data, "title")
+    companies = get_list(data, "company")
+    locations = get_list(data, "location")
+    job_types = get_list(data, "job_type")
+    time_filter = data.get("time", None)
+
+    if job_types:
+        filters["job_type__in"] = job_types
+    if locations:
+        filters["location__in"] = locations
+    if companies:
+        filters["company__in"] = companies
+    if titles:
+        filters["title__in"] = titles
+    if tags:
+        filters["tags__name__in"] = tags
+
+    queryset = queryset.filter(**filters)
+
+    created_after = get_created_after(time_filter)
+    if created_after is not None:
+        queryset = queryset.filter(created_at__gte=created_after)
+
+    if tags:
+        queryset = queryset.distinct()
+    return queryset
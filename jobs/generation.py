@@ -0,0 +1,44 @@
+"""
+Change-generation counter for the public job catalogue.
+
+Every write that can change what the job read endpoints return bumps the
+counter, so a client's cached copy is current exactly when the generation
+it was served with is still the latest one.
+
+Writers call schedule_bump(), which bumps once their transaction commits:
+the counter is a single row, and bumping inside the transaction would hold
+its lock until the commit, serializing every concurrent writer on it.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ChangeCounter
+
+CATALOG = "jobs"
+
+
+def current():
+    return ChangeCounter.objects.filter(name=CATALOG).values_list("value", flat=True).first() or 0
+
+
+async def acurrent():
+    return await ChangeCounter.objects.filter(name=CATALOG).values_list("value", flat=True).afirst() or 0
+
+
+def bump():
+    counter = ChangeCounter.objects.filter(name=CATALOG)
+    if counter.update(value=F("value") + 1, updated_at=timezone.now()):
+        return
+    _, created = ChangeCounter.objects.get_or_create(name=CATALOG, defaults={"value": 1})
+    if not created:
+        counter.update(value=F("value") + 1, updated_at=timezone.now())
+
+
+def schedule_bump():
+    """
+    Bump the counter once the current transaction commits (right away
+    outside one). Callbacks registered after this one, such as
+    bitmaps.schedule_sync(), see the new generation.
+    """
+    transaction.on_commit(bump)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs import archive
+
+
+class Command(BaseCommand):
+    help = "Move expired and long-inactive jobs, with their user activity, to the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        archived = archive.archive_jobs(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} jobs."))
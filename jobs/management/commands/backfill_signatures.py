@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs import dedup
+
+
+class Command(BaseCommand):
+    help = "Compute the near-duplicate (MinHash) signatures of every job."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        indexed = dedup.backfill(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed signatures for {indexed} jobs."))
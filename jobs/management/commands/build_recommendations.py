@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import recommend
+
+
+class Command(BaseCommand):
+    help = "Fit the for-you feed model on current interactions and write it for the web workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep rebuilding until interrupted.")
+        parser.add_argument("--interval", type=float, default=900.0, help="Seconds between builds.")
+
+    def handle(self, *args, **options):
+        while True:
+            jobs, users = recommend.build()
+            self.stdout.write(f"Fitted {jobs} jobs and {users} users.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import similar
+
+
+class Command(BaseCommand):
+    help = "Build the similar jobs index, re-reading only jobs changed since the last build."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Recompute the vocabulary and IDF from scratch.")
+        parser.add_argument("--loop", action="store_true", help="Keep rebuilding until interrupted.")
+        parser.add_argument("--interval", type=float, default=60.0, help="Seconds between builds.")
+
+    def handle(self, *args, **options):
+        full = options["full"]
+        while True:
+            indexed, read = similar.build(full=full)
+            self.stdout.write(f"Indexed {indexed} jobs ({read} re-read).")
+            if not options["loop"]:
+                return
+            full = False
+            time.sleep(options["interval"])
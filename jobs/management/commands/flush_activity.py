@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import activity
+
+
+class Command(BaseCommand):
+    help = "Fold buffered job activity events into UserJobMapping."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep flushing until interrupted.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep when the buffer is empty.")
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            total = 0
+            while True:
+                flushed = activity.flush(options["batch_size"])
+                total += flushed
+                if not flushed:
+                    break
+            if total or not options["loop"]:
+                self.stdout.write(f"Flushed {total} activity events.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
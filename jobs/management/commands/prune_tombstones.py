@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs import changes
+
+
+class Command(BaseCommand):
+    help = "Delete job tombstones older than the changes feed retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Defaults to JOB_TOMBSTONE_RETENTION_DAYS.")
+
+    def handle(self, *args, **options):
+        deleted = changes.prune_tombstones(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} job tombstones."))
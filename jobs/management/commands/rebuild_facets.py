@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs import facets
+
+
+class Command(BaseCommand):
+    help = "Rebuild the filter facet index from the active jobs."
+
+    def handle(self, *args, **options):
+        total = facets.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt facet index with {total} values."))
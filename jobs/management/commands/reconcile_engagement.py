@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs import engagement
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-job engagement counters from UserJobMapping."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        repaired = engagement.reconcile(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Repaired engagement counters for {repaired} jobs."))
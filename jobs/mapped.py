@@ -0,0 +1,78 @@
+"""
+Read-only array files shared by every worker through the page cache.
+
+A file is a fixed-size header followed by flat arrays (array type codes)
+and optional trailing bytes. Builders write it with write(), which replaces
+the file atomically; readers map it with open_sections() and get memoryviews
+over the mapping, so nothing is copied into the process. MappedFile keeps
+one mapping per process and re-maps the file when a build replaces it. See
+jobs/similar.py and jobs/recommend.py.
+"""
+import mmap
+import os
+import threading
+from array import array
+
+from django.conf import settings
+
+
+def write(path, header, header_size, sections, trailer=b""):
+    """
+    Write ``header`` padded to ``header_size``, the arrays in ``sections``
+    and ``trailer`` to ``path``, replacing it atomically.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(header.ljust(header_size, b"\0"))
+        for section in sections:
+            section.tofile(file)
+        file.write(trailer)
+    os.replace(temporary, path)
+
+
+def open_sections(path, magic, header, header_size, layout):
+    """
+    Map ``path`` and return (header fields, [memoryview per section],
+    trailing bytes view). ``header`` is a struct.Struct whose first field
+    must equal ``magic``; ``layout`` is a function of the header fields
+    giving [(type code, length)] in file order. The views keep the mapping
+    alive.
+    """
+    with open(path, "rb") as file:
+        view = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    fields = header.unpack_from(view)
+    if fields[0] != magic:
+        raise ValueError(f"{path} is not a {magic.decode()} file")
+    offset = header_size
+    sections = []
+    for code, length in layout(fields):
+        size = length * array(code).itemsize
+        sections.append(view[offset:offset + size].cast(code))
+        offset += size
+    return fields, sections, view[offset:]
+
+
+class MappedFile:
+    """
+    This process's mapping of the file named by a setting, loaded with
+    ``loader(path)``, or None while the file doesn't exist. Re-mapped when
+    the file has been replaced.
+    """
+    def __init__(self, setting, loader):
+        self.setting = setting
+        self.loader = loader
+        self._loaded = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        path = getattr(settings, self.setting)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = (path, stat.st_ino, stat.st_mtime_ns)
+        with self._lock:
+            if self._loaded is None or self._loaded[0] != key:
+                self._loaded = (key, self.loader(path))
+            return self._loaded[1]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:16
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_facets(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Tag = apps.get_model('jobs', 'Tag')
+    FacetValue = apps.get_model('jobs', 'FacetValue')
+
+    rows = []
+    active_jobs = Job.objects.filter(is_active=True)
+    for facet in ('title', 'company', 'location'):
+        values = active_jobs.exclude(**{f'{facet}__isnull': True}).exclude(**{facet: ''})
+        for value, job_count in values.values_list(facet).annotate(job_count=Count('id')).order_by():
+            rows.append(FacetValue(facet=facet, value=value, job_count=job_count))
+    tags = Tag.objects.filter(jobs__is_active=True).values_list('name').annotate(job_count=Count('jobs')).order_by()
+    for name, job_count in tags:
+        rows.append(FacetValue(facet='tags', value=name, job_count=job_count))
+    FacetValue.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('tags', 'Tags'), ('title', 'Title'), ('company', 'Company'), ('location', 'Location')], max_length=20)),
+                ('value', models.CharField(max_length=200)),
+                ('job_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('facet', 'value'),
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+        migrations.RunPython(populate_facets, migrations.RunPython.noop),
+    ]
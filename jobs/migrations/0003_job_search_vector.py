@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:23
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE INDEX jobs_job_search_vector_gin ON jobs_job USING gin (search_vector)')
+        schema_editor.execute("""
+            UPDATE jobs_job SET search_vector =
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(company, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce((
+                    SELECT string_agg(jobs_tag.name, ' ')
+                    FROM jobs_job_tags INNER JOIN jobs_tag ON jobs_tag.id = jobs_job_tags.tag_id
+                    WHERE jobs_job_tags.job_id = jobs_job.id
+                ), '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        """)
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE jobs_job_fts USING fts5(title, company, description, tags, tokenize='porter unicode61')"
+        )
+        schema_editor.execute("""
+            INSERT INTO jobs_job_fts (rowid, title, company, description, tags)
+            SELECT jobs_job.id, jobs_job.title, jobs_job.company, coalesce(jobs_job.description, ''), coalesce((
+                SELECT group_concat(jobs_tag.name, ' ')
+                FROM jobs_job_tags INNER JOIN jobs_tag ON jobs_tag.id = jobs_job_tags.tag_id
+                WHERE jobs_job_tags.job_id = jobs_job.id
+            ), '')
+            FROM jobs_job
+        """)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS jobs_job_search_vector_gin')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS jobs_job_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_facetvalue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
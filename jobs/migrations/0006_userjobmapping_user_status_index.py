@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_activityevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userjobmapping',
+            index=models.Index(fields=['user', 'status', 'updated_at'], name='jobs_userjo_user_id_48c728_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_userjobmapping_user_status_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobEngagement',
+            fields=[
+                ('click_count', models.PositiveIntegerField(default=0)),
+                ('bookmark_count', models.PositiveIntegerField(default=0)),
+                ('apply_count', models.PositiveIntegerField(default=0)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='engagement', serialize=False, to='jobs.job')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='JobEngagementDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('click_count', models.PositiveIntegerField(default=0)),
+                ('bookmark_count', models.PositiveIntegerField(default=0)),
+                ('apply_count', models.PositiveIntegerField(default=0)),
+                ('day', models.DateField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='engagement_days', to='jobs.job')),
+            ],
+            options={
+                'ordering': ('job', 'day'),
+                'unique_together': {('job', 'day')},
+            },
+        ),
+    ]
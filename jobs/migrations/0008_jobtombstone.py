@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_jobengagement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ('deleted_at', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['updated_at', 'id'], name='jobs_job_updated_bd6fb0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobtombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='jobs_jobtom_deleted_01834f_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jobs', '0008_jobtombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJob',
+            fields=[
+                ('click_count', models.PositiveIntegerField(default=0)),
+                ('bookmark_count', models.PositiveIntegerField(default=0)),
+                ('apply_count', models.PositiveIntegerField(default=0)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('job_type', models.CharField(choices=[('Full-time', 'Full-time'), ('Part-time', 'Part-time'), ('Contract', 'Contract'), ('Internship', 'Internship')], max_length=20)),
+                ('title', models.CharField(max_length=200)),
+                ('company', models.CharField(max_length=200)),
+                ('location', models.CharField(blank=True, max_length=200, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('application_link', models.URLField(max_length=800)),
+                ('tags', models.JSONField(default=list)),
+                ('expired', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ('-archived_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedUserJobMapping',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('Clicked', 'Clicked'), ('Applied', 'Applied'), ('Bookmarked', 'Bookmarked')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ('-updated_at',),
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_job_is_acti_ef5a52_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_job_is_acti_e0eaeb_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['location', 'job_type'], name='job_active_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['updated_at', 'id'], name='job_active_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='archiveduserjobmapping',
+            name='job',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_users', to='jobs.archivedjob'),
+        ),
+        migrations.AddField(
+            model_name='archiveduserjobmapping',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_user_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedjob',
+            name='posted_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archiveduserjobmapping',
+            index=models.Index(fields=['user', 'updated_at'], name='jobs_archiv_user_id_dceaf3_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_archivedjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSignature',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='jobs.job')),
+                ('minhash', models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='jobs.job'),
+        ),
+        migrations.CreateModel(
+            name='JobSignatureBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket', 'band'], name='jobs_jobsig_bucket_7e2f28_idx')],
+            },
+        ),
+    ]
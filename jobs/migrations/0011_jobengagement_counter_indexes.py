@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_jobsignature'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobengagement',
+            index=models.Index(fields=['click_count', 'job'], name='jobs_jobeng_click_c_b7dc07_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobengagement',
+            index=models.Index(fields=['bookmark_count', 'job'], name='jobs_jobeng_bookmar_29a3cc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobengagement',
+            index=models.Index(fields=['apply_count', 'job'], name='jobs_jobeng_apply_c_39b1c8_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+# Columns the admins search with ^ (istartswith) or = (iexact). On
+# PostgreSQL those compile to UPPER(column::text) LIKE / = UPPER(...), which
+# neither the plain btree nor the _like index on the column can serve.
+SEARCHED = [
+    ('jobs', 'Job', 'title'),
+    ('jobs', 'Job', 'company'),
+    ('jobs', 'Job', 'location'),
+    ('jobs', 'ArchivedJob', 'title'),
+    ('jobs', 'ArchivedJob', 'company'),
+    ('jobs', 'ArchivedJob', 'location'),
+    ('jobBoard', 'User', 'email'),
+]
+
+
+def index_names(apps):
+    for app_label, model_name, column in SEARCHED:
+        table = apps.get_model(app_label, model_name)._meta.db_table
+        yield table, column, f'{table.lower()}_{column}_upper_like'
+
+
+def create_upper_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    for table, column, name in index_names(apps):
+        schema_editor.execute(f'CREATE INDEX {quote(name)} ON {quote(table)} (UPPER({quote(column)}::text) text_pattern_ops)')
+
+
+def drop_upper_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _, _, name in index_names(apps):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(name)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobBoard', '0001_initial'),
+        ('jobs', '0011_jobengagement_counter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_upper_indexes, drop_upper_indexes),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
 from django.utils.text import slugify
 from jobBoard.models import TimestampedModel
 
@@ -36,13 +38,22 @@ class Job(TimestampedModel):
     application_link = models.URLField(max_length=800)
     is_active = models.BooleanField(default=True, db_index=True)
     tags = models.ManyToManyField(Tag, blank=True, related_name='jobs')
+    # Maintained by jobs.search on PostgreSQL; unused on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Set when the job was held back as a near-duplicate of this one; see
+    # jobs.dedup.
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates')
 
     class Meta:
         ordering = ("-updated_at",)
         indexes = [
-            models.Index(fields=["is_active", "location", "job_type"]),
-            models.Index(fields=["is_active", "updated_at"]),
+            # Partial indexes over the hot set: listings and facet scans only
+            # read active jobs, so inactive rows don't bloat them.
+            models.Index(fields=["location", "job_type"], condition=models.Q(is_active=True), name="job_active_location_idx"),
+            models.Index(fields=["updated_at", "id"], condition=models.Q(is_active=True), name="job_active_updated_idx"),
             models.Index(fields=["title", "company"]),
+            # The changes feed pages through all jobs in this order.
+            models.Index(fields=["updated_at", "id"]),
         ]
 
     def __str__(self):
@@ -62,6 +73,191 @@ class UserJobMapping(TimestampedModel):
     class Meta:
         unique_together = ("user", "job")
         ordering = ("-updated_at",)
+        indexes = [
+            models.Index(fields=["user", "status", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} - {self.job.title} [{self.status}]"
+
+
+class FacetValue(models.Model):
+    class Facet(models.TextChoices):
+        TAGS = "tags", "Tags"
+        TITLE = "title", "Title"
+        COMPANY = "company", "Company"
+        LOCATION = "location", "Location"
+
+    facet = models.CharField(max_length=20, choices=Facet.choices)
+    value = models.CharField(max_length=200)
+    job_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("facet", "value")
+        ordering = ("facet", "value")
+
+    def __str__(self):
+        return f"{self.facet}: {self.value} ({self.job_count})"
+
+
+class ChangeCounter(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
+class ActivityEvent(models.Model):
+    """
+    Append-only buffer of job activity, folded into UserJobMapping by
+    jobs.activity.flush().
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    job = models.ForeignKey('Job', on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20, choices=UserJobMapping.Status.choices)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("id",)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.job_id} [{self.status}]"
+
+
+class EngagementCounts(models.Model):
+    """
+    Funnel counters maintained by jobs.engagement: users who reached at
+    least Clicked, Bookmarked and Applied respectively.
+    """
+    click_count = models.PositiveIntegerField(default=0)
+    bookmark_count = models.PositiveIntegerField(default=0)
+    apply_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class JobEngagement(EngagementCounts):
+    job = models.OneToOneField('Job', on_delete=models.CASCADE, primary_key=True, related_name='engagement')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # The analytics ranking by each counter (jobs.views.JobAnalyticsView).
+            models.Index(fields=["click_count", "job"]),
+            models.Index(fields=["bookmark_count", "job"]),
+            models.Index(fields=["apply_count", "job"]),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id}: {self.click_count}/{self.bookmark_count}/{self.apply_count}"
+
+
+class JobEngagementDay(EngagementCounts):
+    """
+    Daily rollup: how many users reached each level on that day.
+    """
+    job = models.ForeignKey('Job', on_delete=models.CASCADE, related_name='engagement_days')
+    day = models.DateField()
+
+    class Meta:
+        unique_together = ("job", "day")
+        ordering = ("job", "day")
+
+    def __str__(self):
+        return f"{self.job_id} {self.day}: {self.click_count}/{self.bookmark_count}/{self.apply_count}"
+
+
+class JobTombstone(models.Model):
+    """
+    A deleted job, kept for the changes feed until prune_tombstones removes
+    it.
+    """
+    job_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("deleted_at", "id")
+        indexes = [
+            models.Index(fields=["deleted_at", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id} deleted at {self.deleted_at}"
+
+
+class JobSignature(models.Model):
+    """
+    MinHash signature of a job's text, maintained by jobs.dedup.
+    """
+    job = models.OneToOneField('Job', on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.BinaryField()
+
+    def __str__(self):
+        return f"Signature of {self.job_id}"
+
+
+class JobSignatureBand(models.Model):
+    """
+    One LSH bucket of a job's signature; jobs sharing a (band, bucket) are
+    near-duplicate candidates.
+    """
+    job = models.ForeignKey('Job', on_delete=models.CASCADE, related_name='+')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["bucket", "band"]),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id}: {self.band}/{self.bucket}"
+
+
+class ArchivedJob(EngagementCounts):
+    """
+    A job moved out of jobs_job by jobs.archive, under its original id, with
+    its tags and final engagement totals.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    posted_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_jobs')
+    job_type = models.CharField(max_length=20, choices=Job.JobType.choices)
+    title = models.CharField(max_length=200)
+    company = models.CharField(max_length=200)
+    location = models.CharField(max_length=200, null=True, blank=True)
+    description = models.TextField(blank=True, null=True)
+    application_link = models.URLField(max_length=800)
+    # Tags as [{"name": ..., "slug": ...}], the shape the job APIs return.
+    tags = models.JSONField(default=list)
+    # Still active when archived, i.e. expired by age rather than taken down.
+    expired = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ("-archived_at",)
+
+    def __str__(self):
+        return f"{self.title} at {self.company} (archived)"
+
+
+class ArchivedUserJobMapping(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_user_jobs')
+    job = models.ForeignKey('ArchivedJob', on_delete=models.CASCADE, related_name='job_users')
+    status = models.CharField(max_length=20, choices=UserJobMapping.Status.choices)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-updated_at",)
+        indexes = [
+            models.Index(fields=["user", "updated_at"]),
+        ]
 
     def __str__(self):
-        return f"{self.user.email} - {self.job.title} [{self.status}]"
\ No newline at end of file
+        return f"{self.user_id} - {self.job_id} [{self.status}]"
@@ -0,0 +1,127 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+
+class KeysetPagination:
+    """
+    Opt-in cursor pagination keyed on the ordering columns, ("-updated_at",
+    "-id") by default. Each page seeks past the last row of the previous one
+    instead of using OFFSET, so with the partial index on active jobs page N
+    costs the same as page 1.
+
+    Pagination only kicks in when the client sends ``page_size`` or
+    ``cursor``; otherwise ``paginate_queryset`` returns None and the view
+    responds with the full list as before.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering=("-updated_at", "-id")):
+        self.ordering = tuple(ordering)
+        self.current_page_size = self.page_size
+        self.next_cursor = None
+
+    def paginate_queryset(self, queryset, request):
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.get_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request):
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.get_page([row async for row in page_queryset])
+
+    def is_requested(self, request):
+        params = self.get_query_params(request)
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_queryset(self, queryset, request):
+        if not self.is_requested(request):
+            return None
+        params = self.get_query_params(request)
+
+        self.current_page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(self.decode_cursor(cursor)))
+        return queryset[:self.current_page_size + 1]
+
+    def get_page(self, rows):
+        if len(rows) > self.current_page_size:
+            rows = rows[:self.current_page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        return rows
+
+    @staticmethod
+    def get_query_params(request):
+        # DRF requests expose query_params; plain (async) Django views use GET.
+        return getattr(request, "query_params", request.GET)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(self.get_query_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def seek_filter(self, position):
+        """
+        Rows strictly after ``position`` in ordering order, i.e. the
+        expansion of the row comparison (a, b) < (x, y). The leading column
+        is also bounded on its own so the index range scan can use it.
+        """
+        fields = [(name.lstrip("-"), name.startswith("-")) for name in self.ordering]
+        condition = Q()
+        for index, (name, descending) in enumerate(fields):
+            clause = Q(**{f"{name}__{'lt' if descending else 'gt'}": position[index]})
+            for previous_index, (previous, _) in enumerate(fields[:index]):
+                clause &= Q(**{previous: position[previous_index]})
+            condition |= clause
+        leading, descending = fields[0]
+        return Q(**{f"{leading}__{'lte' if descending else 'gte'}": position[0]}) & condition
+
+    def encode_cursor(self, obj):
+        position = []
+        for name in self.ordering:
+            field = name.lstrip("-")
+            value = obj[field] if isinstance(obj, dict) else getattr(obj, field)
+            position.append(value.isoformat() if isinstance(value, datetime) else value)
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return [self.decode_value(name.lstrip("-"), value) for name, value in zip(self.ordering, position)]
+
+    def decode_value(self, field, value):
+        """
+        A cursor position checked against its ordering field: an ISO
+        datetime for ``*_at`` fields, an integer for ``id`` and a number
+        (a search rank or a counter) for anything else.
+        """
+        if field.endswith("_at"):
+            value = parse_datetime(value) if isinstance(value, str) else None
+        elif isinstance(value, bool) or not isinstance(value, int if field == "id" else (int, float)):
+            value = None
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value
@@ -0,0 +1,266 @@
+"""
+The "for you" feed: item-item collaborative filtering over UserJobMapping,
+falling back to tag affinity and then to popularity.
+
+Each interaction weighs STATUS_WEIGHTS by status. Two jobs are neighbours
+when the same users interacted with both; their similarity is the cosine of
+their user vectors, shrunk by SHRINKAGE so that a pair seen by one or two
+users ranks below a pair many users share. Each job keeps its NEIGHBOURS
+most similar jobs.
+
+A user's feed scores every neighbour of the jobs in their history by
+similarity times interaction weight, and drops jobs they have already seen.
+When that gives fewer than k jobs (a short history, or jobs nobody else
+touched) the rest come from the tags of their history, most-used tag first,
+then from the most popular jobs overall, which is also the whole feed of a
+user with no history.
+
+build() fits the model in batch and writes it, as flat arrays after a
+fixed header, to JOB_RECOMMENDATIONS_PATH; workers memory-map it like the
+similar jobs index (jobs/similar.py). Serving a feed reads only the mapped
+arrays. Histories are as of the last build: run
+`manage.py build_recommendations --loop` to keep them current.
+"""
+import heapq
+import math
+import struct
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import datetime, timezone as dt_timezone
+from itertools import combinations
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import mapped
+from .models import Job, UserJobMapping
+
+STATUS_WEIGHTS = {
+    UserJobMapping.Status.CLICKED: 1.0,
+    UserJobMapping.Status.BOOKMARKED: 2.0,
+    UserJobMapping.Status.APPLIED: 3.0,
+}
+NEIGHBOURS = 50
+SHRINKAGE = 5.0
+MAX_HISTORY = 200
+MAX_TAGS = 10
+TAG_JOBS = 200
+POPULAR = 500
+
+MAGIC = b"JOBREC01"
+# (name, array type code). 8-byte sections first so every section stays
+# aligned to its item size.
+SECTIONS = (
+    ("job_ids", "q"), ("neighbour_ptr", "q"), ("user_ids", "q"), ("history_ptr", "q"),
+    ("job_tag_ptr", "q"), ("tag_ptr", "q"),
+    ("neighbours", "i"), ("neighbour_scores", "f"), ("history", "i"), ("history_weights", "f"),
+    ("job_tags", "i"), ("tag_jobs", "i"), ("popular", "i"),
+)
+# magic, built_at (epoch seconds), then the length of each section
+HEADER = struct.Struct(f"<8sd{len(SECTIONS)}q")
+HEADER_SIZE = 128
+
+
+def _csr(rows):
+    """
+    Flatten a list of lists into (row pointers, values).
+    """
+    ptr, values = [0], []
+    for row in rows:
+        values.extend(row)
+        ptr.append(len(values))
+    return ptr, values
+
+
+class Model:
+    """
+    A fitted model: positions into ``job_ids`` everywhere, rows as CSR
+    arrays. Built by fit() or mapped from a file by load().
+    """
+    def __init__(self, built_at, **sections):
+        self.built_at = built_at
+        for name, code in SECTIONS:
+            setattr(self, name, sections[name])
+
+    @classmethod
+    def load(cls, path):
+        def layout(fields):
+            return [(code, length) for (_, code), length in zip(SECTIONS, fields[2:])]
+
+        fields, sections, _ = mapped.open_sections(path, MAGIC, HEADER, HEADER_SIZE, layout)
+        return cls(
+            datetime.fromtimestamp(fields[1], dt_timezone.utc),
+            **{name: section for (name, _), section in zip(SECTIONS, sections)},
+        )
+
+    def write(self, path):
+        """
+        Write the model to ``path``, replacing it atomically.
+        """
+        sections = [array(code, getattr(self, name)) for name, code in SECTIONS]
+        header = HEADER.pack(MAGIC, self.built_at.timestamp(), *map(len, sections))
+        mapped.write(path, header, HEADER_SIZE, sections)
+
+    def _row(self, ptr, values, index, weights=None):
+        start, end = ptr[index], ptr[index + 1]
+        if weights is None:
+            return values[start:end]
+        return zip(values[start:end], weights[start:end])
+
+    def user_history(self, user_id):
+        """
+        [(job position, weight)] for a user, empty if they had none at the
+        last build.
+        """
+        index = bisect_left(self.user_ids, user_id)
+        if index == len(self.user_ids) or self.user_ids[index] != user_id:
+            return []
+        return list(self._row(self.history_ptr, self.history, index, self.history_weights))
+
+    def recommend(self, user_id, k):
+        """
+        Up to k job ids for the user, best first, leaving out jobs in their
+        history.
+        """
+        history = self.user_history(user_id)
+        seen = {item for item, _ in history}
+
+        scores = defaultdict(float)
+        for item, weight in history:
+            for other, similarity in self._row(self.neighbour_ptr, self.neighbours, item, self.neighbour_scores):
+                scores[other] += weight * similarity
+        ranked = [item for item, _ in heapq.nlargest(k, (
+            (item, score) for item, score in scores.items() if item not in seen
+        ), key=itemgetter(1))]
+        seen.update(ranked)
+
+        if len(ranked) < k:
+            ranked += self._by_tags(history, seen, k - len(ranked))
+            seen.update(ranked)
+        if len(ranked) < k:
+            ranked += [item for item in self.popular if item not in seen][:k - len(ranked)]
+        return [self.job_ids[item] for item in ranked]
+
+    def _by_tags(self, history, seen, k):
+        affinity = Counter()
+        for item, weight in history:
+            for tag in self._row(self.job_tag_ptr, self.job_tags, item):
+                affinity[tag] += weight
+        # Tag lists are popularity-ordered and nlargest is stable, so ties
+        # go to the more popular job.
+        scores = defaultdict(float)
+        for tag, weight in affinity.most_common(MAX_TAGS):
+            for item in self._row(self.tag_ptr, self.tag_jobs, tag):
+                if item not in seen:
+                    scores[item] += weight
+        return [item for item, _ in heapq.nlargest(k, scores.items(), key=itemgetter(1))]
+
+
+def fit(histories, job_tags, built_at=None):
+    """
+    Fit a model from {user_id: [(job_id, weight)], most recent first} and
+    {job_id: [tag_id]} for every recommendable job. Interactions with other
+    jobs are ignored.
+    """
+    job_ids = sorted(job_tags)
+    position = {job_id: index for index, job_id in enumerate(job_ids)}
+    user_ids = []
+    history_rows = []
+    for user_id in sorted(histories):
+        items = [(position[job_id], weight) for job_id, weight in histories[user_id] if job_id in position][:MAX_HISTORY]
+        if items:
+            user_ids.append(user_id)
+            history_rows.append(items)
+
+    squares = defaultdict(float)
+    popularity = defaultdict(float)
+    products = defaultdict(lambda: defaultdict(float))
+    for items in history_rows:
+        for item, weight in items:
+            squares[item] += weight * weight
+            popularity[item] += weight
+        for (first, first_weight), (second, second_weight) in combinations(items, 2):
+            products[first][second] += first_weight * second_weight
+            products[second][first] += first_weight * second_weight
+
+    neighbour_rows = []
+    for item in range(len(job_ids)):
+        norm = math.sqrt(squares[item])
+        scores = (
+            (other, product / (norm * math.sqrt(squares[other]) + SHRINKAGE))
+            for other, product in products.get(item, {}).items()
+        )
+        neighbour_rows.append(heapq.nlargest(NEIGHBOURS, scores, key=itemgetter(1)))
+
+    def by_popularity(item):
+        return -popularity.get(item, 0.0), -job_ids[item]
+
+    tag_index = {}
+    job_tag_rows = [
+        [tag_index.setdefault(tag_id, len(tag_index)) for tag_id in job_tags[job_id]] for job_id in job_ids
+    ]
+    tag_rows = [[] for _ in tag_index]
+    for item, tags in enumerate(job_tag_rows):
+        for tag in tags:
+            tag_rows[tag].append(item)
+    tag_rows = [sorted(items, key=by_popularity)[:TAG_JOBS] for items in tag_rows]
+
+    neighbour_ptr, neighbours = _csr([[other for other, _ in row] for row in neighbour_rows])
+    history_ptr, history = _csr([[item for item, _ in row] for row in history_rows])
+    job_tag_ptr, job_tags_flat = _csr(job_tag_rows)
+    tag_ptr, tag_jobs = _csr(tag_rows)
+    return Model(
+        built_at or timezone.now(),
+        job_ids=job_ids, neighbour_ptr=neighbour_ptr, neighbours=neighbours,
+        neighbour_scores=[score for row in neighbour_rows for _, score in row],
+        user_ids=user_ids, history_ptr=history_ptr, history=history,
+        history_weights=[weight for row in history_rows for _, weight in row],
+        job_tag_ptr=job_tag_ptr, job_tags=job_tags_flat, tag_ptr=tag_ptr, tag_jobs=tag_jobs,
+        popular=sorted(popularity, key=by_popularity)[:POPULAR],
+    )
+
+
+def load_interactions():
+    """
+    The fit() inputs for the current catalogue: histories over active jobs
+    and the tags of every active job.
+    """
+    job_tags = {job_id: [] for job_id in Job.objects.filter(is_active=True).values_list("id", flat=True).iterator()}
+    links = Job.tags.through.objects.filter(job__is_active=True).values_list("job_id", "tag_id")
+    for job_id, tag_id in links.iterator():
+        job_tags[job_id].append(tag_id)
+    histories = defaultdict(list)
+    mappings = UserJobMapping.objects.filter(job__is_active=True).order_by("user_id", "-updated_at")
+    for user_id, job_id, status in mappings.values_list("user_id", "job_id", "status").iterator():
+        histories[user_id].append((job_id, STATUS_WEIGHTS.get(status, 1.0)))
+    return histories, job_tags
+
+
+def build(path=None):
+    """
+    Fit the model on current data and write it. Returns (jobs, users).
+    """
+    model = fit(*load_interactions())
+    model.write(path or settings.JOB_RECOMMENDATIONS_PATH)
+    return len(model.job_ids), len(model.user_ids)
+
+
+_model = mapped.MappedFile("JOB_RECOMMENDATIONS_PATH", Model.load)
+
+
+def get_model():
+    """
+    This process's mapping of the current model file, or None before the
+    first build.
+    """
+    return _model.get()
+
+
+def recommend(user_id, k):
+    """
+    Up to k job ids for the user, best first; empty before the first build.
+    """
+    model = get_model()
+    return model.recommend(user_id, k) if model is not None else []
@@ -0,0 +1,105 @@
+"""
+Full-text search over job title, company, description and tag names.
+
+PostgreSQL keeps a weighted tsvector in Job.search_vector (GIN indexed) and
+ranks with ts_rank. SQLite, used for local development and tests, keeps an
+FTS5 table keyed by job id and ranks with bm25. Both are refreshed from the
+Job/Tag signals whenever a document changes.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Case, F, FloatField, Value, When
+
+SEARCH_CONFIG = "english"
+FTS_TABLE = "jobs_job_fts"
+# FTS5 ranks are resolved in Python on SQLite, so bound the candidate set.
+SQLITE_MAX_RESULTS = 1000
+
+POSTGRES_UPDATE_SQL = """
+    UPDATE jobs_job SET search_vector =
+        setweight(to_tsvector(%(config)s, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector(%(config)s, coalesce(company, '')), 'A') ||
+        setweight(to_tsvector(%(config)s, coalesce((
+            SELECT string_agg(jobs_tag.name, ' ')
+            FROM jobs_job_tags INNER JOIN jobs_tag ON jobs_tag.id = jobs_job_tags.tag_id
+            WHERE jobs_job_tags.job_id = jobs_job.id
+        ), '')), 'B') ||
+        setweight(to_tsvector(%(config)s, coalesce(description, '')), 'C')
+    WHERE id = ANY(%(ids)s)
+"""
+
+
+def index_jobs(job_ids):
+    """
+    Refresh the search documents for the given job ids.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_UPDATE_SQL, {"config": SEARCH_CONFIG, "ids": job_ids})
+    elif connection.vendor == "sqlite":
+        _index_sqlite(job_ids)
+
+
+def unindex_jobs(job_ids):
+    job_ids = list(job_ids)
+    if connection.vendor == "sqlite" and job_ids:
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(job_id,) for job_id in job_ids])
+
+
+def _index_sqlite(job_ids):
+    from .models import Job
+
+    tags = {}
+    links = Job.tags.through.objects.filter(job_id__in=job_ids).order_by("tag__name")
+    for job_id, name in links.values_list("job_id", "tag__name"):
+        tags.setdefault(job_id, []).append(name)
+    documents = [
+        (job_id, title, company, description or "", " ".join(tags.get(job_id, [])))
+        for job_id, title, company, description in Job.objects.filter(pk__in=job_ids).values_list(
+            "id", "title", "company", "description"
+        )
+    ]
+    unindex_jobs(job_ids)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, company, description, tags) VALUES (%s, %s, %s, %s, %s)",
+            documents,
+        )
+
+
+def _fts_match(query):
+    # Quote every word so user input can't inject FTS5 query syntax; the
+    # words are ANDed together like websearch_to_tsquery does.
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+
+
+def search_jobs(queryset, query):
+    """
+    Restrict ``queryset`` to jobs matching ``query`` and annotate a ``rank``
+    where higher is more relevant.
+    """
+    if connection.vendor == "postgresql":
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        return queryset.filter(search_vector=search_query).annotate(rank=SearchRank(F("search_vector"), search_query))
+
+    match = _fts_match(query)
+    if not match:
+        return queryset.none().annotate(rank=Value(0.0, output_field=FloatField()))
+    with connection.cursor() as cursor:
+        # bm25 scores are negative with the best match first; the column
+        # weights mirror the A/A/C/B tsvector weights used on PostgreSQL.
+        cursor.execute(
+            f"SELECT rowid, -bm25({FTS_TABLE}, 10.0, 10.0, 1.0, 5.0) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s ORDER BY 2 DESC LIMIT %s",
+            [match, SQLITE_MAX_RESULTS],
+        )
+        ranks = dict(cursor.fetchall())
+    return queryset.filter(pk__in=ranks).annotate(
+        rank=Case(*[When(pk=pk, then=Value(rank)) for pk, rank in ranks.items()], default=Value(0.0), output_field=FloatField())
+    )
@@ -1,6 +1,10 @@
-from .models import Job, Tag
+from .engagement import COUNTERS
+from .models import ArchivedJob, Job, JobEngagementDay, Tag
 from jobBoard.models import User
 from rest_framework import serializers
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -44,11 +48,139 @@ class JobDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ('created_at', 'updated_at')
 
 
+def engagement_counts(counts):
+    return {counter: getattr(counts, counter, 0) for counter in COUNTERS}
+
+
 class JobManagementSerializer(serializers.ModelSerializer):
     posted_by = UserSerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
+    engagement = serializers.SerializerMethodField()
 
     class Meta:
         model = Job
-        fields = ('id', 'title', 'company', 'location', 'description', 'application_link', 'job_type', 'is_active', 'posted_by', 'created_at', 'updated_at', 'tags',)
-        read_only_fields = ('posted_by', 'created_at', 'updated_at')
\ No newline at end of file
+        fields = ('id', 'title', 'company', 'location', 'description', 'application_link', 'job_type', 'is_active', 'posted_by', 'created_at', 'updated_at', 'tags', 'engagement', 'duplicate_of',)
+        read_only_fields = ('posted_by', 'created_at', 'updated_at', 'duplicate_of')
+
+    def create(self, validated_data):
+        # A signature the duplicate check already computed rides along on
+        # the instance so job_saved stores it instead of hashing again.
+        signature = validated_data.pop('signature', None)
+        job = Job(**validated_data)
+        job._dedup_signature = signature
+        job.save()
+        return job
+
+    def get_engagement(self, job):
+        # Jobs nobody has interacted with have no counter row yet.
+        return engagement_counts(getattr(job, 'engagement', None))
+
+
+class ArchivedJobSerializer(serializers.ModelSerializer):
+    posted_by = UserSerializer(read_only=True)
+
+    class Meta:
+        model = ArchivedJob
+        fields = ('id', 'title', 'company', 'location', 'job_type', 'posted_by', 'tags', 'created_at', 'updated_at', 'archived_at',)
+
+
+class JobEngagementDaySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobEngagementDay
+        fields = ('day',) + COUNTERS
+
+
+class JobListFastSerializer:
+    """
+    Read-only equivalent of JobListSerializer(many=True) for large listings.
+
+    Builds plain dicts from `.values()` rows and a single tag query instead of
+    instantiating a serializer per row, and renders to the same JSON as
+    JobListSerializer.
+    """
+    value_fields = (
+        'id', 'title', 'company', 'location', 'job_type', 'posted_by__first_name', 'posted_by__last_name',
+        'created_at', 'updated_at',
+    )
+    # Rows per fetch when streaming with aiterator() in adata().
+    chunk_size = 2000
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def get_rows(cls, queryset, *extra_fields):
+        return queryset.prefetch_related(None).values(*cls.value_fields, *extra_fields)
+
+    @staticmethod
+    def get_tag_links(job_ids):
+        links = Job.tags.through.objects.filter(job_id__in=job_ids).order_by('tag__name')
+        return links.values_list('job_id', 'tag__name', 'tag__slug')
+
+    @staticmethod
+    def group_tags(links):
+        tags = {}
+        for job_id, name, slug in links:
+            tags.setdefault(job_id, []).append({'name': name, 'slug': slug})
+        return tags
+
+    @staticmethod
+    def format_datetime(value, tz):
+        # Matches serializers.DateTimeField with the default ISO 8601 format,
+        # minus the per-call timezone lookup.
+        value = value.astimezone(tz).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    @classmethod
+    def to_representation(cls, row, tags, tz):
+        data = {
+            'id': row['id'],
+            'title': row['title'],
+            'company': row['company'],
+            'location': row['location'],
+            'job_type': row['job_type'],
+            'posted_by': {
+                'first_name': row['posted_by__first_name'],
+                'last_name': row['posted_by__last_name'],
+            },
+            'tags': tags,
+            'created_at': cls.format_datetime(row['created_at'], tz),
+            'updated_at': cls.format_datetime(row['updated_at'], tz),
+        }
+        if 'user_status' in row:
+            # The requesting user's activity status, see views.job_rows.
+            data['status'] = row['user_status']
+        return data
+
+    def get_job_ids(self, rows):
+        if isinstance(self.rows, QuerySet) and not self.rows.query.is_sliced:
+            # For a whole listing a subquery is far cheaper than an IN list
+            # with one parameter per job.
+            return self.rows.order_by().values('id')
+        return [row['id'] for row in rows]
+
+    def serialize(self, rows, tags):
+        tz = timezone.get_current_timezone()
+        return [self.to_representation(row, tags.get(row['id'], []), tz) for row in rows]
+
+    @cached_property
+    def data(self):
+        rows = list(self.rows)
+        tags = self.group_tags(self.get_tag_links(self.get_job_ids(rows)))
+        return self.serialize(rows, tags)
+
+    async def adata(self):
+        if isinstance(self.rows, QuerySet):
+            rows = [row async for row in self.rows.aiterator(chunk_size=self.chunk_size)]
+        else:
+            rows = list(self.rows)
+        # values_list() over related fields runs its query as soon as it is
+        # iterated, outside aiterator()'s sync thread, so stream dicts.
+        links = self.get_tag_links(self.get_job_ids(rows)).values('job_id', 'tag__name', 'tag__slug')
+        tags = self.group_tags([
+            (link['job_id'], link['tag__name'], link['tag__slug'])
+            async for link in links.aiterator(chunk_size=self.chunk_size)
+        ])
+        return self.serialize(rows, tags)
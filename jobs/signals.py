@@ -0,0 +1,178 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import bitmaps, dedup, engagement, facets, generation, search
+from .models import FacetValue, Job, JobTombstone, Tag, UserJobMapping
+
+JobTags = Job.tags.through
+
+
+@receiver(pre_save, sender=Job)
+def remember_job_facets(sender, instance, raw=False, **kwargs):
+    instance._facet_previous = None
+    if raw or instance._state.adding:
+        return
+    # The text fields let job_saved skip re-signing unchanged text.
+    instance._facet_previous = Job.objects.filter(pk=instance.pk).values(*facets.JOB_FIELDS, *dedup.TEXT_FIELDS).first()
+
+
+@receiver(post_save, sender=Job)
+def update_job_facets(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_facet_previous", None)
+    current = facets.job_values(instance)
+
+    # Tags only move in or out of the index when the job flips is_active;
+    # otherwise they cancel out and we can skip the lookup.
+    tag_names = ()
+    if previous and previous["is_active"] != current["is_active"]:
+        tag_names = list(instance.tags.values_list("name", flat=True))
+
+    delta = facets.job_contribution(current, tag_names)
+    delta.subtract(facets.job_contribution(previous, tag_names))
+    facets.apply_delta(delta)
+
+
+@receiver(pre_delete, sender=Job)
+def remember_deleted_job_tags(sender, instance, **kwargs):
+    instance._facet_tags = list(instance.tags.values_list("name", flat=True)) if instance.is_active else []
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_facets(sender, instance, **kwargs):
+    delta = Counter()
+    delta.subtract(facets.job_contribution(facets.job_values(instance), getattr(instance, "_facet_tags", [])))
+    facets.apply_delta(delta)
+
+
+def _active_link_counts(instance, reverse, pk_set):
+    """
+    Number of active jobs per tag among the links an m2m change touches.
+    """
+    links = JobTags.objects.filter(job__is_active=True)
+    if reverse:
+        links = links.filter(tag_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(job_id__in=pk_set)
+    else:
+        links = links.filter(job_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(tag_id__in=pk_set)
+    rows = links.values_list("tag__name").annotate(job_count=Count("id")).order_by()
+    return Counter({(FacetValue.Facet.TAGS.value, name): job_count for name, job_count in rows})
+
+
+@receiver(m2m_changed, sender=JobTags)
+def update_tag_facets(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("pre_remove", "pre_clear"):
+        # pk_set for remove may name tags that were never linked, and clear
+        # has no pk_set at all, so count the links before they disappear.
+        instance._facet_unlinked = _active_link_counts(instance, reverse, pk_set)
+    elif action in ("post_remove", "post_clear"):
+        delta = Counter()
+        delta.subtract(getattr(instance, "_facet_unlinked", Counter()))
+        facets.apply_delta(delta)
+    elif action == "post_add" and pk_set:
+        facets.apply_delta(_active_link_counts(instance, reverse, pk_set))
+
+
+@receiver(pre_save, sender=Tag)
+def remember_tag_name(sender, instance, raw=False, **kwargs):
+    instance._facet_previous_name = instance._previous_slug = None
+    if raw or instance._state.adding:
+        return
+    previous = Tag.objects.filter(pk=instance.pk).values_list("name", "slug").first()
+    if previous:
+        instance._facet_previous_name, instance._previous_slug = previous
+
+
+@receiver(post_save, sender=Tag)
+def rename_tag_facet(sender, instance, raw=False, **kwargs):
+    previous_name = getattr(instance, "_facet_previous_name", None)
+    if raw or not previous_name or previous_name == instance.name:
+        return
+    FacetValue.objects.filter(facet=FacetValue.Facet.TAGS, value=previous_name).update(value=instance.name)
+
+
+@receiver(pre_delete, sender=Tag)
+def remove_tag_facet(sender, instance, **kwargs):
+    # Deleting a tag cascades its job links without sending m2m_changed.
+    FacetValue.objects.filter(facet=FacetValue.Facet.TAGS, value=instance.name).delete()
+
+
+def _tagged_jobs_changed(job_ids):
+    """
+    Tag links or tag names changed for these jobs: refresh their search
+    documents and bump updated_at so cached copies and sync clients notice.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    search.index_jobs(job_ids)
+    Job.objects.filter(pk__in=job_ids).update(updated_at=timezone.now())
+    generation.schedule_bump()
+    bitmaps.schedule_sync()
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_jobs([instance.pk])
+    previous = getattr(instance, "_facet_previous", None)
+    if previous is None or any(previous[field] != getattr(instance, field) for field in dedup.TEXT_FIELDS):
+        signature = getattr(instance, "_dedup_signature", None)
+        dedup.index_jobs([instance.pk], {instance.pk: signature} if signature is not None else None)
+    generation.schedule_bump()
+    bitmaps.schedule_sync()
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    # Sync clients learn about the deletion from the changes feed.
+    JobTombstone.objects.create(job_id=instance.pk)
+    search.unindex_jobs([instance.pk])
+    generation.schedule_bump()
+    bitmaps.schedule_sync()
+
+
+@receiver(m2m_changed, sender=JobTags)
+def job_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            _tagged_jobs_changed([instance.pk])
+    elif action == "pre_clear":
+        instance._tagged_job_ids = list(instance.jobs.values_list("id", flat=True))
+    elif action == "post_clear":
+        _tagged_jobs_changed(getattr(instance, "_tagged_job_ids", []))
+    elif action in ("post_add", "post_remove"):
+        _tagged_jobs_changed(pk_set or [])
+
+
+@receiver(post_save, sender=Tag)
+def tag_renamed(sender, instance, raw=False, **kwargs):
+    previous = (getattr(instance, "_facet_previous_name", None), getattr(instance, "_previous_slug", None))
+    if not raw and previous[0] and previous != (instance.name, instance.slug):
+        _tagged_jobs_changed(instance.jobs.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_deleted_tag_jobs(sender, instance, **kwargs):
+    instance._tagged_job_ids = list(instance.jobs.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted(sender, instance, **kwargs):
+    _tagged_jobs_changed(getattr(instance, "_tagged_job_ids", []))
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def remove_user_engagement(sender, instance, **kwargs):
+    # Deleting a user cascades their mappings without per-row signals.
+    engagement.remove_mappings(UserJobMapping.objects.filter(user=instance))
@@ -0,0 +1,247 @@
+"""
+"Similar jobs" from a precomputed TF-IDF index shared by every worker.
+
+Each active job is a sparse vector: TF-IDF weights of the words in its title
+(counted TITLE_BOOST times) and description, plus one term per tag weighted
+TAG_BOOST, so shared tags and shared wording both count. Vectors are
+L2-normalized, so a dot product is a cosine similarity.
+
+build() writes the vectors to JOB_SIMILAR_INDEX_PATH twice: by job (CSR, a
+job's terms) and by term (CSC, the jobs that use a term), as flat arrays
+after a fixed header. Workers memory-map the file read-only, so the page
+cache holds one copy for all gunicorn workers. similar_jobs() reads the
+job's row, walks the postings of its terms and keeps the top k: a sparse
+dot product against the catalogue with no database access. Terms used by
+more than MAX_POSTINGS jobs are skipped at lookup; their IDF is near zero.
+
+The file is replaced atomically and workers pick up the new one on their
+next lookup. Builds are incremental: they keep the previous vocabulary and
+IDF and only re-read jobs updated since the last build. IDF is recomputed
+when more than FULL_REBUILD_FRACTION of the catalogue has changed, or on
+request. `manage.py build_similar_jobs --loop` keeps the index current; a
+job posted since the last build has no similar jobs until the next one.
+"""
+import heapq
+import math
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import mapped
+from .models import Job
+
+TITLE_BOOST = 2
+TAG_BOOST = 1.5
+TAG_PREFIX = "#"
+MAX_POSTINGS = 10_000
+FULL_REBUILD_FRACTION = 0.2
+UPDATE_SLACK = timedelta(minutes=5)
+
+MAGIC = b"JOBSIM01"
+# magic, built_at (epoch seconds), jobs, terms, non-zero weights, vocabulary bytes
+HEADER = struct.Struct("<8sdqqqq")
+HEADER_SIZE = 64
+
+JobTags = Job.tags.through
+
+
+def tokenize(text):
+    return [word for word in re.findall(r"\w+", (text or "").lower()) if len(word) > 1]
+
+
+def job_terms(title, description, tag_names):
+    counts = Counter()
+    for word in tokenize(title):
+        counts[word] += TITLE_BOOST
+    counts.update(tokenize(description))
+    return counts, [TAG_PREFIX + name for name in tag_names]
+
+
+def load_documents(job_ids=None):
+    """
+    {job_id: (word counts, tag terms)} for active jobs, all of them or the
+    given ids.
+    """
+    jobs = Job.objects.filter(is_active=True)
+    links = JobTags.objects.filter(job__is_active=True)
+    if job_ids is not None:
+        jobs, links = jobs.filter(pk__in=job_ids), links.filter(job_id__in=job_ids)
+    tags = defaultdict(list)
+    for job_id, name in links.values_list("job_id", "tag__name").iterator():
+        tags[job_id].append(name)
+    return {
+        job_id: job_terms(title, description, tags.get(job_id, ()))
+        for job_id, title, description in jobs.values_list("id", "title", "description").iterator()
+    }
+
+
+def vectorize(document, vocabulary, idf, unseen_idf):
+    """
+    A job's normalized vector as a sorted [(term, weight)] list. Terms
+    missing from the vocabulary are added with ``unseen_idf``.
+    """
+    counts, tag_terms = document
+    weights = {}
+    for term, count in counts.items():
+        index = vocabulary.setdefault(term, len(vocabulary))
+        if index == len(idf):
+            idf.append(unseen_idf)
+        weights[index] = (1 + math.log(count)) * idf[index]
+    for term in tag_terms:
+        index = vocabulary.setdefault(term, len(vocabulary))
+        if index == len(idf):
+            idf.append(unseen_idf)
+        weights[index] = TAG_BOOST * idf[index]
+    norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+    return sorted((index, weight / norm) for index, weight in weights.items())
+
+
+class SimilarityIndex:
+    """
+    Read-only view of an index file. The arrays are memoryviews over the
+    mapped file, so nothing is copied into the process.
+    """
+    def __init__(self, path):
+        def layout(fields):
+            _, _, jobs, terms, nnz, _ = fields
+            return [
+                ("q", jobs), ("q", jobs + 1), ("q", terms + 1),
+                ("i", nnz), ("f", nnz), ("i", nnz), ("f", nnz), ("f", terms),
+            ]
+
+        fields, sections, rest = mapped.open_sections(path, MAGIC, HEADER, HEADER_SIZE, layout)
+        self.built_at = datetime.fromtimestamp(fields[1], dt_timezone.utc)
+        (
+            self.job_ids, self.row_ptr, self.col_ptr, self.row_terms, self.row_weights,
+            self.col_jobs, self.col_weights, self.idf,
+        ) = sections
+        self._vocabulary = rest[:fields[5]]
+
+    def vocabulary(self):
+        data = bytes(self._vocabulary).decode()
+        return {term: index for index, term in enumerate(data.split("\0"))} if data else {}
+
+    def position(self, job_id):
+        position = bisect_left(self.job_ids, job_id)
+        if position < len(self.job_ids) and self.job_ids[position] == job_id:
+            return position
+        return None
+
+    def row(self, position):
+        start, end = self.row_ptr[position], self.row_ptr[position + 1]
+        return list(zip(self.row_terms[start:end], self.row_weights[start:end]))
+
+    def similar(self, job_id, k):
+        position = self.position(job_id)
+        if position is None:
+            return []
+        scores = defaultdict(float)
+        for term, weight in self.row(position):
+            start, end = self.col_ptr[term], self.col_ptr[term + 1]
+            if end - start > MAX_POSTINGS:
+                continue
+            for index in range(start, end):
+                scores[self.col_jobs[index]] += weight * self.col_weights[index]
+        scores.pop(position, None)
+        return [(self.job_ids[other], score) for other, score in heapq.nlargest(k, scores.items(), key=itemgetter(1))]
+
+
+def write(path, built_at, rows, vocabulary, idf):
+    """
+    Write {job_id: [(term, weight)]} as an index file, replacing ``path``
+    atomically.
+    """
+    job_ids = array("q", sorted(rows))
+    row_ptr, row_terms, row_weights = array("q", [0]), array("i"), array("f")
+    for job_id in job_ids:
+        for term, weight in rows[job_id]:
+            row_terms.append(term)
+            row_weights.append(weight)
+        row_ptr.append(len(row_terms))
+
+    postings = [0] * len(idf)
+    for term in row_terms:
+        postings[term] += 1
+    col_ptr = array("q", [0])
+    for count in postings:
+        col_ptr.append(col_ptr[-1] + count)
+    col_jobs, col_weights = array("i", [0]) * len(row_terms), array("f", [0.0]) * len(row_terms)
+    fill = list(col_ptr[:-1])
+    for position in range(len(job_ids)):
+        for index in range(row_ptr[position], row_ptr[position + 1]):
+            term = row_terms[index]
+            col_jobs[fill[term]] = position
+            col_weights[fill[term]] = row_weights[index]
+            fill[term] += 1
+
+    terms = sorted(vocabulary, key=vocabulary.get)
+    encoded = "\0".join(terms).encode()
+    header = HEADER.pack(MAGIC, built_at.timestamp(), len(job_ids), len(idf), len(row_terms), len(encoded))
+    sections = (job_ids, row_ptr, col_ptr, row_terms, row_weights, col_jobs, col_weights, array("f", idf))
+    mapped.write(path, header, HEADER_SIZE, sections, encoded)
+
+
+def build(full=False, path=None):
+    """
+    Rebuild the index file. Returns (jobs indexed, jobs re-read).
+    """
+    path = path or settings.JOB_SIMILAR_INDEX_PATH
+    built_at = timezone.now()
+    previous = None
+    if not full and os.path.exists(path):
+        previous = SimilarityIndex(path)
+        active = set(Job.objects.filter(is_active=True).values_list("id", flat=True).iterator())
+        changed = set(
+            Job.objects.filter(is_active=True, updated_at__gte=previous.built_at - UPDATE_SLACK)
+            .values_list("id", flat=True).iterator()
+        )
+        changed |= {job_id for job_id in active if previous.position(job_id) is None}
+        if len(changed) > FULL_REBUILD_FRACTION * len(active):
+            previous = None
+
+    if previous is None:
+        documents = load_documents()
+        frequencies = Counter(term for counts, tag_terms in documents.values() for term in {*counts, *tag_terms})
+        vocabulary = {term: index for index, term in enumerate(sorted(frequencies))}
+        idf = [math.log((1 + len(documents)) / (1 + frequencies[term])) + 1 for term in sorted(frequencies)]
+        unseen_idf = math.log((1 + len(documents)) / 2) + 1
+        rows = {job_id: vectorize(document, vocabulary, idf, unseen_idf) for job_id, document in documents.items()}
+        write(path, built_at, rows, vocabulary, idf)
+        return len(rows), len(rows)
+
+    vocabulary, idf = previous.vocabulary(), list(previous.idf)
+    unseen_idf = math.log((1 + len(active)) / 2) + 1
+    rows = {
+        job_id: previous.row(previous.position(job_id)) for job_id in active - changed
+    }
+    documents = load_documents(changed)
+    rows.update((job_id, vectorize(document, vocabulary, idf, unseen_idf)) for job_id, document in documents.items())
+    write(path, built_at, rows, vocabulary, idf)
+    return len(rows), len(documents)
+
+
+_index = mapped.MappedFile("JOB_SIMILAR_INDEX_PATH", SimilarityIndex)
+
+
+def get_index():
+    """
+    This process's mapping of the current index file, or None before the
+    first build.
+    """
+    return _index.get()
+
+
+def similar_jobs(job_id, k):
+    """
+    Up to k (job_id, score) pairs, most similar first.
+    """
+    index = get_index()
+    return index.similar(job_id, k) if index is not None else []
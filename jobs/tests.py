@@ -0,0 +1,1600 @@
+import base64
+import csv
+import importlib.util
+import json
+import os
+import logging
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+import unittest
+from array import array
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from jobBoard.authentication import token_cache
+from jobBoard.models import User
+from jobBoardProject import db_router, metrics
+from jobBoardProject.paginator import EstimatedCountPaginator
+from jobBoardProject.testing import QueryBudgetMixin
+from . import activity, archive, bitmaps, dedup, engagement, export, facets, generation, recommend, similar
+from .filters import filter_jobs
+from .models import (
+    ActivityEvent, ArchivedJob, ArchivedUserJobMapping, FacetValue, Job, JobEngagement, JobEngagementDay, JobSignature,
+    JobSignatureBand, JobTombstone, Tag, UserJobMapping,
+)
+from .serializers import JobListFastSerializer, JobListSerializer
+
+
+class JobTestMixin:
+    def create_staff(self, email="staff@example.com"):
+        staff = User.objects.create_user(email=email, password="pass")
+        staff.is_staff = True
+        staff.save()
+        return staff
+
+    def create_job(self, **kwargs):
+        tags = kwargs.pop("tags", [])
+        values = {
+            "posted_by": self.staff,
+            "title": "Backend Engineer",
+            "company": "Acme",
+            "location": "Remote",
+            "application_link": "https://example.com/apply",
+        }
+        values.update(kwargs)
+        job = Job.objects.create(**values)
+        if tags:
+            job.tags.set([Tag.objects.get_or_create(name=name)[0] for name in tags])
+        return job
+
+
+class FacetIndexTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.user = User.objects.create_user(email="user@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+
+    def assertIndexConsistent(self):
+        indexed = {(facet, value): job_count for facet, value, job_count in FacetValue.objects.values_list("facet", "value", "job_count")}
+        self.assertEqual(indexed, dict(facets.count_active_values()))
+
+    def test_index_tracks_job_and_tag_changes(self):
+        job = self.create_job(tags=["python", "django"])
+        other = self.create_job(title="Data Engineer", location="", tags=["python"])
+        self.assertIndexConsistent()
+
+        job.title = "Senior Backend Engineer"
+        job.save()
+        other.is_active = False
+        other.save()
+        self.assertIndexConsistent()
+
+        other.is_active = True
+        other.save()
+        job.tags.remove(Tag.objects.get(name="python"), Tag.objects.get(name="django"))
+        job.tags.remove(Tag.objects.get(name="python"))
+        self.assertIndexConsistent()
+
+        rust = Tag.objects.create(name="rust")
+        rust.jobs.add(job, other)
+        other.tags.clear()
+        self.assertIndexConsistent()
+
+        rust.name = "rustlang"
+        rust.save()
+        Tag.objects.get(name="django").delete()
+        job.delete()
+        self.assertIndexConsistent()
+
+    def test_inactive_jobs_are_not_indexed(self):
+        self.create_job(company="Hidden", is_active=False, tags=["secret"])
+        self.assertFalse(FacetValue.objects.filter(value__in=["Hidden", "secret"]).exists())
+
+    def test_rebuild_command(self):
+        self.create_job(tags=["python"])
+        FacetValue.objects.all().delete()
+        call_command("rebuild_facets", stdout=StringIO())
+        self.assertIndexConsistent()
+
+    def test_views_read_filters_from_index(self):
+        self.create_job(tags=["python"])
+        self.create_job(company="Globex", location=None, is_active=False)
+        for response in (self.client.get(reverse("job-list")), self.client.post(reverse("job-filter"), {}, format="json")):
+            filters = response.data["filters"]
+            self.assertEqual(filters["tags"], ["python"])
+            self.assertEqual(filters["company"], ["Acme"])
+            self.assertEqual(filters["location"], ["Remote"])
+            self.assertEqual(filters["time"], facets.TIME_FILTERS)
+
+    def test_drill_down_counts(self):
+        self.create_job(tags=["python", "django"])
+        self.create_job(company="Globex", tags=["python"])
+        self.create_job(company="Globex", location="Berlin", job_type=Job.JobType.CONTRACT, tags=["go"])
+        self.create_job(company="Initech", is_active=False, tags=["python"])
+        old = self.create_job(company="Globex", location="")
+        Job.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=60))
+
+        with self.assertNumQueries(1):
+            counts = facets.count_selection({"company": ["Globex"], "tags": ["python", "go"]})
+        # Each facet is counted with the other filters applied but not its own.
+        self.assertEqual(counts["company"], {"Acme": 1, "Globex": 2})
+        self.assertEqual(counts["tags"], {"go": 1, "python": 1})
+        self.assertEqual(counts["location"], {"Berlin": 1, "Remote": 1})
+        self.assertEqual(counts["job_type"], {Job.JobType.CONTRACT: 1, Job.JobType.FULL_TIME: 1})
+
+        counts = facets.count_selection({"time": "this_month"})
+        self.assertEqual(counts["company"], {"Globex": 2, "Acme": 1})
+        self.assertEqual(list(counts["tags"]), ["python", "django", "go"])
+        self.assertEqual(facets.count_selection({"tags": [None]})["company"], {})
+
+        response = self.client.post(reverse("job-filter"), {"company": "Acme"}, format="json")
+        self.assertEqual(response.data["facets"]["company"], {"Globex": 3, "Acme": 1})
+        self.assertEqual(response.data["facets"]["tags"], {"django": 1, "python": 1})
+
+
+class KeysetPaginationTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.user = User.objects.create_user(email="user@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+        self.jobs = [self.create_job(title=f"Job {i}") for i in range(7)]
+        # Give some jobs identical timestamps so the id tie-breaker matters.
+        Job.objects.filter(pk__in=[job.pk for job in self.jobs[2:5]]).update(updated_at=self.jobs[2].updated_at)
+        self.create_job(title="Inactive", is_active=False)
+
+    def collect_pages(self, url, method="get", page_size=3):
+        ids, cursor, pages = [], None, 0
+        while True:
+            query = f"?page_size={page_size}" + (f"&cursor={cursor}" if cursor else "")
+            response = getattr(self.client, method)(url + query, format="json")
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["jobs"]), page_size)
+            ids.extend(job["id"] for job in response.data["jobs"])
+            pages += 1
+            cursor = response.data["next"]
+            if not cursor:
+                return ids, pages
+
+    def test_pages_cover_active_jobs_once_in_order(self):
+        expected = list(Job.objects.filter(is_active=True).order_by("-updated_at", "-id").values_list("id", flat=True))
+        for url, method in ((reverse("job-list"), "get"), (reverse("job-filter"), "post")):
+            ids, pages = self.collect_pages(url, method)
+            self.assertEqual(ids, expected)
+            self.assertEqual(pages, 3)
+
+    def test_unpaginated_response_is_unchanged(self):
+        response = self.client.get(reverse("job-list"))
+        self.assertNotIn("next", response.data)
+        self.assertEqual(len(response.data["jobs"]), 7)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("job-list") + "?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_wrong_types(self):
+        timestamp = "2024-01-01T00:00:00+00:00"
+        for position in ([None, None], [1, 2], [{}, 1], [timestamp, timestamp], [timestamp, True], [timestamp, 1.5]):
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+            response = self.client.get(reverse("job-list"), {"page_size": 2, "cursor": cursor})
+            self.assertEqual(response.status_code, 404, position)
+        cursor = base64.urlsafe_b64encode(json.dumps([timestamp, 1]).encode()).decode()
+        self.assertEqual(self.client.get(reverse("job-list"), {"page_size": 2, "cursor": cursor}).status_code, 200)
+
+
+class JobListQueryCountTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.superuser = User.objects.create_superuser(email="admin@example.com", password="pass")
+
+    def create_jobs(self, count):
+        for i in range(count):
+            self.create_job(title=f"Job {i}", tags=["python", f"tag-{i}"])
+
+    def assertQueryCountIndependentOfSize(self, url, method, user, queries):
+        self.client.force_authenticate(user)
+        for count in (1, 10):
+            self.create_jobs(count)
+            with self.assertNumQueries(queries):
+                response = getattr(self.client, method)(url, format="json")
+            self.assertEqual(response.status_code, 200)
+
+    def test_job_list(self):
+        # change generation, facet index, jobs, tags
+        self.assertQueryCountIndependentOfSize(reverse("job-list"), "get", self.staff, 4)
+
+    def test_job_filter(self):
+        # facet index, jobs, tags, drill-down counts
+        self.assertQueryCountIndependentOfSize(reverse("job-filter"), "post", self.staff, 4)
+
+    def test_job_management_list(self):
+        # jobs, tags
+        self.assertQueryCountIndependentOfSize(reverse("job-manage-list-create"), "get", self.superuser, 2)
+
+    def test_job_detail(self):
+        job = self.create_job(tags=["python", "django"])
+        self.client.force_authenticate(self.staff)
+        # updated_at validator, job, tags
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("job-detail", args=[job.pk]))
+        self.assertEqual([tag["name"] for tag in response.data["tags"]], ["django", "python"])
+
+
+class QueryBudgetTests(QueryBudgetMixin, JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.superuser = User.objects.create_superuser(email="admin@example.com", password="pass")
+
+    def test_views_stay_within_budget(self):
+        cases = [
+            ("get", reverse("job-list"), self.staff),
+            ("post", reverse("job-filter"), self.staff),
+            ("get", reverse("job-manage-list-create"), self.superuser),
+            ("get", reverse("job-mine"), self.staff),
+            ("get", reverse("job-manage-analytics"), self.superuser),
+        ]
+        for count in (1, 10):
+            for i in range(count):
+                job = self.create_job(title=f"Job {i}", tags=["python", f"tag-{i}"])
+                UserJobMapping.objects.create(user=self.staff, job=job)
+            for method, url, user in cases:
+                with self.subTest(url=url, jobs=count):
+                    # Budgets include the token lookup of a cold cache.
+                    token_cache.clear()
+                    self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get_or_create(user=user)[0].key}")
+                    response = getattr(self.client, method)(url, {"tags": ["python"]} if method == "post" else None, format="json")
+                    self.assertEqual(response.status_code, 200)
+                    self.assertWithinQueryBudget(response)
+
+    def test_server_timing_header(self):
+        self.create_job(tags=["python"])
+        self.client.force_authenticate(self.staff)
+        metrics.reset()
+        self.assertNotIn("Server-Timing", self.client.get(reverse("job-list")))
+
+        with override_settings(REQUEST_TIMING_HEADERS=True):
+            response = self.client.get(reverse("job-list"))
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="4 queries", serialize;dur=[\d.]+, total;dur=[\d.]+$')
+        recorded = metrics.snapshot()
+        self.assertEqual(recorded["request.job-list.queries"]["last"], 4)
+        self.assertEqual(recorded["request.job-list.total_ms"]["count"], 2)
+        self.assertIn("request.job-list.serialize_ms", recorded)
+
+
+class UserStatusTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.user = User.objects.create_user(email="user@example.com", password="pass")
+        self.other = User.objects.create_user(email="other@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+        self.applied = self.create_job(title="Applied", tags=["python"])
+        self.bookmarked = self.create_job(title="Bookmarked")
+        self.untouched = self.create_job(title="Untouched")
+        self.hidden = self.create_job(title="Hidden", is_active=False)
+        self.track(self.applied, UserJobMapping.Status.APPLIED)
+        self.track(self.bookmarked, UserJobMapping.Status.BOOKMARKED)
+        self.track(self.hidden, UserJobMapping.Status.APPLIED)
+        UserJobMapping.objects.create(user=self.other, job=self.untouched, status=UserJobMapping.Status.APPLIED)
+
+    def track(self, job, status):
+        UserJobMapping.objects.update_or_create(user=self.user, job=job, defaults={"status": status})
+
+    def mine(self, query=""):
+        response = self.client.get(reverse("job-mine") + query)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_mine_lists_recent_activity_first(self):
+        jobs = self.mine()["jobs"]
+        self.assertEqual([(job["id"], job["status"]) for job in jobs], [(self.bookmarked.pk, "Bookmarked"), (self.applied.pk, "Applied")])
+        self.assertEqual(jobs[1]["tags"], [{"name": "python", "slug": "python"}])
+
+        self.track(self.applied, UserJobMapping.Status.BOOKMARKED)
+        self.assertEqual([job["id"] for job in self.mine("?status=Bookmarked")["jobs"]], [self.applied.pk, self.bookmarked.pk])
+        self.assertEqual(self.mine("?status=Applied")["jobs"], [])
+        self.assertEqual(self.client.get(reverse("job-mine") + "?status=Deleted").status_code, 400)
+
+    def test_mine_pagination(self):
+        first = self.mine("?page_size=1")
+        self.assertEqual([job["id"] for job in first["jobs"]], [self.bookmarked.pk])
+        second = self.mine(f"?page_size=1&cursor={first['next']}")
+        self.assertEqual([job["id"] for job in second["jobs"]], [self.applied.pk])
+        self.assertIsNone(second["next"])
+
+    def test_with_status_on_list_and_filter(self):
+        expected = {self.applied.pk: "Applied", self.bookmarked.pk: "Bookmarked", self.untouched.pk: None}
+        with CaptureQueriesContext(connection) as plain:
+            response = self.client.get(reverse("job-list"))
+        self.assertNotIn("status", response.data["jobs"][0])
+        self.assertIn("ETag", response)
+
+        with CaptureQueriesContext(connection) as annotated:
+            response = self.client.get(reverse("job-list") + "?with_status=1")
+        self.assertEqual({job["id"]: job["status"] for job in response.data["jobs"]}, expected)
+        self.assertNotIn("ETag", response)
+        # No change generation lookup for the ETag, and no extra query.
+        self.assertEqual(len(annotated), len(plain) - 1)
+
+        self.addCleanup(bitmaps.index._reset)
+        bitmaps.index.rebuild()
+        for index_enabled in (False, True):
+            with self.subTest(bitmap_index=index_enabled), override_settings(JOB_BITMAP_INDEX=index_enabled):
+                response = self.client.post(reverse("job-filter") + "?with_status=true&page_size=10", {}, format="json")
+                self.assertEqual({job["id"]: job["status"] for job in response.data["jobs"]}, expected)
+
+
+class JobListFastSerializerTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.staff.first_name = "Ada"
+        self.staff.save()
+
+    def test_renders_same_json_as_model_serializer(self):
+        self.create_job(tags=["python", "django"])
+        self.create_job(title="Intern", location=None, job_type=Job.JobType.INTERNSHIP)
+        self.create_job(posted_by=User.objects.create_user(email="anon@example.com"), tags=["go"])
+
+        queryset = Job.objects.order_by("-updated_at", "-id")
+        expected = JSONRenderer().render(JobListSerializer(queryset.prefetch_related("tags"), many=True).data)
+        fast = JobListFastSerializer(JobListFastSerializer.get_rows(queryset))
+        self.assertEqual(JSONRenderer().render(fast.data), expected)
+
+
+class JobSearchTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.user = User.objects.create_user(email="user@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+
+    def search(self, query="", **params):
+        return self.client.get(reverse("job-search"), {"q": query, **params})
+
+    def result_ids(self, response):
+        return [job["id"] for job in response.data["jobs"]]
+
+    def test_matches_title_company_description_and_tags(self):
+        by_title = self.create_job(title="Python Developer")
+        by_company = self.create_job(title="Analyst", company="Snake Labs")
+        by_description = self.create_job(title="Engineer", description="We write Python all day")
+        by_tag = self.create_job(title="Engineer", tags=["python"])
+        self.create_job(title="Designer")
+
+        ids = self.result_ids(self.search("python"))
+        self.assertCountEqual(ids, [by_title.pk, by_description.pk, by_tag.pk])
+        self.assertEqual(ids[0], by_title.pk)
+        self.assertEqual(self.result_ids(self.search("snake")), [by_company.pk])
+
+    def test_index_follows_updates(self):
+        job = self.create_job(title="Go Developer")
+        job.title = "Rust Developer"
+        job.save()
+        self.assertEqual(self.result_ids(self.search("rust")), [job.pk])
+        self.assertEqual(self.result_ids(self.search("go")), [])
+
+        tag = Tag.objects.create(name="kubernetes")
+        tag.jobs.add(job)
+        self.assertEqual(self.result_ids(self.search("kubernetes")), [job.pk])
+        tag.name = "k8s"
+        tag.save()
+        self.assertEqual(self.result_ids(self.search("kubernetes")), [])
+        self.assertEqual(self.result_ids(self.search("k8s")), [job.pk])
+        tag.delete()
+        self.assertEqual(self.result_ids(self.search("k8s")), [])
+
+        job.is_active = False
+        job.save()
+        self.assertEqual(self.result_ids(self.search("rust")), [])
+
+    def test_composes_with_filters_and_pagination(self):
+        remote = [self.create_job(title=f"Python Developer {i}", tags=["remote"]) for i in range(3)]
+        self.create_job(title="Python Developer", location="Berlin")
+
+        response = self.search("python developer", tags="remote", page_size=2)
+        self.assertEqual(len(response.data["jobs"]), 2)
+        next_page = self.search("python developer", tags="remote", page_size=2, cursor=response.data["next"])
+        self.assertIsNone(next_page.data["next"])
+        self.assertCountEqual(self.result_ids(response) + self.result_ids(next_page), [job.pk for job in remote])
+
+    def test_query_is_required_and_syntax_is_escaped(self):
+        self.assertEqual(self.search("").status_code, 400)
+        self.create_job(title="C++ Developer")
+        self.assertEqual(self.search('"c++" OR NEAR(').status_code, 200)
+
+
+@override_settings(JOB_BITMAP_INDEX=True)
+class BitmapIndexTests(JobTestMixin, APITestCase):
+    titles = ["Backend Engineer", "Data Engineer", "Designer"]
+    companies = ["Acme", "Globex", "Initech"]
+    locations = ["Remote", "Berlin", "", None]
+    tag_names = ["python", "django", "sql", "go", "remote"]
+
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.client.force_authenticate(self.staff)
+        bitmaps.index._reset()
+        self.addCleanup(bitmaps.index._reset)
+        # The first read after a write catches up with the change generation
+        # and goes over the view's query budget; that is expected here.
+        budget_logger = logging.getLogger("jobBoardProject.instrumentation")
+        budget_logger.disabled = True
+        self.addCleanup(setattr, budget_logger, "disabled", False)
+
+    def random_job(self, rng):
+        return self.create_job(
+            title=rng.choice(self.titles),
+            company=rng.choice(self.companies),
+            location=rng.choice(self.locations),
+            job_type=rng.choice(Job.JobType.values),
+            is_active=rng.random() < 0.8,
+            tags=rng.sample(self.tag_names, rng.randint(0, 3)),
+        )
+
+    def random_filters(self, rng):
+        pools = {
+            "tags": self.tag_names + ["missing"],
+            "title": self.titles,
+            "company": self.companies + ["Hooli"],
+            "location": self.locations,
+            "job_type": Job.JobType.values,
+        }
+        data = {key: rng.sample(pool, rng.randint(1, 2)) for key, pool in pools.items() if rng.random() < 0.4}
+        if rng.random() < 0.3:
+            data["time"] = rng.choice(facets.TIME_FILTERS)
+        return data
+
+    def mutate(self, rng):
+        jobs = list(Job.objects.all())
+        job = rng.choice(jobs)
+        action = rng.randrange(6)
+        if action == 0:
+            self.random_job(rng)
+        elif action == 1:
+            job.title, job.location = rng.choice(self.titles), rng.choice(self.locations)
+            job.is_active = not job.is_active
+            job.save()
+        elif action == 2:
+            job.delete()
+        elif action == 3:
+            job.tags.set([Tag.objects.get_or_create(name=name)[0] for name in rng.sample(self.tag_names, 2)])
+        elif action == 4:
+            tag = Tag.objects.order_by("?").first()
+            if tag:
+                tag.name, tag.slug = f"{tag.name}-{Tag.objects.count()}", ""
+                tag.save()
+                self.tag_names.append(tag.name)
+        else:
+            tag = Tag.objects.order_by("?").first()
+            if tag:
+                tag.jobs.clear()
+
+    def walk(self, data, page_size):
+        ids, cursor = [], None
+        while True:
+            query = f"?page_size={page_size}" + (f"&cursor={cursor}" if cursor else "")
+            response = self.client.post(reverse("job-filter") + query, data, format="json")
+            self.assertEqual(response.status_code, 200)
+            ids.extend(job["id"] for job in response.data["jobs"])
+            cursor = response.data["next"]
+            if not cursor:
+                return ids
+
+    def test_matches_sql_path(self):
+        # Property check without extra dependencies: random catalogues,
+        # mutations and filters, each compared against the SQL path.
+        rng = random.Random(1234)
+        for _ in range(30):
+            self.random_job(rng)
+        # Spread created_at so the time filters split the catalogue.
+        now = timezone.now()
+        for job in Job.objects.all():
+            Job.objects.filter(pk=job.pk).update(created_at=now - timedelta(hours=rng.choice([1, 12, 100, 500, 2000])))
+        bitmaps.index.rebuild()
+
+        for _ in range(15):
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(3):
+                    self.mutate(rng)
+            for _ in range(8):
+                data = self.random_filters(rng)
+                expected = filter_jobs(Job.objects.filter(is_active=True), data).values_list("id", flat=True)
+                with self.subTest(filters=data):
+                    self.assertCountEqual(bitmaps.index.match(data), expected)
+                    page_size = rng.randint(1, 5)
+                    indexed = self.walk(data, page_size)
+                    with override_settings(JOB_BITMAP_INDEX=False):
+                        self.assertEqual(indexed, self.walk(data, page_size))
+                    self.assertEqual(bitmaps.index.count(data), facets.count_selection(data))
+
+    def test_catches_up_with_other_processes(self):
+        job = self.create_job(tags=["python"])
+        other = self.create_job(title="Data Engineer")
+        self.assertCountEqual(self.walk({}, 10), [job.pk, other.pk])
+
+        # Writes that skip this process's signals, announced only by the
+        # change generation and found through updated_at and tombstones.
+        third = self.create_job(title="Designer")
+        Job.objects.filter(pk=job.pk).update(title="Staff Engineer", updated_at=timezone.now())
+        Job.objects.filter(pk=other.pk).update(is_active=False, updated_at=timezone.now())
+        third.delete()
+        generation.bump()
+        with CaptureQueriesContext(connection) as queries:
+            bitmaps.index.sync()
+        # Generation, changed jobs, their tags and tombstones; no full scan.
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(self.walk({"title": ["Staff Engineer"]}, 10), [job.pk])
+        self.assertEqual(self.walk({}, 10), [job.pk])
+
+    def test_own_writes_sync_on_commit(self):
+        job = self.create_job(tags=["python"])
+        bitmaps.index.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            job.title = "Staff Engineer"
+            job.save()
+        self.assertEqual(bitmaps.index.generation, generation.current())
+        self.assertEqual(bitmaps.index.match({"title": ["Staff Engineer"]}), [job.pk])
+        with self.assertNumQueries(1):
+            bitmaps.index.sync()
+
+    def test_bitset_helpers(self):
+        positions = [0, 3, 64, 1000]
+        bitmap = bitmaps.from_positions(positions, 1001)
+        self.assertEqual(bitmap, sum(1 << position for position in positions))
+        self.assertEqual(bitmaps.set_bits(bitmap), positions)
+        self.assertEqual(bitmaps.set_bits(0), [])
+
+    def test_chunked_bitmaps_behave_like_sets(self):
+        rng = random.Random(7)
+        # A dense chunk (bitset containers), sparse chunks and far-apart ids.
+        pool = list(range(5000)) + rng.sample(range(1 << 16, 1 << 20), 3000) + [1 << 40, (1 << 40) + 1]
+        first = set(rng.sample(range(5000), 4500)) | set(rng.sample(pool, 1000))
+        second = set(rng.sample(pool, 3000))
+        left, right = bitmaps.Bitmap.from_ids(first), bitmaps.Bitmap.from_ids(second)
+        self.assertIsInstance(left.chunks[0], int)
+        self.assertEqual(list(left & right), sorted(first & second))
+        self.assertEqual(list(left | right), sorted(first | second))
+        self.assertEqual(len(left), len(first))
+        for job_id in rng.sample(pool, 4000):
+            if job_id in first:
+                first.discard(job_id)
+                left.discard(job_id)
+            else:
+                first.add(job_id)
+                left.add(job_id)
+        self.assertEqual(list(left), sorted(first))
+        self.assertEqual(len(left), len(first))
+        self.assertTrue(all(left.chunks.values()))
+
+    def test_sparse_high_ids_stay_small(self):
+        high_ids = [10 ** 6 + 3, 5 * 10 ** 7, 2 ** 31 - 1]
+        for number, job_id in enumerate(high_ids):
+            self.create_job(id=job_id, title=f"Engineer {number}", company=f"Company {number}", tags=["python"])
+        bitmaps.index.rebuild()
+        size = sum(bitmap.nbytes() for bitmap in bitmaps.index.bitmaps.values()) + bitmaps.index.active.nbytes()
+        # Full-width bitsets would take several hundred MB here.
+        self.assertLess(size, 16 * 1024)
+        self.assertEqual(bitmaps.index.match({"title": ["Engineer 1"]}), [5 * 10 ** 7])
+        self.assertEqual(bitmaps.index.count({"tags": ["python"]}), facets.count_selection({"tags": ["python"]}))
+
+
+class ConditionalGetTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.user = User.objects.create_user(email="user@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+        self.job = self.create_job(tags=["python"])
+
+    def assertNotModified(self, url, etag, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        return response["ETag"]
+
+    def test_job_list(self):
+        url = reverse("job-list")
+        etag = self.client.get(url)["ETag"]
+        self.assertNotModified(url, etag, queries=1)
+        self.assertModified(url + "?page_size=1", etag)
+
+        # Writers bump the change generation when they commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            other = self.create_job(title="Other")
+        etag = self.assertModified(url, etag)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        etag = self.assertModified(url, etag)
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.filter(name="python").get().jobs.clear()
+        etag = self.assertModified(url, etag)
+        with self.captureOnCommitCallbacks(execute=False):
+            self.create_job(title="Not committed")
+        self.assertNotModified(url, etag, queries=1)
+
+    def test_job_detail(self):
+        url = reverse("job-detail", args=[self.job.pk])
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertNotModified(url, etag, queries=1)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+        tag = Tag.objects.get(name="python")
+        tag.name = "python3"
+        tag.save()
+        etag = self.assertModified(url, etag)
+
+        self.job.is_active = False
+        self.job.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+
+class JobManagementBulkTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.client.force_authenticate(self.staff)
+        self.url = reverse("job-manage-bulk")
+
+    def job_data(self, **kwargs):
+        data = {"title": "Engineer", "company": "Acme", "location": "Remote", "application_link": "https://example.com/apply"}
+        data.update(kwargs)
+        return data
+
+    def test_creates_and_updates_with_per_item_errors(self):
+        Tag.objects.create(name="python")
+        mine = self.create_job(title="Old title", tags=["python", "legacy"])
+        theirs = self.create_job(posted_by=self.create_staff("other@example.com"))
+        payload = [
+            self.job_data(title=f"Job {i}", tags=["Python", "django", f"tag-{i % 3}"]) for i in range(25)
+        ] + [
+            self.job_data(id=mine.pk, title="New title", tags=["go"]),
+            self.job_data(id=theirs.pk, title="Not mine"),
+            self.job_data(application_link="not a url"),
+            "not an object",
+        ]
+
+        # tags upsert + fetch, duplicate check, previous tags, jobs, tag links,
+        # search index, signatures and counters
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format="json")
+        self.assertLess(len(queries), 40)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["created"]), 25)
+        self.assertEqual(response.data["updated"], [mine.pk])
+        self.assertEqual([error["index"] for error in response.data["errors"]], [26, 27, 28])
+
+        created = Job.objects.get(title="Job 4")
+        self.assertEqual(sorted(created.tags.values_list("name", flat=True)), ["django", "python", "tag-1"])
+        mine.refresh_from_db()
+        self.assertEqual(mine.title, "New title")
+        self.assertEqual(list(mine.tags.values_list("name", flat=True)), ["go"])
+        theirs.refresh_from_db()
+        self.assertNotEqual(theirs.title, "Not mine")
+
+        indexed = {(facet, value): count for facet, value, count in FacetValue.objects.values_list("facet", "value", "job_count")}
+        self.assertEqual(indexed, dict(facets.count_active_values()))
+        search = self.client.get(reverse("job-search"), {"q": "django"})
+        self.assertEqual(len(search.data["jobs"]), 25)
+
+    def test_all_invalid_is_bad_request(self):
+        response = self.client.post(self.url, [self.job_data(title="")], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["errors"][0]["index"], 0)
+        self.assertEqual(self.client.post(self.url, {}, format="json").status_code, 400)
+
+    def test_single_create_attaches_tags(self):
+        response = self.client.post(reverse("job-manage-list-create"), self.job_data(tags=[" Rust ", "rust"]), format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["tags"], [{"name": "rust", "slug": "rust"}])
+
+    def test_single_update_keeps_tags_unless_given(self):
+        job = self.create_job(tags=["python"])
+        url = reverse("job-manage-detail", args=[job.pk])
+        response = self.client.post(url, self.job_data(title="Senior Engineer"), format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(job.tags.values_list("name", flat=True)), ["python"])
+        response = self.client.post(url, self.job_data(tags=[]), format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(job.tags.exists())
+
+    def test_single_writes_validate_tags(self):
+        Tag.objects.create(name="c#", slug="c")
+        url = reverse("job-manage-list-create")
+        for tags in ("python", ["python", 3], ["c++"]):
+            with self.subTest(tags=tags):
+                response = self.client.post(url, self.job_data(tags=tags), format="json")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("tags", response.data)
+        self.assertFalse(Job.objects.exists())
+
+        job = self.create_job(title="Old title", tags=["python"])
+        response = self.client.post(
+            reverse("job-manage-detail", args=[job.pk]), self.job_data(title="New title", tags=["c++"]), format="json",
+        )
+        self.assertEqual(response.data, {"tags": ["Tag 'c++' conflicts with an existing tag."]})
+        job.refresh_from_db()
+        self.assertEqual((job.title, list(job.tags.values_list("name", flat=True))), ("Old title", ["python"]))
+
+
+class DuplicateDetectionTests(JobTestMixin, APITestCase):
+    DESCRIPTION = (
+        "We are looking for a backend engineer to design, build and operate the APIs behind our job board. "
+        "You will work with Python, Django and PostgreSQL, own services end to end and mentor other engineers."
+    )
+
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.client.force_authenticate(self.staff)
+        self.original = self.create_job(description=self.DESCRIPTION)
+
+    def job_data(self, **kwargs):
+        data = {
+            "title": "Backend Engineer", "company": "Acme", "location": "Remote",
+            "description": self.DESCRIPTION.replace("operate", "run"), "application_link": "https://example.com/apply",
+        }
+        data.update(kwargs)
+        return data
+
+    def test_signatures_estimate_similarity(self):
+        original = dedup.signature("Backend Engineer", "Acme", self.DESCRIPTION)
+        reworded = dedup.signature("Backend Engineer!", "ACME", self.DESCRIPTION.replace("operate", "run"))
+        unrelated = dedup.signature("Pastry Chef", "Bakery", "Bake bread and cakes every morning for our shop.")
+        self.assertGreaterEqual(dedup.similarity(original, reworded), 0.8)
+        self.assertLess(dedup.similarity(original, unrelated), 0.2)
+        self.assertEqual(dedup.unpack(dedup.pack(original)), original)
+
+    def test_single_create_holds_back_near_duplicates(self):
+        url = reverse("job-manage-list-create")
+        response = self.client.post(url, self.job_data(), format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["is_active"], response.data["duplicate_of"]), (False, self.original.pk))
+
+        response = self.client.post(url, self.job_data(allow_duplicate=True), format="json")
+        self.assertEqual((response.data["is_active"], response.data["duplicate_of"]), (True, None))
+        # String values are parsed as booleans.
+        response = self.client.post(url, self.job_data(allow_duplicate="false"), format="json")
+        self.assertFalse(response.data["is_active"])
+        self.assertIsNotNone(response.data["duplicate_of"])
+        response = self.client.post(url, self.job_data(allow_duplicate="maybe"), format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("allow_duplicate", response.data)
+        response = self.client.post(url, self.job_data(title="Pastry Chef", description="Bake bread."), format="json")
+        self.assertEqual((response.data["is_active"], response.data["duplicate_of"]), (True, None))
+
+        # Only active jobs count as originals.
+        Job.objects.exclude(title="Pastry Chef").update(is_active=False)
+        response = self.client.post(url, self.job_data(), format="json")
+        self.assertEqual((response.data["is_active"], response.data["duplicate_of"]), (True, None))
+
+    def test_single_create_reuses_the_checked_signature(self):
+        with mock.patch.object(dedup, "signature", wraps=dedup.signature) as signature:
+            response = self.client.post(reverse("job-manage-list-create"), self.job_data(title="Pastry Chef", description="Bake bread."), format="json")
+        self.assertEqual(response.status_code, 201)
+        # Hashed once for the check; the stored signature reuses it.
+        self.assertEqual(signature.call_count, 1)
+        self.assertEqual(JobSignatureBand.objects.filter(job_id=response.data["id"]).count(), dedup.BANDS)
+
+    def test_bulk_flags_duplicates_of_existing_and_earlier_items(self):
+        payload = [
+            self.job_data(),
+            self.job_data(title="Data Engineer", description="Build pipelines in Spark and keep our warehouse tidy and fast."),
+            self.job_data(title="Data Engineer", description="Build pipelines in Spark and keep our warehouse tidy and fast!"),
+            self.job_data(title="Pastry Chef", description="Bake bread."),
+        ]
+        with mock.patch.object(dedup, "signature", wraps=dedup.signature) as signature:
+            response = self.client.post(reverse("job-manage-bulk"), payload, format="json")
+        self.assertEqual(response.status_code, 200)
+        # Hashed once for the check; the stored signatures reuse it.
+        self.assertEqual(signature.call_count, len(payload))
+        self.assertEqual(JobSignatureBand.objects.filter(job_id__in=response.data["created"]).count(), dedup.BANDS * len(payload))
+        created = response.data["created"]
+        self.assertEqual(response.data["duplicates"], [
+            {"index": 0, "id": created[0], "duplicate_of": self.original.pk},
+            {"index": 2, "id": created[2], "duplicate_of": created[1]},
+        ])
+        self.assertEqual(list(Job.objects.filter(pk__in=created, is_active=True).order_by("pk").values_list("pk", flat=True)),
+                         [created[1], created[3]])
+        indexed = {(facet, value): count for facet, value, count in FacetValue.objects.values_list("facet", "value", "job_count")}
+        self.assertEqual(indexed, dict(facets.count_active_values()))
+
+    def test_signatures_follow_edits_and_backfill(self):
+        signature = dedup.signature(self.original.title, self.original.company, self.original.description)
+        self.assertEqual(dedup.find_duplicates([signature])[0].job_id, self.original.pk)
+        with mock.patch.object(dedup, "signature", wraps=dedup.signature) as signing:
+            self.original.is_active = False
+            self.original.save()
+            self.original.is_active = True
+            self.original.save()
+        # Saves that leave the text alone keep the stored signature.
+        self.assertEqual(signing.call_count, 0)
+        self.original.description = "Something else entirely, about running a bakery."
+        self.original.save()
+        self.assertIsNone(dedup.find_duplicates([signature])[0])
+
+        JobSignature.objects.all().delete()
+        JobSignatureBand.objects.all().delete()
+        out = StringIO()
+        call_command("backfill_signatures", stdout=out)
+        self.assertIn("Indexed signatures for 1 jobs", out.getvalue())
+        self.assertEqual(JobSignatureBand.objects.filter(job=self.original).count(), dedup.BANDS)
+
+
+class SimilarJobsTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.client.force_authenticate(self.staff)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(JOB_SIMILAR_INDEX_PATH=os.path.join(directory.name, "similar.idx"))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.job = self.create_job(description="Build Django REST APIs on PostgreSQL.", tags=["python", "django"])
+        self.twin = self.create_job(title="Senior Backend Engineer", description="Build REST APIs with Django.", tags=["python"])
+        self.tagged = self.create_job(title="Data Analyst", company="Initech", description="Dashboards.", tags=["python", "django"])
+        self.other = self.create_job(title="Pastry Chef", company="Bakery", description="Bake bread and cakes.", tags=["baking"])
+
+    def similar_ids(self, job=None):
+        response = self.client.get(reverse("job-similar", args=[(job or self.job).pk]))
+        self.assertEqual(response.status_code, 200)
+        return [job["id"] for job in response.data["jobs"]]
+
+    def test_ranks_by_wording_and_tags(self):
+        self.assertEqual(self.similar_ids(), [])
+        self.assertEqual(similar.build(), (4, 4))
+        self.assertEqual(self.similar_ids(), [self.twin.pk, self.tagged.pk])
+        response = self.client.get(reverse("job-similar", args=[self.job.pk]), {"limit": 1})
+        self.assertEqual(len(response.data["jobs"]), 1)
+        self.assertGreater(response.data["jobs"][0]["score"], 0)
+        self.assertEqual(self.client.get(reverse("job-similar", args=[self.other.pk + 100])).status_code, 404)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.similar_ids()
+        self.assertEqual(len(queries), 2)
+
+    @mock.patch.object(similar, "FULL_REBUILD_FRACTION", 0.5)
+    def test_incremental_rebuild(self):
+        Job.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        similar.build()
+        self.twin.is_active = False
+        self.twin.save()
+        # Dropped right away, before the next build.
+        self.assertEqual(self.similar_ids(), [self.tagged.pk])
+
+        Job.objects.filter(pk=self.other.pk).update(
+            title="Backend Engineer", description="Build Django REST APIs on PostgreSQL.", updated_at=timezone.now(),
+        )
+        out = StringIO()
+        call_command("build_similar_jobs", stdout=out)
+        self.assertIn("Indexed 3 jobs (1 re-read)", out.getvalue())
+        self.assertEqual(self.similar_ids(), [self.other.pk, self.tagged.pk])
+        self.assertIsNone(similar.get_index().position(self.twin.pk))
+
+        similar.build(full=True)
+        self.assertEqual(self.similar_ids(), [self.other.pk, self.tagged.pk])
+
+
+class ForYouFeedTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(JOB_RECOMMENDATIONS_PATH=os.path.join(directory.name, "recommendations.bin"))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.a, self.b, self.c, self.d, self.e = (
+            self.create_job(title=f"Job {name}", tags=[tag])
+            for name, tag in zip("abcde", ["python", "go", "rust", "python", "baking"])
+        )
+        self.user, *others, self.newcomer = (
+            User.objects.create_user(email=f"user{i}@example.com", password="pass") for i in range(4)
+        )
+        Status = UserJobMapping.Status
+        for user, job, status in [
+            (self.user, self.a, Status.CLICKED),
+            (others[0], self.a, Status.APPLIED), (others[0], self.b, Status.APPLIED),
+            (others[1], self.a, Status.CLICKED), (others[1], self.b, Status.CLICKED), (others[1], self.c, Status.CLICKED),
+        ]:
+            UserJobMapping.objects.create(user=user, job=job, status=status)
+
+    def feed_ids(self, user=None, **params):
+        self.client.force_authenticate(user or self.user)
+        response = self.client.get(reverse("job-for-you"), params)
+        self.assertEqual(response.status_code, 200)
+        return [job["id"] for job in response.data["jobs"]]
+
+    def test_neighbours_then_tags_then_popular(self):
+        # Before the first build: the latest jobs the user hasn't seen.
+        self.assertEqual(self.feed_ids(), [self.e.pk, self.d.pk, self.c.pk, self.b.pk])
+
+        out = StringIO()
+        call_command("build_recommendations", stdout=out)
+        self.assertIn("Fitted 5 jobs and 3 users.", out.getvalue())
+        # b was seen by both users who share a with this user, c by one; d
+        # shares a's tag; e has neither and only tops up the feed.
+        self.assertEqual(self.feed_ids(), [self.b.pk, self.c.pk, self.d.pk, self.e.pk])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.feed_ids(limit=3), [self.b.pk, self.c.pk, self.d.pk])
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(self.feed_ids(self.newcomer), [self.a.pk, self.b.pk, self.c.pk, self.e.pk, self.d.pk])
+
+        # Activity and deactivation since the build are applied when serving,
+        # and the latest jobs fill the gap.
+        UserJobMapping.objects.create(user=self.user, job=self.b, status=UserJobMapping.Status.APPLIED)
+        self.c.is_active = False
+        self.c.save()
+        self.assertEqual(self.feed_ids(limit=2), [self.d.pk, self.e.pk])
+        self.d.is_active = False
+        self.d.save()
+        self.assertEqual(self.feed_ids(limit=1), [self.e.pk])
+
+    def test_model_file_round_trip(self):
+        recommend.build()
+        fitted = recommend.fit(*recommend.load_interactions())
+        loaded = recommend.get_model()
+        for name, code in recommend.SECTIONS:
+            self.assertEqual(list(getattr(loaded, name)), list(array(code, getattr(fitted, name))), name)
+
+
+class AdminScalingTests(JobTestMixin, TestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.client.force_login(User.objects.create_superuser(email="admin@example.com", password="pass"))
+        self.job = self.create_job(tags=["python"])
+        self.create_job(location="Berlin", tags=["go"])
+
+    def changelist_ids(self, **params):
+        response = self.client.get(reverse("admin:jobs_job_changelist"), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(job.pk for job in response.context["cl"].result_list)
+
+    def test_input_filters(self):
+        self.assertEqual(self.changelist_ids(tag="python"), [self.job.pk])
+        self.assertEqual(self.changelist_ids(location="Remote", tag="python"), [self.job.pk])
+        self.assertEqual(self.changelist_ids(location="Remote", tag="go"), [])
+        response = self.client.get(reverse("admin:jobs_job_changelist"), {"location": "Berlin"})
+        self.assertContains(response, '<input type="hidden" name="location" value="Berlin">')
+        self.assertContains(response, '<option value="python">')
+
+    def test_activity_summary_and_list_queries_do_not_grow(self):
+        url = reverse("admin:jobs_job_change", args=[self.job.pk])
+        mapping_list = reverse("admin:jobs_userjobmapping_changelist")
+        # Warm up per-process lookups such as content types.
+        self.client.get(url)
+        for count in (1, 10):
+            for i in range(count):
+                user = User.objects.create_user(email=f"user-{count}-{i}@example.com", password="pass")
+                UserJobMapping.objects.create(user=user, job=self.job, status=UserJobMapping.Status.APPLIED if i % 2 else UserJobMapping.Status.CLICKED)
+            with CaptureQueriesContext(connection) as change_queries:
+                response = self.client.get(url)
+            self.assertContains(response, f'?job__id__exact={self.job.pk}')
+            with CaptureQueriesContext(connection) as list_queries:
+                listed = self.client.get(mapping_list, {"job__id__exact": self.job.pk})
+            self.assertEqual(listed.context["cl"].result_count, UserJobMapping.objects.count())
+            if count == 1:
+                change_count, list_count = len(change_queries), len(list_queries)
+        self.assertContains(response, "Applied: 5, Clicked: 6")
+        self.assertEqual(len(change_queries), change_count)
+        self.assertEqual(len(list_queries), list_count)
+
+    def test_mapping_search(self):
+        user = User.objects.create_user(email="Jane@example.com", password="pass")
+        other = self.create_job(title="Data Engineer", company="Globex")
+        mapping = UserJobMapping.objects.create(user=user, job=self.job)
+        other_mapping = UserJobMapping.objects.create(user=self.staff, job=other)
+        searches = {"jane@EXAMPLE.com": [mapping.pk], "backend eng": [mapping.pk], "glob": [other_mapping.pk], "engineer": []}
+        for term, expected in searches.items():
+            response = self.client.get(reverse("admin:jobs_userjobmapping_changelist"), {"q": term})
+            self.assertEqual([row.pk for row in response.context["cl"].result_list], expected, term)
+
+    def test_paginator_caps_count_without_estimate(self):
+        paginator = EstimatedCountPaginator(Job.objects.order_by("pk"), 1)
+        self.assertEqual(paginator.count, 2)
+        with mock.patch.object(EstimatedCountPaginator, "COUNT_LIMIT", 1):
+            self.assertEqual(EstimatedCountPaginator(Job.objects.order_by("pk"), 1).count, 1)
+
+
+class ActivityBufferTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.user = User.objects.create_user(email="user@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+        self.job = self.create_job()
+        self.url = reverse("job-detail", args=[self.job.pk])
+        metrics.reset()
+
+    def track(self, activity):
+        response = self.client.post(self.url, {"action": "activity", "activity": activity}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def mapping_status(self):
+        return UserJobMapping.objects.get(user=self.user, job=self.job).status
+
+    def test_buffered_events_are_flushed_in_batches(self):
+        for status in ("Clicked", "Applied", "Clicked", "Bookmarked"):
+            self.track(status)
+        self.assertFalse(UserJobMapping.objects.exists())
+        self.assertEqual(ActivityEvent.objects.count(), 4)
+
+        call_command("flush_activity", stdout=StringIO())
+        self.assertEqual(self.mapping_status(), UserJobMapping.Status.APPLIED)
+        self.assertFalse(ActivityEvent.objects.exists())
+        self.assertEqual(metrics.snapshot()["activity.flush.batch_size"]["last"], 4)
+
+        self.track("Clicked")
+        activity.flush()
+        self.assertEqual(self.mapping_status(), UserJobMapping.Status.APPLIED)
+
+    @override_settings(JOB_ACTIVITY_MODE="sync")
+    def test_sync_mode_writes_immediately_without_downgrading(self):
+        self.track("Bookmarked")
+        self.assertEqual(self.mapping_status(), UserJobMapping.Status.BOOKMARKED)
+        self.track("Clicked")
+        self.assertEqual(self.mapping_status(), UserJobMapping.Status.BOOKMARKED)
+        self.track("Applied")
+        self.assertEqual(self.mapping_status(), UserJobMapping.Status.APPLIED)
+        self.assertFalse(ActivityEvent.objects.exists())
+
+    def test_pairs_inserted_concurrently_keep_precedence(self):
+        Status = UserJobMapping.Status
+        other = self.create_job(title="Other")
+        # Another writer inserts both pairs between our locked read and our
+        # insert.
+        UserJobMapping.objects.create(user=self.user, job=self.job, status=Status.BOOKMARKED)
+        UserJobMapping.objects.create(user=self.user, job=other, status=Status.APPLIED)
+        reads = iter([lambda wanted: {}, activity._locked_mappings])
+        with mock.patch.object(activity, "_locked_mappings", side_effect=lambda wanted: next(reads)(wanted)):
+            transitions = activity.apply_events([
+                (self.user.pk, self.job.pk, Status.APPLIED), (self.user.pk, other.pk, Status.CLICKED),
+            ])
+        self.assertEqual(transitions, [(self.job.pk, Status.BOOKMARKED, Status.APPLIED)])
+        self.assertEqual(self.mapping_status(), Status.APPLIED)
+        self.assertEqual(UserJobMapping.objects.get(job=other).status, Status.APPLIED)
+        self.assertEqual(
+            list(JobEngagement.objects.values_list("job", "click_count", "bookmark_count", "apply_count")),
+            [(self.job.pk, 0, 0, 1)],
+        )
+
+    def test_stats_endpoint(self):
+        self.track("Clicked")
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse("job-manage-activity"))
+        self.assertEqual(response.data["pending"], 1)
+        self.assertGreaterEqual(response.data["lag_seconds"], 0)
+
+
+@override_settings(JOB_ACTIVITY_MODE="sync")
+class EngagementTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.other_staff = self.create_staff("other@example.com")
+        self.users = [User.objects.create_user(email=f"user-{i}@example.com", password="pass") for i in range(3)]
+        self.job = self.create_job()
+        self.popular = self.create_job(title="Popular")
+        self.foreign = self.create_job(posted_by=self.other_staff)
+
+    def track(self, user, job, *activities):
+        self.client.force_authenticate(user)
+        for activity_name in activities:
+            self.client.post(reverse("job-detail", args=[job.pk]), {"action": "activity", "activity": activity_name}, format="json")
+
+    def counts(self, job):
+        row = JobEngagement.objects.filter(job=job).first()
+        return [getattr(row, counter, 0) for counter in engagement.COUNTERS]
+
+    def test_counters_follow_the_funnel(self):
+        self.track(self.users[0], self.job, "Clicked", "Applied", "Clicked", "Bookmarked")
+        self.track(self.users[1], self.job, "Bookmarked")
+        with override_settings(JOB_ACTIVITY_MODE="buffered"):
+            self.track(self.users[2], self.job, "Clicked", "Clicked")
+        activity.flush()
+        self.assertEqual(self.counts(self.job), [3, 2, 1])
+        today = JobEngagementDay.objects.get(job=self.job)
+        self.assertEqual((today.day, today.click_count, today.bookmark_count, today.apply_count), (timezone.localdate(), 3, 2, 1))
+        self.assertEqual(self.counts(self.popular), [0, 0, 0])
+
+    def test_deleted_and_edited_mappings_leave_the_counters(self):
+        self.track(self.users[0], self.job, "Applied")
+        self.track(self.users[1], self.job, "Bookmarked")
+        self.users[0].delete()
+        self.assertEqual(self.counts(self.job), [1, 1, 0])
+
+        self.client.force_login(User.objects.create_superuser(email="admin@example.com", password="pass"))
+        mapping = UserJobMapping.objects.get(user=self.users[1])
+        response = self.client.post(reverse("admin:jobs_userjobmapping_change", args=[mapping.pk]), {
+            "user": self.users[1].pk, "job": self.popular.pk, "status": UserJobMapping.Status.CLICKED,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual([self.counts(self.job), self.counts(self.popular)], [[0, 0, 0], [1, 0, 0]])
+        response = self.client.post(reverse("admin:jobs_userjobmapping_changelist"), {
+            "action": "delete_selected", "_selected_action": [mapping.pk], "post": "yes",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.counts(self.popular), [0, 0, 0])
+        self.assertEqual(engagement.reconcile(), 0)
+
+    def test_reconcile_repairs_drift(self):
+        self.track(self.users[0], self.job, "Applied")
+        self.track(self.users[1], self.popular, "Clicked")
+        UserJobMapping.objects.create(user=self.users[2], job=self.foreign, status=UserJobMapping.Status.BOOKMARKED)
+        JobEngagement.objects.filter(job=self.job).update(apply_count=0)
+        JobEngagement.objects.filter(job=self.popular).update(click_count=7)
+
+        out = StringIO()
+        call_command("reconcile_engagement", "--batch-size", "2", stdout=out)
+        self.assertIn("for 3 jobs", out.getvalue())
+        self.assertEqual([self.counts(job) for job in (self.job, self.popular, self.foreign)], [[1, 1, 1], [1, 0, 0], [1, 1, 0]])
+        self.assertEqual(engagement.reconcile(), 0)
+
+    def test_analytics_endpoints(self):
+        for user in self.users:
+            self.track(user, self.popular, "Clicked")
+        self.track(self.users[0], self.job, "Applied")
+        self.track(self.users[1], self.foreign, "Applied")
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse("job-manage-analytics"), {"sort": "click_count"})
+        self.assertEqual(
+            [(job["id"], job["click_count"], job["apply_count"]) for job in response.data["jobs"]],
+            [(self.popular.pk, 3, 0), (self.job.pk, 1, 1)],
+        )
+        first = self.client.get(reverse("job-manage-analytics"), {"page_size": 1}).data
+        self.assertEqual([job["id"] for job in first["jobs"]], [self.job.pk])
+        second = self.client.get(reverse("job-manage-analytics"), {"page_size": 1, "cursor": first["next"]}).data
+        self.assertEqual([job["id"] for job in second["jobs"]], [self.popular.pk])
+        self.assertEqual(self.client.get(reverse("job-manage-analytics"), {"sort": "id"}).status_code, 400)
+
+        # Jobs without a counters row rank at 0, merged by id with the
+        # counters rows at 0, on one page or across pages.
+        unseen = self.create_job(title="Unseen")
+        expected = [(self.job.pk, 1), (unseen.pk, 0), (self.popular.pk, 0)]
+        response = self.client.get(reverse("job-manage-analytics"), {"sort": "bookmark_count"})
+        self.assertEqual([(job["id"], job["bookmark_count"]) for job in response.data["jobs"]], expected)
+        pages, cursor = [], None
+        while True:
+            params = {"sort": "bookmark_count", "page_size": 1, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get(reverse("job-manage-analytics"), params)
+            pages.append([(job["id"], job["bookmark_count"]) for job in response.data["jobs"]])
+            cursor = response.data["next"]
+            if cursor is None:
+                break
+        self.assertEqual(pages, [[row] for row in expected])
+
+        managed = {job["id"]: job["engagement"] for job in self.client.get(reverse("job-manage-list-create")).data}
+        self.assertEqual(managed[self.popular.pk], {"click_count": 3, "bookmark_count": 0, "apply_count": 0})
+
+        url = reverse("job-manage-analytics-detail", args=[self.job.pk])
+        detail = self.client.get(url, {"days": 7}).data
+        self.assertEqual(detail["totals"], {"click_count": 1, "bookmark_count": 1, "apply_count": 1})
+        self.assertEqual(detail["days"], [{"day": timezone.localdate().isoformat(), "click_count": 1, "bookmark_count": 1, "apply_count": 1}])
+        self.assertEqual(self.client.get(url, {"days": 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("job-manage-analytics-detail", args=[self.foreign.pk])).status_code, 403)
+
+
+@override_settings(JOB_CHANGES_SETTLE_SECONDS=0)
+class ChangesFeedTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.client.force_authenticate(self.staff)
+        self.jobs = [self.create_job(title=f"Job {i}", tags=["python"]) for i in range(3)]
+
+    def sync(self, cursor=None, page_size=2):
+        changed = []
+        while True:
+            params = {"page_size": page_size, **({"since": cursor} if cursor else {})}
+            response = self.client.get(reverse("job-changes"), params)
+            self.assertEqual(response.status_code, 200)
+            changed.extend((change["id"], change["action"]) for change in response.data["changes"])
+            cursor = response.data["next"]
+            if not response.data["has_more"]:
+                return changed, cursor
+
+    def test_incremental_sync(self):
+        changed, cursor = self.sync()
+        self.assertEqual(changed, [(job.pk, "upsert") for job in self.jobs])
+        self.assertEqual(self.sync(cursor)[0], [])
+
+        first, second, third = self.jobs
+        second.is_active = False
+        second.save()
+        third_id = third.pk
+        third.delete()
+        first.tags.add(Tag.objects.create(name="django"))
+        new = self.create_job(title="New")
+        changed, cursor = self.sync(cursor)
+        self.assertCountEqual(changed, [(second.pk, "deactivate"), (third_id, "delete"), (first.pk, "upsert"), (new.pk, "upsert")])
+
+        response = self.client.get(reverse("job-changes"), {"since": cursor})
+        self.assertEqual(response.data["changes"], [])
+        Job.objects.filter(pk=new.pk).update(title="Renamed", updated_at=timezone.now())
+        job = self.client.get(reverse("job-changes"), {"since": cursor}).data["changes"][0]["job"]
+        self.assertEqual((job["id"], job["title"], job["tags"]), (new.pk, "Renamed", []))
+
+    def test_unsettled_changes_wait(self):
+        _, cursor = self.sync()
+        self.jobs[0].save()
+        with override_settings(JOB_CHANGES_SETTLE_SECONDS=60):
+            self.assertEqual(self.sync(cursor)[0], [])
+        self.assertEqual(self.sync(cursor)[0], [(self.jobs[0].pk, "upsert")])
+
+    def test_expired_and_invalid_cursors(self):
+        _, cursor = self.sync()
+        self.jobs[0].delete()
+        JobTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=40))
+        out = StringIO()
+        call_command("prune_tombstones", stdout=out)
+        self.assertIn("Pruned 1 job tombstones", out.getvalue())
+
+        with override_settings(JOB_TOMBSTONE_RETENTION_DAYS=0):
+            self.assertEqual(self.client.get(reverse("job-changes"), {"since": cursor}).status_code, 410)
+        self.assertEqual(self.client.get(reverse("job-changes"), {"since": "bogus"}).status_code, 404)
+
+
+class ExportTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.token = Token.objects.create(user=self.staff)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.job = self.create_job(tags=["python", "django"])
+        self.create_job(title="Data, \"Analytics\"", location=None)
+        self.create_job(title="Hidden", is_active=False)
+
+    def export(self, url=None, **kwargs):
+        response = self.client.get(url or reverse("job-export"), **kwargs)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson_matches_listing(self):
+        response, body = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        expected = JobListFastSerializer(JobListFastSerializer.get_rows(Job.objects.filter(is_active=True).order_by("id"))).data
+        self.assertEqual([json.loads(line) for line in body.splitlines()], json.loads(json.dumps(expected)))
+
+    def test_csv(self):
+        for kwargs in ({"data": {"format": "csv"}}, {"HTTP_ACCEPT": "text/csv"}):
+            response, body = self.export(**kwargs)
+            self.assertEqual(response["Content-Disposition"], 'attachment; filename="jobs.csv"')
+            rows = list(csv.reader(StringIO(body)))
+            self.assertEqual(rows[0], list(export.CSV_COLUMNS))
+            self.assertEqual([row[1] for row in rows[1:]], ["Backend Engineer", 'Data, "Analytics"'])
+            self.assertEqual((rows[1][6], rows[2][3]), ("django|python", ""))
+
+    def test_chunks_and_errors(self):
+        chunks = list(export.iter_export("ndjson", chunk_size=1))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(self.client.get(reverse("job-export"), {"format": "xml"}).status_code, 404)
+        self.client.credentials()
+        response = self.client.get(reverse("job-export"), {"format": "csv"})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.content.decode().splitlines()[0], "detail")
+
+    async def test_async_export_matches(self):
+        for export_format in ("ndjson", "csv"):
+            _, expected = await sync_to_async(self.export)(data={"format": export_format})
+            response = await self.async_client.get(
+                reverse("async-job-export"), {"format": export_format}, headers={"Authorization": f"Token {self.token.key}"},
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b"".join([chunk async for chunk in response.streaming_content]).decode(), expected)
+
+    def test_memory_stays_flat(self):
+        # Peak memory while streaming 100k jobs is bounded by a few chunks,
+        # far below the size of the export itself.
+        Job.objects.bulk_create(
+            [Job(posted_by=self.staff, title=f"Job {i}", company="Acme", location="Remote", application_link="https://example.com")
+             for i in range(1000)],
+        )
+        # Copy rows in SQL, which is much faster than building 100k models.
+        columns = "posted_by_id, job_type, title, company, location, application_link, is_active, created_at, updated_at"
+        with connection.cursor() as cursor:
+            while (active := Job.objects.filter(is_active=True).count()) < 100_000:
+                cursor.execute(
+                    f"INSERT INTO jobs_job ({columns}) SELECT {columns} FROM jobs_job WHERE is_active LIMIT %s",
+                    [100_000 - active],
+                )
+        response = self.client.get(reverse("job-export"))
+        size = lines = 0
+        tracemalloc.start()
+        try:
+            for chunk in response.streaming_content:
+                size += len(chunk)
+                lines += chunk.count(b"\n")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(lines, 100_000)
+        self.assertLess(peak, 10 * 1024 * 1024)
+        self.assertLess(peak, size / 4)
+
+
+class ArchiveTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.user = User.objects.create_user(email="user@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+        long_ago = timezone.now() - timedelta(days=100)
+        self.expired = self.create_job(title="Expired", tags=["python"])
+        self.stale = self.create_job(title="Stale", is_active=False, tags=["go"])
+        self.recent = self.create_job(title="Recent", is_active=False)
+        self.live = self.create_job(title="Live", tags=["python"])
+        Job.objects.filter(pk__in=[self.expired.pk, self.stale.pk]).update(created_at=long_ago, updated_at=long_ago)
+        activity.apply_events([
+            (self.user.pk, self.expired.pk, UserJobMapping.Status.APPLIED),
+            (self.user.pk, self.live.pk, UserJobMapping.Status.CLICKED),
+        ])
+
+    def test_archives_stale_jobs_with_their_activity(self):
+        out = StringIO()
+        call_command("archive_jobs", "--batch-size", "1", stdout=out)
+        self.assertIn("Archived 2 jobs", out.getvalue())
+
+        self.assertCountEqual(Job.objects.values_list("pk", flat=True), [self.recent.pk, self.live.pk])
+        expired = ArchivedJob.objects.get(pk=self.expired.pk)
+        self.assertEqual((expired.expired, expired.tags, expired.apply_count), (True, [{"name": "python", "slug": "python"}], 1))
+        self.assertFalse(ArchivedJob.objects.get(pk=self.stale.pk).expired)
+        self.assertEqual(
+            list(ArchivedUserJobMapping.objects.values_list("user", "job", "status")),
+            [(self.user.pk, self.expired.pk, UserJobMapping.Status.APPLIED)],
+        )
+        self.assertEqual(list(UserJobMapping.objects.values_list("job", flat=True)), [self.live.pk])
+        self.assertFalse(JobEngagement.objects.filter(job_id=self.expired.pk).exists())
+        self.assertCountEqual(JobTombstone.objects.values_list("job_id", flat=True), [self.expired.pk, self.stale.pk])
+        indexed = {(facet, value): job_count for facet, value, job_count in FacetValue.objects.values_list("facet", "value", "job_count")}
+        self.assertEqual(indexed, dict(facets.count_active_values()))
+
+        response = self.client.get(reverse("job-mine-archived"))
+        self.assertEqual([(job["id"], job["status"], job["tags"]) for job in response.data["jobs"]],
+                         [(self.expired.pk, "Applied", [{"name": "python", "slug": "python"}])])
+        self.assertEqual(self.client.get(reverse("job-mine"), {"with_status": 1}).data["jobs"][0]["id"], self.live.pk)
+
+    def test_skips_jobs_with_buffered_activity(self):
+        activity.record(self.user, self.stale.pk, UserJobMapping.Status.CLICKED)
+        self.assertEqual(archive.archive_jobs(), 1)
+        self.assertTrue(Job.objects.filter(pk=self.stale.pk).exists())
+        activity.flush()
+        self.assertEqual(archive.archive_jobs(), 1)
+        self.assertEqual(ArchivedUserJobMapping.objects.filter(job_id=self.stale.pk).count(), 1)
+
+    def test_batch_skips_jobs_with_activity_since_the_candidates_were_chosen(self):
+        job_ids = list(archive.stale_jobs().order_by("pk").values_list("pk", flat=True))
+        activity.record(self.user, self.stale.pk, UserJobMapping.Status.CLICKED)
+        with transaction.atomic():
+            self.assertEqual(archive.archive_batch(job_ids), [self.expired.pk])
+        self.assertTrue(Job.objects.filter(pk=self.stale.pk).exists())
+
+    def test_activity_on_an_archived_job_is_not_found(self):
+        with mock.patch("jobs.views.record_activity", side_effect=IntegrityError):
+            response = self.client.post(
+                reverse("job-detail", args=[self.live.pk]), {"action": "activity", "activity": "Clicked"}, format="json",
+            )
+        self.assertEqual(response.status_code, 404)
+
+    def test_admin_reads_archived_jobs(self):
+        archive.archive_jobs()
+        self.client.force_login(User.objects.create_superuser(email="admin@example.com", password="pass"))
+        response = self.client.get(reverse("admin:jobs_archivedjob_change", args=[self.expired.pk]))
+        self.assertContains(response, "applied 1")
+        response = self.client.get(reverse("admin:jobs_archiveduserjobmapping_changelist"), {"q": "user@example.com"})
+        self.assertEqual(len(response.context["cl"].result_list), 1)
+
+
+@unittest.skipUnless(importlib.util.find_spec("psycopg_pool"), "psycopg_pool is not installed")
+class PooledPostgreSQLTests(SimpleTestCase):
+    """
+    The pooled backend's bookkeeping, with ConnectionPool mocked out so no
+    PostgreSQL server is needed.
+    """
+    def setUp(self):
+        from jobBoardProject.pooled_postgresql import base
+
+        self.base = base
+        patcher = mock.patch.object(base, "ConnectionPool")
+        self.pool = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.pool.max_size = 4
+        self.pool.get_stats.return_value = {"pool_size": 4, "pool_available": 1}
+        self.addCleanup(base._pools.pop, "pooled", None)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def wrapper(self, **settings_dict):
+        settings_dict = {
+            **connections["default"].settings_dict, "ENGINE": "jobBoardProject.pooled_postgresql", "NAME": "jobboard",
+            "CONN_MAX_AGE": 0, "OPTIONS": {"pool": {"min_size": 1, "max_size": 4, "timeout": 1}}, **settings_dict,
+        }
+        return self.base.DatabaseWrapper(settings_dict, "pooled")
+
+    def test_requires_conn_max_age_zero(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "CONN_MAX_AGE"):
+            self.wrapper(CONN_MAX_AGE=600).pool
+
+    def test_invalid_isolation_level(self):
+        wrapper = self.wrapper(OPTIONS={"pool": {"max_size": 4}, "isolation_level": -1})
+        with self.assertRaisesMessage(ImproperlyConfigured, "Invalid transaction isolation level -1"):
+            wrapper.get_new_connection(wrapper.get_connection_params())
+        self.pool.getconn.assert_not_called()
+
+    def test_checkout_records_wait_and_saturation(self):
+        self.assertIs(self.wrapper().checkout(), self.pool.getconn.return_value)
+        self.pool.open.assert_called_once_with()
+        recorded = metrics.snapshot()
+        self.assertEqual(recorded["db.pool.pooled.wait_ms"]["count"], 1)
+        self.assertEqual(recorded["db.pool.pooled.saturation"]["last"], 0.75)
+        self.assertNotIn("db.pool.pooled.timeouts", recorded)
+
+    def test_checkout_timeout_is_counted(self):
+        self.pool.getconn.side_effect = self.base.PoolTimeout("pool exhausted")
+        with self.assertRaises(self.base.PoolTimeout):
+            self.wrapper().checkout()
+        recorded = metrics.snapshot()
+        self.assertEqual(recorded["db.pool.pooled.timeouts"]["count"], 1)
+        self.assertEqual(recorded["db.pool.pooled.wait_ms"]["count"], 1)
+
+    def test_close_returns_the_connection_to_the_pool(self):
+        wrapper = self.wrapper()
+        connection = wrapper.connection = mock.Mock()
+        wrapper._close()
+        self.pool.putconn.assert_called_once_with(connection)
+        connection.close.assert_not_called()
+
+
+class ReplicaRoutingTests(JobTestMixin, APITransactionTestCase):
+    """
+    Runs against two SQLite databases: the test database as the primary and
+    a schema-only copy of it as a replica that never catches up. The replica
+    alias is registered after the test databases are set up, so the runner
+    leaves it alone. Reads inside a transaction stay on the primary, hence
+    no TestCase.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        handle, cls.replica_path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        replica = sqlite3.connect(cls.replica_path)
+        connections["default"].connection.backup(replica)
+        replica.close()
+        connections.settings["replica"] = {**connections["default"].settings_dict, "NAME": cls.replica_path}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        os.remove(cls.replica_path)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.job = self.create_job()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=self.staff).key}")
+        token_cache.clear()
+        db_router._down_until.clear()
+        self.addCleanup(db_router._down_until.clear)
+
+    def listed_ids(self):
+        return [job["id"] for job in self.client.get(reverse("job-list")).data["jobs"]]
+
+    def test_opted_in_reads_use_the_replica(self):
+        with override_settings(DATABASE_REPLICAS=["replica"]):
+            # Tokens are always read from the primary.
+            self.assertEqual(self.listed_ids(), [])
+            response = self.client.post(reverse("job-filter") + "?page_size=5", {}, format="json")
+            self.assertEqual(response.data["jobs"], [])
+            # Not opted in.
+            self.assertEqual(self.client.get(reverse("job-manage-list-create")).status_code, 200)
+            self.assertEqual(len(self.client.get(reverse("job-manage-list-create")).data), 1)
+        self.assertEqual(self.listed_ids(), [self.job.pk])
+
+    def test_unavailable_replica_falls_back_to_primary(self):
+        with override_settings(DATABASE_REPLICAS=["replica"]):
+            with mock.patch.object(connections["replica"], "ensure_connection", side_effect=OperationalError("down")):
+                with self.assertLogs("jobBoardProject.db_router", "WARNING"):
+                    self.assertEqual(self.listed_ids(), [self.job.pk])
+            # Skipped until the retry interval has passed.
+            self.assertEqual(self.listed_ids(), [self.job.pk])
+            db_router._down_until.clear()
+            self.assertEqual(self.listed_ids(), [])
+
+    @override_settings(DATABASE_REPLICAS=["replica"])
+    def test_writes_pin_the_request_to_the_primary(self):
+        router = db_router.ReplicaRouter()
+        self.assertEqual(router.db_for_read(Job), "default")
+        token = db_router._routing.set(db_router.RequestRouting())
+        self.addCleanup(db_router._routing.reset, token)
+        db_router._routing.get().replica_reads = True
+        self.assertEqual(router.db_for_read(Job), "replica")
+        self.assertEqual(router.db_for_read(Token), "default")
+        self.assertEqual(router.db_for_write(Job), "default")
+        self.assertEqual(router.db_for_read(Job), "default")
+
+    @override_settings(DATABASE_REPLICAS=["replica"])
+    def test_writes_pin_the_client_to_the_primary(self):
+        response = self.client.post(reverse("job-manage-list-create"), {
+            "title": "Pastry Chef", "company": "Bakery", "location": "Paris",
+            "description": "Bake bread.", "application_link": "https://example.com/apply",
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(db_router.PIN_COOKIE, response.cookies)
+        detail = reverse("job-detail", args=[response.data["id"]])
+        # The next request reads its write from the primary.
+        self.assertEqual(self.client.get(detail).status_code, 200)
+
+        # Without the cookie, or once it has expired, the lagging replica
+        # answers. A cookie pinning for longer than REPLICA_PIN_SECONDS is
+        # ignored.
+        self.client.cookies.pop(db_router.PIN_COOKIE)
+        self.assertEqual(self.client.get(detail).status_code, 404)
+        for until in (time.time() - 1, time.time() + 3600, "soon"):
+            self.client.cookies[db_router.PIN_COOKIE] = str(until)
+            self.assertEqual(self.client.get(detail).status_code, 404)
+
+
+class AsyncReadViewTests(JobTestMixin, APITestCase):
+    def setUp(self):
+        self.staff = self.create_staff()
+        self.user = User.objects.create_user(email="user@example.com", password="pass", first_name="Ada")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.headers = {"Authorization": f"Token {self.token.key}"}
+        self.job = self.create_job(tags=["python"])
+        self.create_job(title="Data Engineer", tags=["sql", "python"])
+
+    async def test_payloads_match_sync_views(self):
+        cases = [
+            ("get", reverse("job-list"), reverse("async-job-list"), {}),
+            ("get", reverse("job-list") + "?page_size=1", reverse("async-job-list") + "?page_size=1", {}),
+            ("post", reverse("job-filter"), reverse("async-job-filter"), {"tags": ["sql"]}),
+            ("get", reverse("job-detail", args=[self.job.pk]), reverse("async-job-detail", args=[self.job.pk]), {}),
+            ("get", reverse("check"), reverse("async-check"), {}),
+        ]
+        for method, sync_url, async_url, body in cases:
+            with self.subTest(url=async_url):
+                kwargs = {"data": body, "content_type": "application/json"} if method == "post" else {}
+                expected = await sync_to_async(getattr(self.client, method))(sync_url, **({"data": body, "format": "json"} if method == "post" else {}))
+                response = await getattr(self.async_client, method)(async_url, headers=self.headers, **kwargs)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    async def test_conditional_get(self):
+        url = reverse("async-job-detail", args=[self.job.pk])
+        etag = (await self.async_client.get(url, headers=self.headers))["ETag"]
+        response = await self.async_client.get(url, headers={**self.headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        url = reverse("async-job-list")
+        etag = (await self.async_client.get(url, headers=self.headers))["ETag"]
+        response = await self.async_client.get(url, headers={**self.headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_errors(self):
+        self.assertEqual((await self.async_client.get(reverse("async-job-list"))).status_code, 401)
+        bad_token = {"Authorization": "Token nope"}
+        self.assertEqual((await self.async_client.get(reverse("async-job-list"), headers=bad_token)).status_code, 401)
+        self.assertEqual((await self.async_client.post(reverse("async-job-list"), headers=self.headers)).status_code, 405)
+        response = await self.async_client.get(reverse("async-job-detail", args=[0]), headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(reverse("async-job-list") + "?cursor=bad", headers=self.headers)
+        self.assertEqual(response.status_code, 404)
@@ -1,10 +1,24 @@
 from django.urls import path
-from .views import JobListView, JobFilterView, JobDetailView, JobManagementListCreateView, JobManagementDetailView
+from .views import (
+    JobListView, JobFilterView, MyJobListView, MyArchivedJobListView, JobChangesView, JobExportView, JobSearchView, JobDetailView, JobForYouView, JobSimilarView, JobManagementListCreateView, JobManagementDetailView,
+    JobManagementBulkView, JobActivityStatsView, JobAnalyticsView, JobAnalyticsDetailView,
+)
 
 urlpatterns = [
     path('', JobListView.as_view(), name='job-list'),
     path('filter/', JobFilterView.as_view(), name='job-filter'),
+    path('search/', JobSearchView.as_view(), name='job-search'),
+    path('mine/', MyJobListView.as_view(), name='job-mine'),
+    path('mine/archived/', MyArchivedJobListView.as_view(), name='job-mine-archived'),
+    path('for-you/', JobForYouView.as_view(), name='job-for-you'),
+    path('changes/', JobChangesView.as_view(), name='job-changes'),
+    path('export/', JobExportView.as_view(), name='job-export'),
     path('<int:pk>/', JobDetailView.as_view(), name='job-detail'),
+    path('<int:pk>/similar/', JobSimilarView.as_view(), name='job-similar'),
     path('manage/', JobManagementListCreateView.as_view(), name='job-manage-list-create'),
     path('manage/<int:pk>/', JobManagementDetailView.as_view(), name='job-manage-detail'),
+    path('manage/bulk/', JobManagementBulkView.as_view(), name='job-manage-bulk'),
+    path('manage/activity/', JobActivityStatsView.as_view(), name='job-manage-activity'),
+    path('manage/analytics/', JobAnalyticsView.as_view(), name='job-manage-analytics'),
+    path('manage/analytics/<int:pk>/', JobAnalyticsDetailView.as_view(), name='job-manage-analytics-detail'),
 ]
\ No newline at end of file
@@ -1,105 +1,329 @@
+import hashlib
+import heapq
 from datetime import timedelta
-from django.http import Http404
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Subquery, Value
+from django.http import Http404, StreamingHttpResponse
 from django.utils import timezone
-from rest_framework import status
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework import serializers, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
-from .models import Job, Tag
+from jobBoardProject.instrumentation import timed
+from . import bitmaps, changes, generation, recommend, similar
+from .activity import buffer_stats, record as record_activity
+from .bulk import JobWrite, bulk_save_jobs, flag_duplicates, normalize_tag_names, tag_conflicts, upsert_tags
+from .engagement import COUNTERS
+from .export import CSVRenderer, NDJSONRenderer, content_headers, iter_export
+from .facets import count_selection, get_filters_data
+from .filters import filter_jobs
+from .models import ArchivedUserJobMapping, Job, JobEngagement, UserJobMapping
+from .pagination import KeysetPagination
 from .permissions import CanManageJobs
-from .serializers import JobListSerializer, JobDetailSerializer, JobManagementSerializer, FilterSerializer
+from .search import search_jobs
+from .serializers import (
+    ArchivedJobSerializer, JobListFastSerializer, JobDetailSerializer, JobManagementSerializer, FilterSerializer,
+    JobEngagementDaySerializer,
+    engagement_counts,
+)
+
+
+def job_list_data(rows, paginator=None):
+    filter_serializer = FilterSerializer(get_filters_data())
+    with timed("serialize"):
+        data = {
+            'filters': filter_serializer.data,
+            'jobs': JobListFastSerializer(rows).data
+        }
+    if paginator is not None:
+        data['next'] = paginator.next_cursor
+    return data
+
+
+def status_requested(request):
+    params = KeysetPagination.get_query_params(request)
+    return params.get('with_status', '').lower() in ('1', 'true', 'yes')
+
+
+def job_rows(queryset, request):
+    """
+    Listing rows for JobListFastSerializer. With ?with_status=1 each job also
+    carries the requesting user's activity status (or None), read with a
+    correlated subquery on the (user, job) unique index.
+    """
+    if status_requested(request):
+        statuses = UserJobMapping.objects.filter(user=request.user, job=OuterRef('pk')).values('status')[:1]
+        return JobListFastSerializer.get_rows(queryset.annotate(user_status=Subquery(statuses)), 'user_status')
+    return JobListFastSerializer.get_rows(queryset)
+
+
+def paginated_job_list(request, queryset):
+    rows = job_rows(queryset, request)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(rows, request)
+    if page is None:
+        return Response(job_list_data(rows), status=status.HTTP_200_OK)
+    return Response(job_list_data(page, paginator), status=status.HTTP_200_OK)
+
+
+def indexed_job_page(request, data, paginator):
+    """
+    One page of filter results from the bitmap index. Only the page's jobs
+    are read from the database.
+    """
+    bitmaps.index.sync()
+    job_ids = bitmaps.index.page(bitmaps.index.match(data), request, paginator)
+    queryset = Job.objects.filter(pk__in=job_ids, is_active=True)
+    rows = {row['id']: row for row in job_rows(queryset, request)}
+    return [rows[job_id] for job_id in job_ids if job_id in rows]
+
+
+def use_bitmap_index(request, paginator):
+    # A full listing reads every matching job anyway, so only paginated
+    # requests go through the index.
+    return bitmaps.enabled() and paginator.is_requested(request)
+
+
+def format_list_etag(version, request):
+    # The query string selects the page, so it is part of the validator.
+    path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"{version}-{path_hash}"
+
+
+def format_detail_etag(pk, updated_at):
+    return f"{pk}-{updated_at.timestamp()}" if updated_at else None
+
+
+def job_list_etag(request, *args, **kwargs):
+    # A user's own activity doesn't move the change generation, so listings
+    # with statuses are never conditional.
+    if status_requested(request):
+        return None
+    return format_list_etag(generation.current(), request)
+
+
+def job_updated_at(request, pk, *args, **kwargs):
+    if not hasattr(request, '_job_updated_at'):
+        request._job_updated_at = Job.objects.filter(pk=pk, is_active=True).values_list('updated_at', flat=True).first()
+    return request._job_updated_at
+
+
+def job_detail_etag(request, pk, *args, **kwargs):
+    return format_detail_etag(pk, job_updated_at(request, pk))
+
+
+def parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_allow_duplicate(data):
+    """
+    The allow_duplicate flag of a write, parsed like a serializer
+    BooleanField so form values such as "false" count as False.
+    """
+    try:
+        return serializers.BooleanField().to_internal_value(data.get('allow_duplicate', False))
+    except serializers.ValidationError as exc:
+        raise serializers.ValidationError({'allow_duplicate': exc.detail})
+
+
+def parse_tag_names(data):
+    """
+    The normalized tag names of a write, or None when it sends no tags.
+    """
+    if 'tags' not in data:
+        return None
+    tags = data['tags']
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise serializers.ValidationError({'tags': ["Expected a list of tag names."]})
+    return normalize_tag_names(tags)
+
+
+def set_job_tags(job, names):
+    """
+    Replace the job's tags, creating missing ones. A name whose slug is
+    taken by another tag is a validation error, as in the bulk endpoint.
+    """
+    tags = upsert_tags(names)
+    conflicts = tag_conflicts(names, tags)
+    if conflicts:
+        raise serializers.ValidationError({'tags': conflicts})
+    job.tags.set(tags.values())
 
 
 class JobListView(APIView):
     permission_classes = [IsAuthenticated]
+    query_budget = {"get": 5}
+    replica_reads = {"get"}
 
+    @method_decorator(condition(etag_func=job_list_etag))
     def get(self, request, *args, **kwargs):
-        queryset = Job.objects.filter(is_active=True).select_related('posted_by')
-        serializer = JobListSerializer(queryset, many=True)
-        filters_data = {
-            'tags': set(Tag.objects.values_list('name', flat=True)),
-            'title': set(Job.objects.values_list('title', flat=True)),
-            'company': set(Job.objects.values_list('company', flat=True)),
-            'location': set(Job.objects.exclude(location__exact='').values_list('location', flat=True)),
-            'job_type': [choice[0] for choice in Job.JobType.choices],
-            'time': ["last_6", "last_24", "this_week", "this_month", "all"]
-        }
-
-        filter_serializer = FilterSerializer(filters_data)
-        return Response({
-            'filters': filter_serializer.data,
-            'jobs': serializer.data
-        }, status=status.HTTP_200_OK)
+        queryset = Job.objects.filter(is_active=True)
+        return paginated_job_list(request, queryset)
 
 
 class JobFilterView(APIView):
     permission_classes = [IsAuthenticated]
+    # Includes the drill-down facet counts; the bitmap index path swaps that
+    # query for its generation check.
+    query_budget = {"post": 5}
+    # A read despite the method; the filters travel in the body.
+    replica_reads = {"post"}
 
     def post(self, request, *args, **kwargs):
-        filters = {}
-        tags = request.data.get("tags", [])
-        titles = request.data.get("title", [])
-        companies = request.data.get("company", [])
-        locations = request.data.get("location", [])
-        job_types = request.data.get("job_type", [])
-        time_filter = request.data.get("time", None)
-
-        if job_types:
-            filters["job_type__in"] = job_types if isinstance(job_types, list) else [job_types]
-        if locations:
-            filters["location__in"] = locations if isinstance(locations, list) else [locations]
-        if companies:
-            filters["company__in"] = companies if isinstance(companies, list) else [companies]
-        if titles:
-            filters["title__in"] = titles if isinstance(titles, list) else [titles]
-        if tags:
-            filters["tags__name__in"] = tags
-
-        queryset = Job.objects.filter(is_active=True, **filters)
-
-        now = timezone.now()
-        if time_filter == "last_6":
-            queryset = queryset.filter(created_at__gte=now - timedelta(hours=6))
-        elif time_filter == "last_24":
-            queryset = queryset.filter(created_at__gte=now - timedelta(hours=24))
-        elif time_filter == "this_week":
-            queryset = queryset.filter(created_at__gte=now - timedelta(days=7))
-        elif time_filter == "this_month":
-            queryset = queryset.filter(created_at__gte=now - timedelta(days=30))
-
-        queryset = queryset.distinct().select_related('posted_by').order_by('-updated_at')
-        serializer = JobListSerializer(queryset, many=True)
-
-        filters_data = {
-            'tags': set(Tag.objects.values_list('name', flat=True)),
-            'title': set(Job.objects.values_list('title', flat=True)),
-            'company': set(Job.objects.values_list('company', flat=True)),
-            'location': set(Job.objects.exclude(location__exact='').values_list('location', flat=True)),
-            'job_type': [choice[0] for choice in Job.JobType.choices],
-            'time': ["last_6", "last_24", "this_week", "this_month", "all"]
-        }
+        paginator = KeysetPagination()
+        if use_bitmap_index(request, paginator):
+            page = indexed_job_page(request, request.data, paginator)
+            data = job_list_data(page, paginator)
+            data['facets'] = bitmaps.index.count(request.data)
+            return Response(data, status=status.HTTP_200_OK)
 
-        filter_serializer = FilterSerializer(filters_data)
-        return Response({
-            'filters': filter_serializer.data,
-            'jobs': serializer.data
-        }, status=status.HTTP_200_OK)
+        queryset = filter_jobs(Job.objects.filter(is_active=True), request.data)
+        queryset = queryset.order_by('-updated_at')
+        response = paginated_job_list(request, queryset)
+        response.data['facets'] = count_selection(request.data)
+        return response
+
+
+class JobSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+    replica_reads = {"get"}
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"detail": "Search query 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = filter_jobs(Job.objects.filter(is_active=True), request.query_params)
+        queryset = search_jobs(queryset, query).order_by('-rank', '-id')
+        rows = JobListFastSerializer.get_rows(queryset, 'rank')
+
+        paginator = KeysetPagination(ordering=('-rank', '-id'))
+        page = paginator.paginate_queryset(rows, request)
+        with timed("serialize"):
+            data = {'jobs': JobListFastSerializer(rows if page is None else page).data}
+        if page is not None:
+            data['next'] = paginator.next_cursor
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class MyJobListView(APIView):
+    """
+    The requesting user's jobs, most recent activity first, optionally
+    narrowed to one status with ?status=. Paginated with page_size/cursor.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {"get": 3}
+
+    def get(self, request, *args, **kwargs):
+        mappings = {'job_users__user': request.user}
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            if status_filter not in UserJobMapping.Status.values:
+                return Response({"detail": "Invalid status."}, status=status.HTTP_400_BAD_REQUEST)
+            mappings['job_users__status'] = status_filter
+
+        # The annotations reuse the join made by the filter, so this is one
+        # statement served by the (user, status, updated_at) index.
+        queryset = Job.objects.filter(is_active=True, **mappings).annotate(
+            user_status=F('job_users__status'), activity_at=F('job_users__updated_at'),
+        )
+        rows = JobListFastSerializer.get_rows(queryset, 'user_status', 'activity_at')
+        paginator = KeysetPagination(ordering=('-activity_at', '-id'))
+        page = paginator.paginate_queryset(rows, request)
+        if page is None:
+            rows = rows.order_by('-activity_at', '-id')
+        with timed("serialize"):
+            data = {'jobs': JobListFastSerializer(rows if page is None else page).data}
+        if page is not None:
+            data['next'] = paginator.next_cursor
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class MyArchivedJobListView(APIView):
+    """
+    The requesting user's activity on archived jobs, most recent first.
+    Paginated with page_size/cursor.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {"get": 1}
+
+    def get(self, request, *args, **kwargs):
+        mappings = ArchivedUserJobMapping.objects.filter(user=request.user).select_related('job__posted_by')
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            if status_filter not in UserJobMapping.Status.values:
+                return Response({"detail": "Invalid status."}, status=status.HTTP_400_BAD_REQUEST)
+            mappings = mappings.filter(status=status_filter)
+
+        paginator = KeysetPagination(ordering=('-updated_at', '-id'))
+        page = paginator.paginate_queryset(mappings, request)
+        if page is None:
+            mappings = mappings.order_by('-updated_at', '-id')
+        with timed("serialize"):
+            jobs = [{**ArchivedJobSerializer(mapping.job).data, 'status': mapping.status} for mapping in (mappings if page is None else page)]
+            data = {'jobs': jobs}
+        if page is not None:
+            data['next'] = paginator.next_cursor
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class JobChangesView(APIView):
+    """
+    Jobs created, updated, deactivated or deleted since ?since=<cursor>.
+    Without a cursor the feed starts with every job. Keep calling with
+    ``next`` while ``has_more`` is true, then poll with the last ``next``.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {"get": 4}
+    page_size = 100
+    max_page_size = 1000
+
+    def get(self, request, *args, **kwargs):
+        limit = parse_id(request.query_params.get('page_size')) or self.page_size
+        try:
+            data = changes.changes_since(request.query_params.get('since'), min(max(limit, 1), self.max_page_size))
+        except changes.CursorExpired:
+            return Response({"detail": "Cursor expired; sync again without since."}, status=status.HTTP_410_GONE)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class JobExportView(APIView):
+    """
+    The whole active catalogue for partner feeds, streamed as NDJSON
+    (default) or CSV. Choose with ?format=ndjson|csv or the Accept header.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.accepted_renderer.format
+        return StreamingHttpResponse(iter_export(export_format), headers=content_headers(export_format))
 
 
 class JobDetailView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = {"get"}
 
-    def get_object(self, pk):
+    def get_object(self, pk, queryset=Job.objects):
         try:
-            return Job.objects.get(pk=pk, is_active=True)
+            return queryset.get(pk=pk, is_active=True)
         except Job.DoesNotExist:
             raise Http404
 
+    @method_decorator(condition(etag_func=job_detail_etag, last_modified_func=job_updated_at))
     def get(self, request, pk, *args, **kwargs):
-        job = self.get_object(pk)
-        serializer = JobDetailSerializer(job)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        job = self.get_object(pk, Job.objects.select_related('posted_by').prefetch_related('tags'))
+        with timed("serialize"):
+            data = JobDetailSerializer(job).data
+        return Response(data, status=status.HTTP_200_OK)
 
     def post(self, request, pk, *args, **kwargs):
         action = request.data.get("action")
@@ -109,43 +333,117 @@ class JobDetailView(APIView):
             activity = request.data.get("activity")
             if activity not in ["Clicked", "Applied", "Bookmarked"]:
                 return Response({"detail": "Invalid activity."}, status=status.HTTP_400_BAD_REQUEST)
-            
-            mapping, created = job.job_users.get_or_create(
-                user=request.user,
-                defaults={'status': activity}
-            )
-            if not created:
-                mapping.status = activity
-                mapping.save()
+
+            try:
+                record_activity(request.user, job.pk, activity)
+            except IntegrityError:
+                # The job was archived while the event was being written.
+                raise Http404
             return Response({"detail": f"Job {activity} successfully."}, status=status.HTTP_200_OK)
 
 
+class JobForYouView(APIView):
+    """
+    The requesting user's personalized feed from the model built by
+    jobs.recommend: jobs like the ones they clicked, bookmarked or applied
+    to, then jobs sharing their tags, then popular jobs, topped up with the
+    latest jobs when that runs short (always, before the first build).
+    ?limit= (default 20, at most 100).
+    """
+    permission_classes = [IsAuthenticated]
+    replica_reads = {"get"}
+    query_budget = {"get": 3}
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        # Over-fetch: jobs deactivated, or seen by the user, since the last
+        # build are dropped by the query.
+        ranked = recommend.recommend(request.user.pk, limit * 2)
+        queryset = Job.objects.filter(is_active=True).exclude(
+            Exists(UserJobMapping.objects.filter(user=request.user, job_id=OuterRef('pk')))
+        )
+        page = []
+        if ranked:
+            rows = {row['id']: row for row in JobListFastSerializer.get_rows(queryset.filter(pk__in=ranked))}
+            page = [rows[job_id] for job_id in ranked if job_id in rows][:limit]
+        if len(page) < limit:
+            latest = queryset.exclude(pk__in=[row['id'] for row in page]).order_by('-updated_at', '-id')
+            page += JobListFastSerializer.get_rows(latest[:limit - len(page)])
+        with timed("serialize"):
+            data = JobListFastSerializer(page).data
+        return Response({'jobs': data}, status=status.HTTP_200_OK)
+
+
+class JobSimilarView(APIView):
+    """
+    Active jobs most like this one, by shared tags and TF-IDF similarity of
+    title and description, from the index built by jobs.similar.
+    ?limit= (default 10, at most 50).
+    """
+    permission_classes = [IsAuthenticated]
+    replica_reads = {"get"}
+    query_budget = {"get": 2}
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request, pk, *args, **kwargs):
+        try:
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        # Over-fetch: jobs deactivated since the last build are dropped below.
+        ranked = similar.similar_jobs(pk, limit * 2)
+        rows = {
+            row['id']: row
+            for row in JobListFastSerializer.get_rows(Job.objects.filter(pk__in=[pk, *(job_id for job_id, _ in ranked)], is_active=True))
+        }
+        if pk not in rows:
+            raise Http404
+        scores = {job_id: score for job_id, score in ranked if job_id in rows}
+        page = [rows[job_id] for job_id in scores][:limit]
+        with timed("serialize"):
+            jobs = JobListFastSerializer(page).data
+        for job in jobs:
+            job['score'] = round(scores[job['id']], 4)
+        return Response({'jobs': jobs}, status=status.HTTP_200_OK)
+
+
 class JobManagementListCreateView(APIView):
     permission_classes = [IsAuthenticated, CanManageJobs]
+    query_budget = {"get": 3}
 
     def get(self, request, *args, **kwargs):
         user = request.user
         queryset = Job.objects.none()
         if user.is_superuser:
-            queryset = Job.objects.all().select_related('posted_by')
+            queryset = Job.objects.all().select_related('posted_by', 'engagement').prefetch_related('tags')
         elif user.is_staff:
-            queryset = Job.objects.filter(posted_by=user).select_related('posted_by')
+            queryset = Job.objects.filter(posted_by=user).select_related('posted_by', 'engagement').prefetch_related('tags')
 
-        serializer = JobManagementSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        with timed("serialize"):
+            data = JobManagementSerializer(queryset, many=True).data
+        return Response(data, status=status.HTTP_200_OK)
 
     def post(self, request, *args, **kwargs):
-        tags_new = []
-        tags = request.data.get('tags', [])
-        for tag in tags:
-            tag = tag.strip().lower()
-            tag_obj, _ = Tag.objects.get_or_create(name=tag)
-            tags_new.append(tag_obj)
-
-        request.data["tags"] = [tag.slug for tag in tags_new]
         serializer = JobManagementSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(posted_by=request.user)
+            # A near-duplicate of an active job is created inactive, with
+            # duplicate_of set, unless the client sends allow_duplicate.
+            tag_names = parse_tag_names(request.data) or []
+            write = JobWrite(0, None, serializer.validated_data, tag_names, parse_allow_duplicate(request.data))
+            flagged, signatures = flag_duplicates([write])
+            with transaction.atomic():
+                job = serializer.save(
+                    posted_by=request.user,
+                    duplicate_of_id=flagged[0][0].job_id if flagged else None,
+                    signature=signatures.get(0),
+                )
+                set_job_tags(job, tag_names)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -173,17 +471,160 @@ class JobManagementDetailView(APIView):
             job.delete()
             return Response({"detail": "Job deleted successfully."}, status=status.HTTP_200_OK)
 
-        tags_new = []
-        tags = request.data.get('tags', [])
-        for tag in tags:
-            tag = tag.strip().lower()
-            tag_obj, _ = Tag.objects.get_or_create(name=tag)
-            tags_new.append(tag_obj)
-
-        request.data["tags"] = [tag.slug for tag in tags_new]
         serializer = JobManagementSerializer(job, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            tag_names = parse_tag_names(request.data)
+            with transaction.atomic():
+                job = serializer.save()
+                if tag_names is not None:
+                    set_job_tags(job, tag_names)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class JobActivityStatsView(APIView):
+    permission_classes = [IsAuthenticated, CanManageJobs]
+
+    def get(self, request, *args, **kwargs):
+        return Response(buffer_stats(), status=status.HTTP_200_OK)
+
+
+class JobAnalyticsView(APIView):
+    """
+    Jobs ranked by an engagement counter (?sort=click_count, bookmark_count
+    or apply_count), read from the denormalized counters. Staff see their
+    own jobs, superusers all of them. Paginated with page_size/cursor.
+
+    The ranking is read from the (counter, job) indexes on JobEngagement.
+    Jobs with no counters row rank at 0 and are merged in by id once a page
+    reaches 0; only that query joins from jobs_job.
+    """
+    permission_classes = [IsAuthenticated, CanManageJobs]
+    query_budget = {"get": 3}
+
+    def get(self, request, *args, **kwargs):
+        sort = request.query_params.get('sort', 'apply_count')
+        if sort not in COUNTERS:
+            return Response({"detail": f"sort must be one of {', '.join(COUNTERS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        engaged = JobEngagement.objects.all()
+        unengaged = Job.objects.filter(engagement__isnull=True)
+        if not request.user.is_superuser:
+            engaged = engaged.filter(job__posted_by=request.user)
+            unengaged = unengaged.filter(posted_by=request.user)
+        engaged = engaged.values(
+            *COUNTERS, id=F('job_id'), title=F('job__title'), company=F('job__company'), is_active=F('job__is_active'),
+        )
+        unengaged = unengaged.values('id', 'title', 'company', 'is_active', **{counter: Value(0) for counter in COUNTERS})
+
+        def rank(row):
+            return -row[sort], -row['id']
+
+        paginator = KeysetPagination(ordering=(f'-{sort}', '-id'))
+        page_queryset = paginator.get_page_queryset(engaged, request)
+        if page_queryset is None:
+            jobs = heapq.merge(engaged.order_by(*paginator.ordering), unengaged.order_by('-id'), key=rank)
+            return Response({'jobs': list(jobs)}, status=status.HTTP_200_OK)
+
+        rows = list(page_queryset)
+        if len(rows) <= paginator.current_page_size or rows[-1][sort] == 0:
+            cursor = request.query_params.get(paginator.cursor_query_param)
+            if cursor:
+                count, last_id = paginator.decode_cursor(cursor)
+                if count == 0:
+                    unengaged = unengaged.filter(id__lt=last_id)
+            rows = list(heapq.merge(rows, unengaged.order_by('-id')[:paginator.current_page_size + 1], key=rank))
+        return Response(
+            {'jobs': paginator.get_page(rows), 'next': paginator.next_cursor}, status=status.HTTP_200_OK,
+        )
+
+
+class JobAnalyticsDetailView(APIView):
+    """
+    A job's engagement totals and its daily rollup for the last ?days=
+    days (30 by default).
+    """
+    permission_classes = [IsAuthenticated, CanManageJobs]
+    max_days = 366
+
+    def get(self, request, pk, *args, **kwargs):
+        try:
+            job = Job.objects.select_related('engagement').get(pk=pk)
+        except Job.DoesNotExist:
+            raise Http404
+        self.check_object_permissions(request, job)
+
+        days = parse_id(request.query_params.get('days', 30))
+        if days is None or not 0 < days <= self.max_days:
+            return Response({"detail": f"days must be between 1 and {self.max_days}."}, status=status.HTTP_400_BAD_REQUEST)
+        since = timezone.localdate() - timedelta(days=days - 1)
+        rollup = job.engagement_days.filter(day__gte=since).order_by('day')
+        return Response({
+            'id': job.pk,
+            'totals': engagement_counts(getattr(job, 'engagement', None)),
+            'days': JobEngagementDaySerializer(rollup, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+
+class JobManagementBulkView(APIView):
+    permission_classes = [IsAuthenticated, CanManageJobs]
+    max_items = 1000
+
+    def post(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({"detail": "Expected a non-empty list of jobs."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_items:
+            return Response({"detail": f"At most {self.max_items} jobs per request."}, status=status.HTTP_400_BAD_REQUEST)
+
+        existing = Job.objects.in_bulk([parse_id(item.get('id')) for item in items if isinstance(item, dict)])
+        errors = {}
+        writes = []
+        seen_ids = set()
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors[index] = {"non_field_errors": ["Expected a job object."]}
+                continue
+            try:
+                tag_names = parse_tag_names(item) or []
+            except serializers.ValidationError as exc:
+                errors[index] = exc.detail
+                continue
+
+            job = None
+            if item.get('id') is not None:
+                job = existing.get(parse_id(item['id']))
+                if job is None or not all(
+                    permission.has_object_permission(request, self, job) for permission in self.get_permissions()
+                ):
+                    errors[index] = {"id": ["Not found."]}
+                    continue
+                if job.pk in seen_ids:
+                    errors[index] = {"id": ["Duplicate job in request."]}
+                    continue
+                seen_ids.add(job.pk)
+
+            serializer = JobManagementSerializer(job, data=item)
+            if not serializer.is_valid():
+                errors[index] = serializer.errors
+                continue
+            try:
+                allow_duplicate = parse_allow_duplicate(item)
+            except serializers.ValidationError as exc:
+                errors[index] = exc.detail
+                continue
+            writes.append(JobWrite(index, job, serializer.validated_data, tag_names, allow_duplicate))
+
+        saved, save_errors = bulk_save_jobs(request.user, writes)
+        errors.update(save_errors)
+        data = {
+            "created": [job.pk for write, job in saved if write.job is None],
+            "updated": [job.pk for write, job in saved if write.job is not None],
+            "duplicates": [
+                {"index": write.index, "id": job.pk, "duplicate_of": job.duplicate_of_id}
+                for write, job in saved if job.duplicate_of_id is not None
+            ],
+            "errors": [{"index": index, "errors": errors[index]} for index in sorted(errors)],
+        }
+        return Response(data, status=status.HTTP_200_OK if saved else status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,13 @@
+#!/usr/bin/env bash
+# Start the web service.
+#
+# The web workers memory-map index files from local disk (see
+# jobs/mapped.py), and a worker service would not share that disk, so the
+# builders run here, next to gunicorn. Until their first build finishes the
+# endpoints that read the files fall back to their empty results.
+set -o errexit
+
+python manage.py build_similar_jobs --loop &
+python manage.py build_recommendations --loop &
+
+exec gunicorn jobBoardProject.wsgi:application
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_after", "created_at", "updated_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("created_at", "updated_at")
+    ordering = ("run_after",)
@@ -0,0 +1,56 @@
+"""
+Outgoing mail for task handlers. A worker keeps one SMTP connection open
+across the mails it sends and drops it after an error or when it goes idle.
+
+yagmail's own send() logs in again on every call, so mails are built with
+prepare_send() and written to the open connection directly.
+"""
+import smtplib
+
+import yagmail
+from django.conf import settings
+
+_connection = None
+
+
+def get_connection():
+    global _connection
+    if _connection is None:
+        connection = yagmail.SMTP(
+            user=settings.YAGMAIL_USER,
+            password=settings.YAGMAIL_PASSWORD,
+            host=settings.YAGMAIL_HOST,
+            port=settings.YAGMAIL_PORT,
+            smtp_ssl=settings.YAGMAIL_SMTP_SSL,
+            smtp_starttls=settings.YAGMAIL_SMTP_STARTTLS,
+            smtp_skip_login=settings.YAGMAIL_SKIP_LOGIN,
+        )
+        connection.login()
+        _connection = connection
+    return _connection
+
+
+def close_connection():
+    global _connection
+    if _connection is not None:
+        try:
+            _connection.close()
+        except (smtplib.SMTPException, OSError):
+            pass
+        _connection = None
+
+
+def send(to, subject, contents):
+    connection = get_connection()
+    recipients, message = connection.prepare_send(to=to, subject=subject, contents=contents)
+    try:
+        try:
+            connection.smtp.sendmail(connection.user, recipients, message)
+        except smtplib.SMTPServerDisconnected:
+            # The server closed the idle connection; reconnect once.
+            close_connection()
+            connection = get_connection()
+            connection.smtp.sendmail(connection.user, recipients, message)
+    except (smtplib.SMTPException, OSError):
+        close_connection()
+        raise
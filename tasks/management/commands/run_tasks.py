@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks import mail, queue
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running tasks until interrupted.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep when no task is due.")
+        parser.add_argument("--batch-size", type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                total = 0
+                while True:
+                    claimed = queue.run_pending(options["batch_size"])
+                    total += claimed
+                    if not claimed:
+                        break
+                if total or not options["loop"]:
+                    self.stdout.write(f"Ran {total} tasks.")
+                if not options["loop"]:
+                    return
+                # Don't hold the SMTP connection open while idle.
+                mail.close_connection()
+                time.sleep(options["interval"])
+        finally:
+            mail.close_connection()
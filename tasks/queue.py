@@ -0,0 +1,112 @@
+"""
+A small task queue stored in the database.
+
+Handlers register with @task("name") in an app's tasks.py. enqueue() inserts
+a row in the caller's transaction, so a task only becomes visible once the
+request commits. `manage.py run_tasks` claims due rows, runs them and
+retries failures with exponential backoff.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from jobBoardProject import metrics
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+Status = Task.Status
+
+# A claimed task is reclaimable once its lease runs out, e.g. after a crash.
+LEASE_SECONDS = 300
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+handlers = {}
+
+
+def task(name):
+    def register(func):
+        handlers[name] = func
+        return func
+    return register
+
+
+def enqueue(name, payload=None, delay=0, max_attempts=5):
+    if name not in handlers:
+        raise KeyError(f"Unknown task: {name}")
+    return Task.objects.create(
+        name=name,
+        payload=payload or {},
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts,
+    )
+
+
+def backoff(attempts):
+    return min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+
+
+def claim(batch_size):
+    now = timezone.now()
+    lease = {"status": Status.RUNNING, "run_after": now + timedelta(seconds=LEASE_SECONDS), "attempts": F("attempts") + 1}
+    # A lease that expired on its last attempt means the worker died on the
+    # task every time; give up on it instead of reclaiming it forever.
+    exhausted = Q(status=Status.RUNNING, attempts__gte=F("max_attempts"))
+    expired = Task.objects.filter(exhausted, run_after__lte=now)
+    for task_id, name in expired.values_list("id", "name"):
+        logger.error("Task %s #%d failed: lease expired on its last attempt", name, task_id)
+    expired.update(status=Status.FAILED, last_error="Lease expired on the last attempt", updated_at=now)
+    due = Task.objects.filter(status__in=[Status.QUEUED, Status.RUNNING], run_after__lte=now).exclude(exhausted).order_by("run_after", "id")
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            tasks = list(due.select_for_update(skip_locked=True)[:batch_size])
+            Task.objects.filter(pk__in=[claimed.pk for claimed in tasks]).update(**lease)
+    else:
+        # No row locks (SQLite): claim each row with a conditional UPDATE so
+        # two workers can never both take the same task.
+        tasks = [
+            candidate for candidate in due[:batch_size]
+            if Task.objects.filter(pk=candidate.pk, status=candidate.status, run_after=candidate.run_after).update(**lease)
+        ]
+    for claimed in tasks:
+        claimed.attempts += 1
+    return tasks
+
+
+def run(claimed):
+    handler = handlers.get(claimed.name)
+    start = time.perf_counter()
+    try:
+        if handler is None:
+            raise KeyError(f"Unknown task: {claimed.name}")
+        handler(**claimed.payload)
+    except Exception as exc:
+        logger.exception("Task %s failed (attempt %d/%d)", claimed, claimed.attempts, claimed.max_attempts)
+        claimed.last_error = repr(exc)
+        if handler is None or claimed.attempts >= claimed.max_attempts:
+            claimed.status = Status.FAILED
+        else:
+            claimed.status = Status.QUEUED
+            claimed.run_after = timezone.now() + timedelta(seconds=backoff(claimed.attempts))
+        claimed.save(update_fields=["status", "run_after", "last_error", "updated_at"])
+        return False
+
+    claimed.delete()
+    metrics.observe(f"tasks.{claimed.name}.seconds", time.perf_counter() - start)
+    return True
+
+
+def run_pending(batch_size=50):
+    """
+    Claim and run one batch of due tasks. Returns the number claimed.
+    """
+    tasks = claim(batch_size)
+    for claimed in tasks:
+        run(claimed)
+    return len(tasks)
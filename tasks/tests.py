@@ -0,0 +1,104 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from jobBoard.models import User
+from . import mail, queue
+from .models import Task
+
+Status = Task.Status
+
+
+@override_settings(YAGMAIL_USER="noreply@example.com", YAGMAIL_PASSWORD="secret")
+class PasswordResetMailTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="user@example.com", password="pass", first_name="Ada")
+        self.addCleanup(mail.close_connection)
+
+    def test_request_enqueues_and_worker_reuses_connection(self):
+        with mock.patch("smtplib.SMTP_SSL") as smtp:
+            for _ in range(3):
+                response = self.client.post(reverse("forgot-password"), {"email": self.user.email}, format="json")
+                self.assertEqual(response.status_code, 200)
+            smtp.assert_not_called()
+            self.assertEqual(Task.objects.filter(name="send_password_reset_email").count(), 3)
+
+            self.assertEqual(queue.run_pending(), 3)
+
+        smtp.assert_called_once()
+        connection = smtp.return_value
+        connection.login.assert_called_once_with("noreply@example.com", "secret")
+        self.assertEqual(connection.sendmail.call_count, 3)
+        sender, recipients, message = connection.sendmail.call_args.args
+        self.assertEqual(recipients, ["user@example.com"])
+        self.assertIn("Subject: Password Reset Request", message)
+        self.assertFalse(Task.objects.exists())
+
+    def test_reconnects_after_disconnect(self):
+        import smtplib
+
+        queue.enqueue("send_password_reset_email", {"user_id": self.user.pk})
+        with mock.patch("smtplib.SMTP_SSL") as smtp:
+            mail.get_connection()
+            smtp.return_value.sendmail.side_effect = [smtplib.SMTPServerDisconnected(), {}]
+            self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(smtp.call_count, 2)
+        self.assertFalse(Task.objects.exists())
+
+
+@queue.task("test_flaky")
+def flaky(fail):
+    if fail:
+        raise RuntimeError("boom")
+
+
+class TaskQueueTests(TestCase):
+    def test_retries_with_backoff_then_fails(self):
+        task = queue.enqueue("test_flaky", {"fail": True}, max_attempts=2)
+        with self.assertLogs("tasks.queue", "ERROR"):
+            self.assertEqual(queue.run_pending(), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Status.QUEUED, 1))
+        self.assertIn("boom", task.last_error)
+        self.assertGreater(task.run_after, timezone.now() + timedelta(seconds=queue.RETRY_BASE_SECONDS - 5))
+        self.assertEqual(queue.run_pending(), 0)
+
+        Task.objects.filter(pk=task.pk).update(run_after=timezone.now())
+        with self.assertLogs("tasks.queue", "ERROR"):
+            queue.run_pending()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Status.FAILED, 2))
+        self.assertEqual(queue.backoff(3), queue.RETRY_BASE_SECONDS * 4)
+
+    def test_claims_are_exclusive_until_lease_expires(self):
+        task = queue.enqueue("test_flaky", {"fail": False})
+        self.assertEqual([claimed.pk for claimed in queue.claim(10)], [task.pk])
+        self.assertEqual(queue.claim(10), [])
+
+        Task.objects.filter(pk=task.pk).update(run_after=timezone.now() - timedelta(seconds=1))
+        reclaimed = queue.claim(10)
+        self.assertEqual([claimed.attempts for claimed in reclaimed], [2])
+        self.assertTrue(queue.run(reclaimed[0]))
+        self.assertFalse(Task.objects.exists())
+
+    def test_expired_leases_fail_after_the_last_attempt(self):
+        task = queue.enqueue("test_flaky", {"fail": False}, max_attempts=2)
+        for attempt in (1, 2):
+            self.assertEqual([claimed.attempts for claimed in queue.claim(10)], [attempt])
+            # The worker dies mid-task and its lease runs out.
+            Task.objects.filter(pk=task.pk).update(run_after=timezone.now() - timedelta(seconds=1))
+        with self.assertLogs("tasks.queue", "ERROR"):
+            self.assertEqual(queue.claim(10), [])
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Status.FAILED, 2))
+        self.assertIn("Lease expired", task.last_error)
+
+    def test_delayed_and_unknown_tasks(self):
+        queue.enqueue("test_flaky", {"fail": False}, delay=60)
+        self.assertEqual(queue.run_pending(), 0)
+        with self.assertRaises(KeyError):
+            queue.enqueue("missing")